@@ -0,0 +1 @@
+"""Benchmarks for olinguito. Run with `python -m benchmarks --help`."""
@@ -0,0 +1,540 @@
+"""Runs the benchmark suite and prints the results as JSON.
+
+Usage:
+    python -m benchmarks [--sizes 1000,10000] [--repeat 3] [--output FILE]
+
+Compare two runs with `python -m benchmarks.compare BASE.json NEW.json`.
+"""
+
+import argparse
+import concurrent.futures
+import dataclasses
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import tracemalloc
+from collections.abc import Callable, Iterator
+from typing import Any, TypedDict
+
+import olinguito
+from olinguito import fingerprinting, schema
+from olinguito.generating import generate_json_schema, render_json_schema
+
+from . import catalog
+
+
+def _timings(func: Callable[[], Any], repeat: int) -> list[float]:
+    results = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        results.append(time.perf_counter() - start)
+    return results
+
+
+def _result(
+    name: str, params: dict[str, Any], unit: str, values: list[float]
+) -> dict[str, Any]:
+    return {
+        "name": name,
+        "params": params,
+        "unit": unit,
+        "min": min(values),
+        "median": statistics.median(values),
+        "values": values,
+    }
+
+
+def bench_schema(sizes: list[int], repeat: int) -> Iterator[dict[str, Any]]:
+    for size in sizes:
+        funcs = catalog.load(size)
+
+        def cold() -> None:
+            schema.cache_clear()
+            for f in funcs:
+                generate_json_schema(f)
+
+        def warm() -> None:
+            for f in funcs:
+                generate_json_schema(f)
+
+        params = {"tools": size}
+        yield _result("schema.cold", params, "s", _timings(cold, repeat))
+        yield _result("schema.warm", params, "s", _timings(warm, repeat))
+
+
+def bench_shapes(repeat: int) -> Iterator[dict[str, Any]]:
+    # A single signature per shape, isolating the cost of each annotation kind.
+    funcs = catalog.load(len(catalog.SHAPES), depth=8, enum_width=1000)
+    for shape, f in zip(catalog.SHAPES, funcs):
+
+        def build(f: Callable[..., Any] = f) -> None:
+            schema.cache_clear()
+            generate_json_schema(f)
+
+        yield _result(f"shape.{shape}", {}, "s", _timings(build, repeat))
+
+
+def bench_wrap(sizes: list[int], repeat: int) -> Iterator[dict[str, Any]]:
+    for size in sizes:
+        funcs = catalog.load(size)
+        for lazy in (False, True):
+
+            def wrap(lazy: bool = lazy) -> None:
+                schema.cache_clear()
+                for f in funcs:
+                    olinguito.wrap(f, lazy=lazy)
+
+            params = {"tools": size, "lazy": lazy}
+            yield _result("wrap", params, "s", _timings(wrap, repeat))
+
+        def wrap_compact() -> None:
+            schema.cache_clear()
+            for f in funcs:
+                olinguito.wrap(f, compact=True)
+
+        params = {"tools": size, "compact": True}
+        yield _result("wrap", params, "s", _timings(wrap_compact, repeat))
+
+
+def bench_import(sizes: list[int], repeat: int) -> Iterator[dict[str, Any]]:
+    script = (
+        "import time, olinguito;"
+        "t = time.perf_counter();"
+        "import {module};"
+        "print(time.perf_counter() - t)"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join([tmp, *sys.path])}
+        for size in sizes:
+            for lazy in (False, True):
+                module = f"catalog_{size}_{'lazy' if lazy else 'eager'}"
+                deco = "olinguito.wrap(lazy=True)" if lazy else "olinguito.wrap"
+                with open(os.path.join(tmp, f"{module}.py"), "w") as f:
+                    f.write(catalog.build_source(size, decorator=deco))
+                values = []
+                for _ in range(repeat):
+                    out = subprocess.run(
+                        [sys.executable, "-B", "-c", script.format(module=module)],
+                        env=env,
+                        check=True,
+                        capture_output=True,
+                        text=True,
+                    ).stdout
+                    values.append(float(out))
+                params = {"tools": size, "lazy": lazy}
+                yield _result("import", params, "s", values)
+            values = _import_compiled(tmp, size, repeat, env)
+            yield _result("import_compiled", {"tools": size}, "s", values)
+
+
+def _import_compiled(
+    tmp: str, size: int, repeat: int, env: dict[str, str]
+) -> list[float]:
+    # Loads the schemas and validators of the lazy catalog from a module
+    # compiled beforehand, as a worker process would.
+    module = f"catalog_{size}_lazy"
+    build = (
+        "import sys, olinguito, {module};"
+        "sys.stdout.write(olinguito.compile_catalog(olinguito.Mapping("
+        "*(getattr({module}, f'tool_{{i}}') for i in range({size})))))"
+    )
+    source = subprocess.run(
+        [sys.executable, "-c", build.format(module=module, size=size)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    with open(os.path.join(tmp, f"compiled_{size}.py"), "w") as f:
+        f.write(source)
+    script = (
+        "import time, olinguito;"
+        "t = time.perf_counter();"
+        "olinguito.Mapping(*olinguito.load_catalog('compiled_{size}'));"
+        "print(time.perf_counter() - t)"
+    )
+    values = []
+    # The first run writes the bytecode of the compiled module.
+    for _ in range(repeat + 1):
+        out = subprocess.run(
+            [sys.executable, "-c", script.format(size=size)],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        values.append(float(out))
+    return values[1:]
+
+
+def _add(x: int, y: int) -> int:
+    """Adds two integers."""
+    return x + y
+
+
+def _spin(n: int) -> int:
+    """Burns CPU time."""
+    total = 0
+    for i in range(n):
+        total += i * i % 7
+    return total
+
+
+def bench_pool(repeat: int, calls: int = 32) -> Iterator[dict[str, Any]]:
+    # CPU-bound throughput with threads only and with a process pool, for
+    # worker counts up to the number of cores.
+    wrapper = olinguito.wrap(_spin)
+    batch = [("_spin", {"n": 200_000})] * calls
+    workers = 1
+    while True:
+        for pooled in (False, True):
+            pool = olinguito.ProcessPool(wrapper, max_workers=workers)
+            mapping = olinguito.Mapping(wrapper, pool=pool if pooled else None)
+            mapping.call_many(batch[:workers], max_workers=workers)  # Warm up.
+            timings = _timings(
+                lambda: mapping.call_many(batch, max_workers=workers), repeat
+            )
+            pool.shutdown()
+            params = {"workers": workers, "processes": pooled}
+            values = [t / calls for t in timings]
+            yield _result("pool.cpu_bound", params, "s/call", values)
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min(workers * 2, os.cpu_count() or 1)
+
+
+def _gil_enabled() -> bool:
+    # Free-threaded builds of CPython 3.13+ can run with the GIL disabled.
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_gil_enabled is None else bool(is_gil_enabled())
+
+
+def bench_threads(repeat: int, number: int = 20_000) -> Iterator[dict[str, Any]]:
+    # Dispatch throughput from 1 thread up to one per core. It only scales
+    # with the cores on builds without the GIL.
+    mapping = olinguito.Mapping(olinguito.wrap(_add), olinguito.wrap(_spin))
+    payloads = {
+        "dispatch_json": json.dumps({"name": "_add", "arguments": {"x": 1, "y": 2}}),
+        "cpu_bound": json.dumps({"name": "_spin", "arguments": {"n": 1_000}}),
+    }
+    cpus = os.cpu_count() or 1
+    for case, data in payloads.items():
+        calls = number if case == "dispatch_json" else number // 50
+        threads = 1
+        while True:
+            barrier = threading.Barrier(threads + 1)
+
+            def work() -> None:
+                barrier.wait()
+                for _ in range(calls // threads):
+                    mapping.dispatch_json(data, validate=True)
+                barrier.wait()
+
+            values = []
+            for _ in range(repeat):
+                workers = [threading.Thread(target=work) for _ in range(threads)]
+                for worker in workers:
+                    worker.start()
+                barrier.wait()
+                start = time.perf_counter()
+                barrier.wait()
+                values.append(calls / (time.perf_counter() - start))
+                for worker in workers:
+                    worker.join()
+            params = {"threads": threads, "gil": _gil_enabled()}
+            yield _result(f"threads.{case}", params, "calls/s", values)
+            if threads >= cpus:
+                break
+            threads = min(threads * 2, cpus)
+
+
+def bench_dispatch(repeat: int, number: int = 100_000) -> Iterator[dict[str, Any]]:
+    wrapper = olinguito.wrap(_add)
+    mapping = olinguito.Mapping(wrapper)
+    args = {"x": 1, "y": 2}
+    data = json.dumps({"name": "_add", "arguments": args})
+    cases: dict[str, Callable[[], Any]] = {
+        "bare": lambda: _add(1, 2),
+        "wrapper": lambda: wrapper(1, 2),
+        "mapping": lambda: mapping("_add", 1, 2),
+        "validate": lambda: wrapper.validate(args),
+        "call_validated": lambda: wrapper.call_validated(args),
+        "dispatch_json": lambda: mapping.dispatch_json(data),
+    }
+    for case, stmt in cases.items():
+        values = [t / number for t in timeit.repeat(stmt, number=number, repeat=repeat)]
+        yield _result(f"dispatch.{case}", {}, "s/call", values)
+
+
+class _Row(TypedDict):
+    id: int
+    name: str
+    price: float
+    tags: list[str]
+
+
+@dataclasses.dataclass
+class _Record:
+    id: int
+    name: str
+    price: float
+    tags: list[str]
+
+
+def _rows(n: int) -> list[_Row]:
+    """Returns rows."""
+    return [
+        {"id": i, "name": f"row {i}", "price": i / 4, "tags": ["a", "b"]}
+        for i in range(n)
+    ]
+
+
+def _records(n: int) -> list[_Record]:
+    """Returns records."""
+    return [_Record(**row) for row in _rows(n)]
+
+
+def _generic(value: Any) -> Any:
+    # A `default` hook discovering types at runtime, which the serializers
+    # compiled from return annotations replace.
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(type(value).__name__)
+
+
+def bench_serialize(repeat: int, number: int = 100) -> Iterator[dict[str, Any]]:
+    for func in (_rows, _records):
+        wrapper = olinguito.wrap(func)
+        for size in (10, 1000):
+            result = func(size)
+            cases: dict[str, Callable[[], Any]] = {
+                "generic": lambda: json.dumps(
+                    result, ensure_ascii=False, separators=(",", ":"), default=_generic
+                ).encode(),
+                "compiled": lambda: wrapper.serialize(result),
+            }
+            for case, stmt in cases.items():
+                values = [
+                    t / number
+                    for t in timeit.repeat(stmt, number=number, repeat=repeat)
+                ]
+                params = {"result": func.__name__.lstrip("_"), "items": size}
+                yield _result(f"serialize.{case}", params, "s/call", values)
+
+
+def _slow() -> None:
+    """Waits for a degraded downstream."""
+    time.sleep(0.05)
+
+
+def bench_admission(repeat: int, calls: int = 64) -> Iterator[dict[str, Any]]:
+    # Latency of a fast tool sharing 8 threads with a degraded one. With a
+    # limit, excess calls to the degraded tool are rejected instead of
+    # occupying the threads.
+    for limited in (False, True):
+        limit = olinguito.Limit(2, queue=2) if limited else None
+        mapping = olinguito.Mapping(
+            olinguito.wrap(_slow, limit=limit), olinguito.wrap(_add)
+        )
+        values = []
+        for _ in range(repeat):
+            latencies: list[float] = []
+
+            def fast(submitted: float) -> None:
+                # From submission, so that queueing for a thread counts.
+                mapping("_add", 1, 2)
+                latencies.append(time.perf_counter() - submitted)
+
+            with concurrent.futures.ThreadPoolExecutor(8) as executor:
+                for _ in range(calls):
+                    executor.submit(mapping, "_slow")
+                    executor.submit(fast, time.perf_counter())
+            values.append(statistics.quantiles(latencies, n=100)[98])
+        yield _result("admission.fast_p99", {"limited": limited}, "s", values)
+
+
+def bench_search(
+    sizes: list[int], repeat: int, number: int = 100
+) -> Iterator[dict[str, Any]]:
+    for size in sizes:
+        wrappers = [olinguito.wrap(f) for f in catalog.load(size)]
+        mapping = olinguito.Mapping(*wrappers)
+
+        def index() -> None:
+            olinguito.Mapping(*wrappers).search("")
+
+        def scan() -> None:
+            # The linear selection `Mapping.search` replaces.
+            [w for w in mapping if "nested" in w.name or "nested" in w.doc][:10]
+
+        params = {"tools": size}
+        yield _result("search.index", params, "s", _timings(index, repeat))
+        cases: dict[str, Callable[[], Any]] = {
+            # Words shared by few tools, and by every tool.
+            "query": lambda: mapping.search("union 17", limit=10),
+            "query_common": lambda: mapping.search("tool arguments", limit=10),
+            "prefix": lambda: mapping.search(prefix="tool_1", limit=10),
+            "scan": scan,
+        }
+        for case, stmt in cases.items():
+            values = [
+                t / number for t in timeit.repeat(stmt, number=number, repeat=repeat)
+            ]
+            yield _result(f"search.{case}", params, "s/call", values)
+
+
+def bench_dialects(
+    sizes: list[int], repeat: int, number: int = 10
+) -> Iterator[dict[str, Any]]:
+    for size in sizes:
+        mapping = olinguito.Mapping(*[olinguito.wrap(f) for f in catalog.load(size)])
+        mapping.encode_manifest()
+
+        def rerender(dialect: str) -> bytes:
+            # Post-processing every schema for every request.
+            definitions = [
+                {
+                    "name": w.name,
+                    "description": w.doc,
+                    "parameters": render_json_schema(w.parameters, dialect),
+                }
+                for w in mapping
+            ]
+            return fingerprinting.encode(definitions)
+
+        for dialect in ("any_of", "strict"):
+            mapping.encode_manifest(dialect=dialect)
+            cases: dict[str, Callable[[], Any]] = {
+                "rerender": lambda: rerender(dialect),
+                "cached": lambda: mapping.encode_manifest(dialect=dialect),
+            }
+            params = {"tools": size, "dialect": dialect}
+            for case, stmt in cases.items():
+                timings = timeit.repeat(stmt, number=number, repeat=repeat)
+                values = [t / number for t in timings]
+                yield _result(f"dialects.{case}", params, "s/call", values)
+
+
+def bench_memory(sizes: list[int]) -> Iterator[dict[str, Any]]:
+    # The traced allocations include the instance dicts that eager and lazy
+    # wrappers get from `functools.update_wrapper`; compact wrappers keep
+    # their attributes in slots and never create one.
+    for size in sizes:
+        funcs = catalog.load(size)
+        for lazy in (False, True):
+            schema.cache_clear()
+            gc.collect()
+            tracemalloc.start()
+            wrappers = [olinguito.wrap(f, lazy=lazy) for f in funcs]
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del wrappers
+            params = {"tools": size, "lazy": lazy}
+            yield _result("memory.per_wrapper", params, "B", [current / size])
+        for warm in (False, True):
+            # Compact wrappers compile their validators on first use.
+            schema.cache_clear()
+            gc.collect()
+            tracemalloc.start()
+            wrappers = [olinguito.wrap(f, compact=True) for f in funcs]
+            if warm:
+                olinguito.Mapping(*wrappers).warm()
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del wrappers
+            params = {"tools": size, "compact": True, "warm": warm}
+            yield _result("memory.per_wrapper", params, "B", [current / size])
+
+
+BENCHMARKS = (
+    "schema",
+    "shapes",
+    "wrap",
+    "import",
+    "dispatch",
+    "admission",
+    "serialize",
+    "search",
+    "dialects",
+    "pool",
+    "threads",
+    "memory",
+)
+
+
+def run(sizes: list[int], repeat: int, only: set[str]) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    if "schema" in only:
+        results += bench_schema(sizes, repeat)
+    if "shapes" in only:
+        results += bench_shapes(repeat)
+    if "wrap" in only:
+        results += bench_wrap(sizes, repeat)
+    if "import" in only:
+        results += bench_import(sizes, repeat)
+    if "dispatch" in only:
+        results += bench_dispatch(repeat)
+    if "admission" in only:
+        results += bench_admission(repeat)
+    if "serialize" in only:
+        results += bench_serialize(repeat)
+    if "search" in only:
+        results += bench_search(sizes, repeat)
+    if "dialects" in only:
+        results += bench_dialects(sizes, repeat)
+    if "pool" in only:
+        results += bench_pool(repeat)
+    if "threads" in only:
+        results += bench_threads(repeat)
+    if "memory" in only:
+        results += bench_memory(sizes)
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000",
+        help="comma-separated catalog sizes (default: %(default)s)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--only",
+        default=",".join(BENCHMARKS),
+        help="comma-separated benchmarks to run (default: %(default)s)",
+    )
+    parser.add_argument("--output", help="write JSON to this file instead of stdout")
+    args = parser.parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",")]
+    report = {
+        "olinguito": olinguito.__version__,
+        "python": sys.version,
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "gil": _gil_enabled(),
+        "results": run(sizes, args.repeat, set(args.only.split(","))),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
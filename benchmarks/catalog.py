@@ -0,0 +1,68 @@
+"""Synthetic tool catalogs for the benchmarks."""
+
+from collections.abc import Callable
+from typing import Any
+
+SHAPES = ("flat", "nested", "enum", "union")
+
+
+def build_source(
+    size: int,
+    *,
+    depth: int = 5,
+    enum_width: int = 200,
+    decorator: str | None = "olinguito.wrap",
+) -> str:
+    """Returns the source of a module defining `size` tool functions.
+
+    The functions cycle through several signature shapes: flat primitives,
+    deeply nested `TypedDict`s, wide `Literal` enums and large unions.
+    """
+    lines = [
+        "from typing import Annotated, Literal, TypedDict",
+        "",
+        "import olinguito",
+        "",
+        "",
+        "class Node0(TypedDict):",
+        "    value: int",
+        "    label: str",
+    ]
+    for d in range(1, depth):
+        lines += [
+            "",
+            "",
+            f"class Node{d}(TypedDict):",
+            f"    child: Node{d - 1}",
+            f"    children: list[Node{d - 1}]",
+            "    weight: float | None",
+        ]
+    values = ", ".join(f'"v{i}"' for i in range(enum_width))
+    lines += ["", "", f"Wide = Literal[{values}]"]
+    signatures = {
+        "flat": (
+            "a: int, b: str, c: float, "
+            'd: Annotated[bool, olinguito.description("A flag.")]'
+        ),
+        "nested": f"a: Node{depth - 1}, b: list[Node{depth - 1}] | None",
+        "enum": "a: Wide, b: list[Wide]",
+        "union": "a: int | float | str | bool | None | list[int] | Node0",
+    }
+    for i in range(size):
+        shape = SHAPES[i % len(SHAPES)]
+        deco = [f"@{decorator}"] if decorator else []
+        lines += [
+            "",
+            "",
+            *deco,
+            f"def tool_{i}({signatures[shape]}) -> None:",
+            f'    """Tool {i} taking {shape} arguments."""',
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def load(size: int, **kwargs: Any) -> list[Callable[..., Any]]:
+    """Executes an undecorated catalog and returns its tool functions."""
+    namespace: dict[str, Any] = {}
+    exec(build_source(size, decorator=None, **kwargs), namespace)
+    return [namespace[f"tool_{i}"] for i in range(size)]
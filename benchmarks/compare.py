@@ -0,0 +1,34 @@
+"""Compares two benchmark reports written by `python -m benchmarks`.
+
+Usage:
+    python -m benchmarks.compare BASE.json NEW.json
+"""
+
+import argparse
+import json
+from typing import Any
+
+
+def _key(result: dict[str, Any]) -> str:
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]" if params else result["name"]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    args = parser.parse_args(argv)
+    with open(args.base) as f:
+        base = {_key(r): r for r in json.load(f)["results"]}
+    with open(args.new) as f:
+        new = {_key(r): r for r in json.load(f)["results"]}
+    width = max(map(len, base.keys() | new.keys()), default=0)
+    for key in sorted(base.keys() & new.keys()):
+        b, n = base[key]["median"], new[key]["median"]
+        ratio = n / b if b else float("inf")
+        print(f"{key:<{width}}  {b:12.6g}  {n:12.6g}  {ratio:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,16 @@
 
 __version__ = "0.1.0"
 
+from .caching import ResultCache  # noqa
+from .compiling import compile_catalog, load_catalog  # noqa
+from .decoding import DecodeError  # noqa
+from .generating import register_dialect  # noqa
+from .instrumenting import Instrument, Metrics  # noqa
+from .limiting import Limit, OverloadError  # noqa
 from .mapping import Mapping  # noqa
-from .schema import description  # noqa
+from .pooling import ProcessPool  # noqa
+from .recording import Recorder, replay  # noqa
+from .registry import Registry  # noqa
+from .schema import description, register_converter  # noqa
+from .validating import ValidationError  # noqa
 from .wrapping import Wrapper, wrap  # noqa
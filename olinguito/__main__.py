@@ -0,0 +1,89 @@
+"""Command line tools.
+
+Usage:
+    python -m olinguito compile MODULE:MAPPING OUTPUT.py [--check]
+    python -m olinguito replay MODULE:MAPPING TRAFFIC.jsonl
+        [--concurrency 8] [--speed 2.0] [--output FILE]
+"""
+
+import argparse
+import importlib
+import json
+import sys
+from typing import Any
+
+from .compiling import compile_catalog
+from .recording import replay
+
+
+def _load(target: str) -> Any:
+    module, _, attribute = target.partition(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+def _compile(args: argparse.Namespace) -> None:
+    source = compile_catalog(_load(args.mapping))
+    if args.check:
+        try:
+            with open(args.output, encoding="utf-8") as f:
+                current = f.read()
+        except FileNotFoundError:
+            current = None
+        if current != source:
+            sys.exit(f"{args.output} is out of date")
+        return
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(source)
+
+
+def _replay(args: argparse.Namespace) -> None:
+    report = replay(
+        _load(args.mapping),
+        args.traffic,
+        concurrency=args.concurrency,
+        speed=args.speed,
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m olinguito")
+    commands = parser.add_subparsers(required=True)
+
+    compile_parser = commands.add_parser(
+        "compile", help="write the schemas and validators of a mapping to a module"
+    )
+    compile_parser.add_argument("mapping", help="the mapping, as MODULE:ATTRIBUTE")
+    compile_parser.add_argument("output", help="the path of the module to write")
+    compile_parser.add_argument(
+        "--check",
+        action="store_true",
+        help="exit with status 1 if OUTPUT is not up to date, instead of writing",
+    )
+    compile_parser.set_defaults(run=_compile)
+
+    replay_parser = commands.add_parser(
+        "replay", help="call a mapping with traffic recorded by a Recorder"
+    )
+    replay_parser.add_argument("mapping", help="the mapping, as MODULE:ATTRIBUTE")
+    replay_parser.add_argument("traffic", help="a file written by a Recorder")
+    replay_parser.add_argument("--concurrency", type=int, default=1)
+    replay_parser.add_argument(
+        "--speed", type=float, help="replay at the recorded pace times SPEED"
+    )
+    replay_parser.add_argument(
+        "--output", help="write JSON to this file instead of stdout"
+    )
+    replay_parser.set_defaults(run=_replay)
+
+    args = parser.parse_args(argv)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
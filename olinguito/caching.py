@@ -0,0 +1,204 @@
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import inspect
+import threading
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, NamedTuple
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    """Calls answered from the cache."""
+    misses: int
+    """Calls that executed the function."""
+    joined: int
+    """Calls that waited for an identical call already in flight."""
+    maxsize: int
+    currsize: int
+
+
+class ResultCache:
+    """A bounded LRU cache of results with an optional time to live, which
+    also collapses identical concurrent calls into a single execution.
+
+    Only use it for pure functions. Calls are keyed on the function and on
+    its arguments bound to its parameters, so that an argument passed by
+    position or by keyword, or a default left out, finds the same result,
+    and a cache can be shared by several functions. Arguments must
+    be JSON-like values (`dict`s, `list`s and hashable
+    scalars); calls with other arguments bypass the cache. Exceptions are
+    never cached, but are shared with the calls joined to a failing one.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float | None = None) -> None:
+        self.maxsize = maxsize
+        """The maximum number of cached results."""
+        self.ttl = ttl
+        """The seconds after which a cached result expires, or `None`."""
+        self._results: collections.OrderedDict[Hashable, tuple[float, Any]] = (
+            collections.OrderedDict()
+        )
+        self._pending: dict[Hashable, concurrent.futures.Future[Any]] = {}
+        self._apending: dict[Hashable, asyncio.Future[Any]] = {}
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._joined = 0
+
+    def call(
+        self, func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> Any:
+        """Returns the cached result of `func(*args, **kwargs)`, calling it or
+        waiting for an identical call in flight when needed."""
+        try:
+            key = _make_key(func, args, kwargs)
+        except TypeError:
+            return func(*args, **kwargs)
+        with self._lock:
+            found, result = self._lookup(key)
+            if found:
+                return result
+            pending = self._pending.get(key)
+            if pending is None:
+                future: concurrent.futures.Future[Any] = concurrent.futures.Future()
+                self._pending[key] = future
+                self._misses += 1
+            else:
+                self._joined += 1
+        if pending is not None:
+            return pending.result()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as exc:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            del self._pending[key]
+            self._store(key, result)
+        future.set_result(result)
+        return result
+
+    async def acall(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        """The counterpart of `call` for coroutine functions."""
+        try:
+            key = _make_key(func, args, kwargs)
+        except TypeError:
+            return await func(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            found, result = self._lookup(key)
+            if found:
+                return result
+            pending = self._apending.get(key)
+            if pending is not None and pending.get_loop() is not loop:
+                # Futures cannot be awaited from another event loop.
+                pending = None
+            if pending is None:
+                future: asyncio.Future[Any] = loop.create_future()
+                self._apending[key] = future
+                self._misses += 1
+            else:
+                self._joined += 1
+        if pending is not None:
+            return await asyncio.shield(pending)
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as exc:
+            with self._lock:
+                self._discard_pending(key, future)
+            if isinstance(exc, Exception):
+                future.set_exception(exc)
+                # Mark it retrieved, in case no call joined.
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        with self._lock:
+            self._discard_pending(key, future)
+            self._store(key, result)
+        future.set_result(result)
+        return result
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            size = len(self._results)
+            return CacheInfo(self._hits, self._misses, self._joined, self.maxsize, size)
+
+    def clear(self) -> None:
+        """Discards the cached results and resets the statistics."""
+        with self._lock:
+            self._results.clear()
+            self._hits = self._misses = self._joined = 0
+
+    def _discard_pending(self, key: Hashable, future: asyncio.Future[Any]) -> None:
+        if self._apending.get(key) is future:
+            del self._apending[key]
+
+    def _lookup(self, key: Hashable) -> tuple[bool, Any]:
+        entry = self._results.get(key)
+        if entry is None:
+            return False, None
+        expires, result = entry
+        if expires < time.monotonic():
+            del self._results[key]
+            return False, None
+        self._results.move_to_end(key)
+        self._hits += 1
+        return True, result
+
+    def _store(self, key: Hashable, result: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        expires = float("inf") if self.ttl is None else time.monotonic() + self.ttl
+        self._results[key] = (expires, result)
+        self._results.move_to_end(key)
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+
+def _make_key(
+    func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]
+) -> Hashable:
+    # Raises `TypeError` for values that cannot be canonicalized, and for
+    # arguments not matching the signature, leaving the error to the call.
+    signature = _signature(func)
+    if signature is None:
+        return (
+            func,
+            tuple(_freeze(a) for a in args),
+            tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())),
+        )
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return (func, tuple((k, _freeze(v)) for k, v in bound.arguments.items()))
+
+
+@functools.lru_cache(maxsize=1024)
+def _signature(func: Callable[..., Any]) -> inspect.Signature | None:
+    try:
+        return inspect.signature(func)
+    except ValueError:
+        # E.g. some builtins.
+        return None
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, str) or value is None:
+        return value
+    elif isinstance(value, (bool, int, float)):
+        # Keep `1`, `1.0` and `True` apart, although they are equal.
+        return (type(value), value)
+    elif isinstance(value, dict):
+        return (dict, tuple(sorted((k, _freeze(v)) for k, v in value.items())))
+    elif isinstance(value, (list, tuple)):
+        return (type(value), tuple(_freeze(v) for v in value))
+    hash(value)
+    return (type(value), value)
@@ -0,0 +1,245 @@
+"""Compiles the schemas and validators of a `Mapping` into a Python module, so
+that processes can load them without introspecting the tools.
+
+Generate the module at build time with `python -m olinguito compile`.
+"""
+
+import dataclasses
+import enum
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import pprint
+import textwrap
+import types
+import typing
+import warnings
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any
+
+from . import typeguards
+from .pooling import _locate
+from .schema import _get_type_hints
+from .validating import _translate
+from .wrapping import Wrapper, _restore, wrap
+
+# Changes to these modules can change any schema or validator.
+_LIBRARY = ("olinguito.generating", "olinguito.schema", "olinguito.validating")
+
+_HEADER = '''\
+"""Tool catalog generated by `python -m olinguito compile`; do not edit."""
+
+from olinguito.validating import ValidationError as _error
+from olinguito.validating import _unique'''
+
+
+def compile_catalog(wrappers: Iterable[Wrapper[..., Any]]) -> str:
+    """Returns the source of a module holding the schemas and compiled
+    validators of the tools, to be loaded with `load_catalog`.
+
+    The module also records a hash of the source of the modules each tool
+    depends on: the one defining it and those defining the classes in its
+    annotations.
+
+    Raises:
+        ValueError: If a tool cannot be imported by the name of its function.
+    """
+    wrappers = list(wrappers)
+    sources = {name: _hash_source(name) for name in _LIBRARY}
+    schemas = _Schemas(w.parameters for w in wrappers)
+    factories: dict[str, str] = {}  # body -> name
+    entries: list[str] = []
+    for wrapper in wrappers:
+        module, name = _locate(wrapper)
+        dependencies = sorted(_dependencies(wrapper.func) | {module})
+        for dependency in dependencies:
+            if dependency not in sources:
+                sources[dependency] = _hash_source(dependency)
+        body = _validator_body(wrapper.parameters)
+        factory = factories.setdefault(body, f"_validator_{len(factories)}")
+        fields = {
+            "module": repr(module),
+            "name": repr(name),
+            "doc": repr(wrapper.doc),
+            "parameters": schemas.render(wrapper.parameters, root=True),
+            "tags": repr(sorted(wrapper.tags)),
+            "sources": repr(tuple(d for d in dependencies if sources[d])),
+            "validator": factory,
+        }
+        lines = [f"        {key!r}: {value}," for key, value in fields.items()]
+        entries.append("\n".join(["    {", *lines, "    },"]))
+    known = {k: v for k, v in sources.items() if v is not None}
+    parts = [_HEADER, f"SOURCES = {_literal(known)}"]
+    parts += [f"def {name}():\n{body}" for body, name in factories.items()]
+    if schemas.definitions:
+        parts.append("\n".join(schemas.definitions))
+    parts.append("\n".join(["TOOLS = [", *entries, "]"]))
+    return "\n\n\n".join(parts) + "\n"
+
+
+def stale_sources(catalog: str | types.ModuleType) -> list[str]:
+    """Returns the modules whose source changed since the catalog was
+    compiled."""
+    module = _import(catalog)
+    return [
+        name for name, digest in module.SOURCES.items() if _hash_source(name) != digest
+    ]
+
+
+def load_catalog(
+    catalog: str | types.ModuleType, /, *, check: bool = True
+) -> list[Wrapper[..., Any]]:
+    """Returns wrappers for the tools of a catalog compiled by
+    `compile_catalog`, in their original order.
+
+    The tools are imported, but neither their signatures nor their
+    annotations are inspected. Define them undecorated or wrapped with
+    `wrap(lazy=True)` so that importing them does not generate schemas
+    either; the cache and limit of a wrapped tool are kept.
+
+    Args:
+        catalog (str | types.ModuleType): The catalog module or its name.
+        check (bool): If True, tools depending on modules changed since the
+            catalog was compiled are wrapped as usual instead, with a
+            `RuntimeWarning`. If False, the catalog is trusted.
+    """
+    module = _import(catalog)
+    stale = set(stale_sources(module)) if check else set()
+    if stale:
+        warnings.warn(
+            f"{module.__name__} is stale, {', '.join(sorted(stale))} changed",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+    everything = not stale.isdisjoint(_LIBRARY)
+    wrappers: list[Wrapper[..., Any]] = []
+    for tool in module.TOOLS:
+        found = getattr(importlib.import_module(tool["module"]), tool["name"])
+        if everything or not stale.isdisjoint(tool["sources"]):
+            if isinstance(found, Wrapper):
+                wrappers.append(found)
+            else:
+                use_defs = "$defs" in tool["parameters"]
+                wrappers.append(wrap(found, use_defs=use_defs, tags=tool["tags"]))
+            continue
+        func, cache, limit = found, None, None
+        if isinstance(found, Wrapper):
+            func, cache, limit = found.func, found.cache, found.limit
+        wrappers.append(
+            _restore(
+                func,
+                tool["doc"],
+                tool["parameters"],
+                tool["validator"](),
+                cache,
+                frozenset(tool["tags"]),
+                limit,
+            )
+        )
+    return wrappers
+
+
+def _import(catalog: str | types.ModuleType) -> types.ModuleType:
+    return importlib.import_module(catalog) if isinstance(catalog, str) else catalog
+
+
+def _hash_source(module: str) -> str | None:
+    spec = importlib.util.find_spec(module)
+    if spec is None or not spec.has_location or spec.origin is None:
+        return None
+    with open(spec.origin, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _dependencies(func: Callable[..., Any]) -> set[str]:
+    # The modules defining the classes used in the annotations, recursively.
+    modules: set[str] = set()
+    seen: set[Any] = set()
+
+    def visit(anno: Any) -> None:
+        for arg in typing.get_args(anno):
+            visit(arg)
+        if isinstance(anno, enum.Enum):
+            modules.add(type(anno).__module__)
+        if not isinstance(anno, type) or anno in seen:
+            return
+        seen.add(anno)
+        modules.add(anno.__module__)
+        if (
+            typeguards.is_typeddict(anno)
+            or typeguards.is_namedtuple(anno)
+            or dataclasses.is_dataclass(anno)
+        ):
+            for hint in _get_type_hints(anno).values():  # type: ignore[arg-type]
+                visit(hint)
+
+    for param in inspect.signature(func).parameters.values():
+        visit(param.annotation)
+    modules.discard("builtins")
+    return modules
+
+
+def _validator_body(parameters: Any) -> str:
+    # Constants become locals of the factory, shared by the nested functions.
+    source, constants = _translate(parameters)
+    lines = [f"    {k} = {_literal(v)}" for k, v in constants.items()]
+    lines += ["", textwrap.indent(source, "    "), "", "    return validate"]
+    return "\n".join(lines)
+
+
+class _Schemas:
+    # Renders schemas as Python literals. Subschemas occurring more than once
+    # are emitted once, as module constants shared by the schemas.
+
+    def __init__(self, schemas: Iterable[Any]) -> None:
+        self.definitions: list[str] = []
+        self._numbers: dict[int, int] = {}  # id -> structure number
+        self._structures: dict[Hashable, int] = {}
+        self._counts: list[int] = []
+        self._names: dict[int, str] = {}
+        for schema in schemas:
+            self._count(schema)
+
+    def _count(self, value: Any) -> Hashable:
+        key: Hashable
+        if isinstance(value, dict):
+            key = (dict, tuple((k, self._count(v)) for k, v in value.items()))
+        elif isinstance(value, list):
+            key = (list, tuple(self._count(v) for v in value))
+        else:
+            # Keep `1`, `1.0` and `True` apart, although they are equal.
+            return (type(value), value)
+        number = self._structures.setdefault(key, len(self._structures))
+        if number == len(self._counts):
+            self._counts.append(0)
+        self._counts[number] += 1
+        self._numbers[id(value)] = number
+        return number
+
+    def render(self, value: Any, root: bool = False) -> str:
+        if not isinstance(value, (dict, list)):
+            return repr(value)
+        number = self._numbers[id(value)]
+        if root or self._counts[number] == 1:
+            return self._render(value)
+        name = self._names.get(number)
+        if name is None:
+            text = self._render(value)
+            name = self._names[number] = f"_s{len(self._names)}"
+            self.definitions.append(f"{name} = {text}")
+        return name
+
+    def _render(self, value: dict[str, Any] | list[Any]) -> str:
+        if isinstance(value, dict):
+            items = ", ".join(f"{k!r}: {self.render(v)}" for k, v in value.items())
+            return f"{{{items}}}"
+        return f"[{', '.join(self.render(v) for v in value)}]"
+
+
+def _literal(value: Any) -> str:
+    if isinstance(value, frozenset):
+        # Sorted, so that the module is the same in every build.
+        items = sorted(map(repr, value))
+        return f"frozenset(({''.join(f'{item}, ' for item in items)}))"
+    return pprint.pformat(value, width=88, sort_dicts=False)
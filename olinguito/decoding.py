@@ -0,0 +1,356 @@
+import dataclasses
+import enum
+import functools
+import inspect
+import threading
+import types
+import typing
+from collections.abc import Callable
+from typing import Annotated, Any, Literal, TypeAlias, Union
+
+from . import typeguards
+from .schema import _args, _get_fields, to_schema_type
+from .validating import ValidationError, compile_validator
+
+_Path: TypeAlias = "tuple[_Path, str | int] | None"
+_Decoder: TypeAlias = Callable[[Any, _Path, list[ValidationError]], Any]
+ArgumentsDecoder: TypeAlias = Callable[[Any], dict[str, Any]]
+
+
+class DecodeError(ValueError):
+    """Raised when arguments cannot be decoded, listing every invalid value."""
+
+    def __init__(self, errors: list[ValidationError]) -> None:
+        super().__init__("; ".join(str(e) for e in errors))
+        self.errors = errors
+        """The errors found, in traversal order."""
+
+
+def compile_decoder(func: Callable[..., Any]) -> ArgumentsDecoder:
+    """Compiles a decoder for the keyword arguments of a function.
+
+    The decoder validates JSON-compatible arguments against the parameter
+    annotations and converts them to the annotated Python types in a single
+    traversal, e.g. integers passed for `float` parameters become floats.
+
+    Args:
+        func (Callable[..., Any]): The function whose arguments are decoded.
+
+    Returns:
+        Callable[[Any], dict[str, Any]]: A function returning the decoded
+            keyword arguments, or raising `DecodeError` with all the errors.
+
+    Raises:
+        TypeError: If an annotation is not supported.
+    """
+    signature = inspect.signature(func)
+    params = signature.parameters
+    decode_object = _object_decoder(
+        {name: _to_decoder(p.annotation) for name, p in params.items()}, set(params)
+    )
+
+    def decode(args: Any) -> dict[str, Any]:
+        errors: list[ValidationError] = []
+        result = decode_object(args, None, errors)
+        if errors:
+            raise DecodeError(errors)
+        return result
+
+    return decode
+
+
+def _format_path(path: _Path) -> str:
+    parts: list[str] = []
+    while path is not None:
+        path, key = path
+        parts.append(f"[{key}]" if isinstance(key, int) else f".{key}")
+    return "$" + "".join(reversed(parts))
+
+
+def _error(errors: list[ValidationError], path: _Path, message: str) -> None:
+    errors.append(ValidationError(_format_path(path), message))
+
+
+def _to_decoder(anno: Any) -> _Decoder:
+    try:
+        hash(anno)
+    except TypeError:
+        return _build_decoder(anno)
+    rep = repr(anno) if typing.get_args(anno) else None
+    if getattr(_building, "types", None):
+        # While a named type is built, decoders may refer to its incomplete
+        # decoder, so they are kept in a cache of this thread until the
+        # outermost named type is built, rather than where other threads
+        # would find them.
+        built: dict[Any, _Decoder] = _building.__dict__.setdefault("built", {})
+        decoder = built.get((anno, rep))
+        if decoder is None:
+            decoder = built[anno, rep] = _build_decoder(anno)
+        return decoder
+    return _to_cached_decoder(anno, rep)
+
+
+@functools.lru_cache(maxsize=1024)
+def _to_cached_decoder(anno: Any, rep: str | None) -> _Decoder:
+    # See `schema._to_shared_schema_type` for why `repr` is part of the key.
+    return _build_decoder(anno)
+
+
+def _build_decoder(anno: Any) -> _Decoder:
+    # Mirrors `schema._find_converter`.
+    origin = typing.get_origin(anno)
+    try:
+        build = _builders.get(anno if origin is None else origin)
+    except TypeError:
+        build = None
+    if build is not None:
+        return build(anno)
+    if isinstance(anno, type):
+        if (
+            typeguards.is_typeddict(anno)
+            or typeguards.is_namedtuple(anno)
+            or dataclasses.is_dataclass(anno)
+        ):
+            return _named_decoder(anno)
+        elif issubclass(anno, enum.Enum):
+            return _enum_decoder(anno)
+    # Types converted by `register_converter` functions are only validated.
+    return _schema_decoder(anno)
+
+
+def _decode_int(value: Any, path: _Path, errors: list[ValidationError]) -> Any:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    _error(errors, path, "must be of type 'integer'")
+
+
+def _decode_float(value: Any, path: _Path, errors: list[ValidationError]) -> Any:
+    if isinstance(value, float):
+        return value
+    if isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    _error(errors, path, "must be of type 'number'")
+
+
+def _decode_str(value: Any, path: _Path, errors: list[ValidationError]) -> Any:
+    if isinstance(value, str):
+        return value
+    _error(errors, path, "must be of type 'string'")
+
+
+def _decode_bool(value: Any, path: _Path, errors: list[ValidationError]) -> Any:
+    if isinstance(value, bool):
+        return value
+    _error(errors, path, "must be of type 'boolean'")
+
+
+def _decode_none(value: Any, path: _Path, errors: list[ValidationError]) -> Any:
+    if value is None:
+        return None
+    _error(errors, path, "must be of type 'null'")
+
+
+def _literal_decoder(anno: Any) -> _Decoder:
+    values = typing.get_args(anno)
+    return _choice_decoder([(v, v) for v in values], f"must be one of {list(values)!r}")
+
+
+def _enum_decoder(anno: type[enum.Enum]) -> _Decoder:
+    values = [member.value for member in anno]
+    choices = [(member.value, member) for member in anno]
+    return _choice_decoder(choices, f"must be one of {values!r}")
+
+
+def _choice_decoder(choices: list[tuple[Any, Any]], message: str) -> _Decoder:
+    # Keyed by type too, since `True == 1`.
+    allowed = {(type(v), v): result for v, result in choices}
+
+    def decode(value: Any, path: _Path, errors: list[ValidationError]) -> Any:
+        try:
+            return allowed[type(value), value]
+        except (KeyError, TypeError):
+            _error(errors, path, message)
+
+    return decode
+
+
+def _list_decoder(anno: Any) -> _Decoder:
+    return _array_decoder(_to_decoder(_args(anno, 1)[0]))
+
+
+def _array_decoder(item: _Decoder) -> _Decoder:
+    def decode(value: Any, path: _Path, errors: list[ValidationError]) -> Any:
+        if not isinstance(value, list):
+            _error(errors, path, "must be of type 'array'")
+            return None
+        return [item(v, (path, i), errors) for i, v in enumerate(value)]
+
+    return decode
+
+
+def _set_decoder(anno: Any) -> _Decoder:
+    decode_array = _list_decoder(anno)
+    factory = typing.get_origin(anno)
+
+    def decode(value: Any, path: _Path, errors: list[ValidationError]) -> Any:
+        items = decode_array(value, path, errors)
+        if items is None:
+            return None
+        try:
+            result = factory(items)
+        except TypeError:
+            # E.g. `set[SomeTypedDict]`, whose items decode to dicts.
+            _error(errors, path, "must have hashable items")
+            return None
+        if len(result) != len(items):
+            _error(errors, path, "must have unique items")
+        return result
+
+    return decode
+
+
+def _tuple_decoder(anno: Any) -> _Decoder:
+    args = _args(anno)
+    if len(args) == 2 and args[1] is Ellipsis:
+        decode_array = _array_decoder(_to_decoder(args[0]))
+
+        def decode_variadic(
+            value: Any, path: _Path, errors: list[ValidationError]
+        ) -> Any:
+            items = decode_array(value, path, errors)
+            return None if items is None else tuple(items)
+
+        return decode_variadic
+    items = [_to_decoder(arg) for arg in args]
+
+    def decode(value: Any, path: _Path, errors: list[ValidationError]) -> Any:
+        if not isinstance(value, list):
+            _error(errors, path, "must be of type 'array'")
+            return None
+        if len(value) != len(items):
+            _error(errors, path, f"must have exactly {len(items)} items")
+            return None
+        return tuple(
+            item(v, (path, i), errors) for i, (item, v) in enumerate(zip(items, value))
+        )
+
+    return decode
+
+
+def _dict_decoder(anno: Any) -> _Decoder:
+    key, value_type = _args(anno, 2)
+    if key is not str:
+        raise TypeError(f"Unsupported dict key type: {key!r}")
+    item = _to_decoder(value_type)
+
+    def decode(value: Any, path: _Path, errors: list[ValidationError]) -> Any:
+        if not isinstance(value, dict):
+            _error(errors, path, "must be of type 'object'")
+            return None
+        return {k: item(v, (path, k), errors) for k, v in value.items()}
+
+    return decode
+
+
+def _union_decoder(anno: Any) -> _Decoder:
+    members = [_to_decoder(a) for a in typing.get_args(anno)]
+
+    def decode(value: Any, path: _Path, errors: list[ValidationError]) -> Any:
+        for member in members:
+            member_errors: list[ValidationError] = []
+            result = member(value, path, member_errors)
+            if not member_errors:
+                return result
+        _error(errors, path, "must match one of the alternatives")
+
+    return decode
+
+
+def _object_decoder(
+    fields: dict[str, _Decoder],
+    required: set[str],
+    factory: Callable[..., Any] | None = None,
+) -> _Decoder:
+    # `fields` and `required` may still be filled in after this returns, for
+    # recursive types. `factory` builds the result from the decoded fields.
+    def decode(value: Any, path: _Path, errors: list[ValidationError]) -> Any:
+        if not isinstance(value, dict):
+            _error(errors, path, "must be of type 'object'")
+            return None
+        count = len(errors)
+        if value.keys() != fields.keys():
+            if missing := required - value.keys():
+                names = ", ".join(sorted(missing))
+                _error(errors, path, f"missing properties: {names}")
+            if unexpected := value.keys() - fields.keys():
+                names = ", ".join(sorted(map(str, unexpected)))
+                _error(errors, path, f"unexpected properties: {names}")
+        result = {
+            k: field(value[k], (path, k), errors)
+            for k, field in fields.items()
+            if k in value
+        }
+        if factory is None or len(errors) > count:
+            return result
+        return factory(**result)
+
+    return decode
+
+
+def _schema_decoder(anno: Any) -> _Decoder:
+    validator = compile_validator(to_schema_type(anno))
+
+    def decode(value: Any, path: _Path, errors: list[ValidationError]) -> Any:
+        try:
+            validator(value)
+        except ValidationError as e:
+            errors.append(ValidationError(_format_path(path) + e.path[1:], e.message))
+        return value
+
+    return decode
+
+
+_building = threading.local()
+
+
+def _named_decoder(anno: Any) -> _Decoder:
+    # `TypedDict`s, dataclasses and `NamedTuple`s.
+    building: dict[Any, _Decoder] = _building.__dict__.setdefault("types", {})
+    if anno in building:
+        return building[anno]
+    fields: dict[str, _Decoder] = {}
+    required: set[str] = set()
+    factory = None if typeguards.is_typeddict(anno) else anno
+    decoder = building[anno] = _object_decoder(fields, required, factory)
+    try:
+        for field, field_type, is_required in _get_fields(anno):
+            fields[field] = _to_decoder(field_type)
+            if is_required:
+                required.add(field)
+    finally:
+        del building[anno]
+        if not building:
+            _building.__dict__.pop("built", None)
+    return decoder
+
+
+def _constant(decoder: _Decoder) -> Callable[[Any], _Decoder]:
+    return lambda anno: decoder
+
+
+_builders: dict[Any, Callable[[Any], _Decoder]] = {
+    int: _constant(_decode_int),
+    float: _constant(_decode_float),
+    str: _constant(_decode_str),
+    bool: _constant(_decode_bool),
+    types.NoneType: _constant(_decode_none),
+    Literal: _literal_decoder,
+    list: _list_decoder,
+    set: _set_decoder,
+    frozenset: _set_decoder,
+    tuple: _tuple_decoder,
+    dict: _dict_decoder,
+    Union: _union_decoder,
+    types.UnionType: _union_decoder,
+    Annotated: lambda anno: _to_decoder(anno.__origin__),
+}
@@ -0,0 +1,27 @@
+import hashlib
+import json
+from collections.abc import Iterable
+from typing import Any
+
+
+def encode(obj: Any) -> bytes:
+    """Encodes a JSON value the way manifests are sent: compact, in UTF-8
+    and with keys in insertion order.
+
+    Schemas are generated with their keys in a fixed order, parameters and
+    fields in declaration order, so equal tools encode to equal bytes in
+    every process. Keys are not sorted, since providers read properties in
+    the order they are listed.
+    """
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fingerprint(data: bytes) -> str:
+    """Returns the SHA-256 hex digest of `data`."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def combine(fingerprints: Iterable[str]) -> str:
+    """Returns a fingerprint of a sequence of fingerprints, which changes if
+    any of them or their order does."""
+    return fingerprint(",".join(fingerprints).encode())
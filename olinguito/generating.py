@@ -1,8 +1,11 @@
+import functools
 import inspect
-from collections.abc import Callable
-from typing import Any, Literal, TypedDict
+import types
+import typing
+from collections.abc import Callable, Mapping
+from typing import Any, Literal, TypeAlias, TypedDict
 
-from .schema import _SchemaType, to_schema_type
+from .schema import _Definitions, _SchemaType, to_schema_type
 
 
 class JsonSchema(TypedDict):
@@ -12,16 +15,187 @@ class JsonSchema(TypedDict):
     additionalProperties: Literal[False]
 
 
-def generate_json_schema(func: Callable[..., Any]) -> JsonSchema:
+def generate_json_schema(
+    func: Callable[..., Any], *, use_defs: bool = False
+) -> JsonSchema:
     signature = inspect.signature(func)
+    defs = _Definitions() if use_defs else None
+    convert = defs.to_schema_type if defs is not None else to_schema_type
     properties: dict[str, _SchemaType] = {}
     required: list[str] = []
     for name, param in signature.parameters.items():
-        properties[name] = to_schema_type(param.annotation)
+        properties[name] = convert(param.annotation)
         required.append(name)
-    return {
+    schema: JsonSchema = {
         "type": "object",
         "properties": properties,
         "required": required,
         "additionalProperties": False,
     }
+    if defs is not None:
+        # Shared and recursive `TypedDict`s are emitted once under `$defs`.
+        defs.inline_unshared(*properties.values())
+        if defs.schemas:
+            typing.cast(dict[str, Any], schema)["$defs"] = defs.schemas
+    return schema
+
+
+def generate_output_schema(
+    func: Callable[..., Any], *, use_defs: bool = False
+) -> _SchemaType | None:
+    """Returns the JSON schema of the function's return annotation, or `None`
+    if it has none.
+
+    Raises:
+        TypeError: If the annotation is not supported.
+    """
+    anno = inspect.signature(func).return_annotation
+    if anno is inspect.Signature.empty:
+        return None
+    if anno is None:
+        anno = types.NoneType
+    if not use_defs:
+        return to_schema_type(anno)
+    defs = _Definitions()
+    schema = defs.to_schema_type(anno)
+    defs.inline_unshared(schema)
+    if defs.schemas:
+        typing.cast(dict[str, Any], schema)["$defs"] = defs.schemas
+    return schema
+
+
+Dialect: TypeAlias = Callable[[JsonSchema], JsonSchema]
+
+# Renderers keyed by dialect name.
+_dialects: dict[str, Dialect] = {}
+
+
+def register_dialect(name: str, renderer: Dialect | None = None, /) -> Any:
+    """Registers a function rendering schemas of parameters in a dialect, the
+    subset of JSON Schema that a model provider accepts.
+
+    The renderer is called with the schema generated for a function at most
+    once per `Wrapper`, and returns the schema to send instead. It must not
+    mutate either, and raises `TypeError` for schemas the dialect cannot
+    express. It overrides any renderer previously registered as `name`.
+
+    It can be used as a decorator, as `@register_dialect(name)`.
+    """
+    if renderer is None:
+        return functools.partial(register_dialect, name)
+    _dialects[name] = renderer
+    return renderer
+
+
+def render_json_schema(schema: JsonSchema, dialect: str) -> JsonSchema:
+    """Renders the schema of a function's parameters in a dialect.
+
+    Raises:
+        KeyError: If the dialect is not registered.
+        TypeError: If the schema cannot be expressed in the dialect.
+    """
+    return _find_dialect(dialect)(schema)
+
+
+def _find_dialect(dialect: str) -> Dialect:
+    try:
+        return _dialects[dialect]
+    except KeyError:
+        raise KeyError(f"Unknown dialect: {dialect!r}") from None
+
+
+def _map_children(
+    schema: Mapping[str, Any], func: Callable[[Mapping[str, Any]], Any]
+) -> dict[str, Any]:
+    # A copy of the schema with `func` applied to its direct subschemas.
+    result = dict(schema)
+    for key in ("properties", "$defs"):
+        if key in result:
+            result[key] = {k: func(v) for k, v in result[key].items()}
+    for key in ("items", "additionalProperties"):
+        if isinstance(result.get(key), Mapping):
+            result[key] = func(result[key])
+    for key in ("prefixItems", "anyOf"):
+        if key in result:
+            result[key] = [func(v) for v in result[key]]
+    return result
+
+
+def _map_schemas(
+    schema: Mapping[str, Any], func: Callable[[dict[str, Any]], Any]
+) -> Any:
+    # Rebuilds a schema bottom-up, applying `func` to every subschema.
+    return func(_map_children(schema, lambda child: _map_schemas(child, func)))
+
+
+# The keywords applying to values of a type, moved to its member of `anyOf`.
+_TYPE_KEYWORDS = {
+    "object": ("properties", "required", "additionalProperties"),
+    "array": ("items", "prefixItems", "minItems", "maxItems", "uniqueItems"),
+}
+
+
+def _split_types(schema: dict[str, Any]) -> dict[str, Any]:
+    types = schema.get("type")
+    if not isinstance(types, list):
+        return schema
+    if len(types) == 1:
+        return {**schema, "type": types[0]}
+    moved = {key for typ in types for key in _TYPE_KEYWORDS.get(typ, ())}
+    result = {k: v for k, v in schema.items() if k != "type" and k not in moved}
+    result["anyOf"] = [
+        {
+            "type": typ,
+            **{k: schema[k] for k in _TYPE_KEYWORDS.get(typ, ()) if k in schema},
+        }
+        for typ in types
+    ]
+    return result
+
+
+@register_dialect("any_of")
+def _to_any_of(schema: JsonSchema) -> JsonSchema:
+    # Unions merged into a list of types are rendered as `anyOf`.
+    return typing.cast(JsonSchema, _map_schemas(schema, _split_types))
+
+
+@register_dialect("inline")
+def _to_inline(schema: JsonSchema) -> JsonSchema:
+    # `$ref`s are replaced by their definitions, which recursive ones cannot.
+    defs: Mapping[str, Any] = typing.cast(dict[str, Any], schema).get("$defs", {})
+    if not defs:
+        return schema
+
+    def resolve(node: Mapping[str, Any], refs: tuple[str, ...]) -> dict[str, Any]:
+        if "$ref" in node:
+            name = node["$ref"].removeprefix("#/$defs/")
+            if name in refs:
+                raise TypeError(f"Recursive definition cannot be inlined: {name!r}")
+            rest = {k: v for k, v in node.items() if k != "$ref"}
+            return {**rest, **resolve(defs[name], (*refs, name))}
+        return _map_children(node, lambda child: resolve(child, refs))
+
+    root = {k: v for k, v in schema.items() if k != "$defs"}
+    return typing.cast(JsonSchema, resolve(root, ()))
+
+
+def _check_strict(schema: dict[str, Any]) -> dict[str, Any]:
+    types = schema.get("type")
+    if types != "object" and not (isinstance(types, list) and "object" in types):
+        return schema
+    if schema.get("additionalProperties", True) is not False:
+        raise TypeError("The strict dialect does not allow additional properties")
+    optional = set(schema.get("properties", ())).difference(schema.get("required", ()))
+    if optional:
+        raise TypeError(
+            f"The strict dialect requires every property: {sorted(optional)!r}"
+        )
+    return schema
+
+
+@register_dialect("strict")
+def _to_strict(schema: JsonSchema) -> JsonSchema:
+    # Only checked, since generated objects are closed already; properties
+    # with defaults or of `dict` types cannot be expressed.
+    _map_schemas(schema, _check_strict)
+    return schema
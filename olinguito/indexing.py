@@ -0,0 +1,156 @@
+import bisect
+import collections.abc
+import heapq
+import inspect
+import itertools
+import math
+import re
+from typing import Any
+
+from . import typeguards
+from .schema import _Mark
+from .wrapping import Wrapper
+
+# Splits `snake_case`, `camelCase` and prose into lowercase words.
+_TOKEN = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+|[^\W\dA-Za-z_]+")
+
+# Matches in names count more than matches in the documentation.
+_NAME_WEIGHT = 3.0
+_PARAMETER_WEIGHT = 2.0
+_TEXT_WEIGHT = 1.0
+
+
+def tokenize(text: str) -> list[str]:
+    return [_normalize(t.lower()) for t in _TOKEN.findall(text)]
+
+
+def _normalize(word: str) -> str:
+    # A crude stemmer, so that plurals match their singulars.
+    if len(word) > 3 and word[-1] == "s" and word[-2] != "s":
+        return word[:-3] + "y" if word.endswith("ies") else word[:-1]
+    return word
+
+
+class Index:
+    """An index of tools by name, tag and the words of their documentation.
+
+    The documentation covers the docstring as well as the names of the
+    parameters and the descriptions attached to them with
+    `olinguito.description`. Tools can be added and discarded incrementally.
+    """
+
+    def __init__(self, wrappers: collections.abc.Iterable[Wrapper[..., Any]] = ()):
+        # token -> tool name -> weighted term frequency
+        self._postings: dict[str, dict[str, float]] = {}
+        self._tokens: dict[str, tuple[str, ...]] = {}
+        self._tags: dict[str, set[str]] = {}
+        self._tool_tags: dict[str, frozenset[str]] = {}
+        self._names: list[str] = []  # Sorted, for prefix queries.
+        self._order: dict[str, int] = {}
+        self._counter = itertools.count()
+        for wrapper in wrappers:
+            self.add(wrapper)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def add(self, wrapper: Wrapper[..., Any]) -> None:
+        name = wrapper.name
+        # A replaced tool keeps its position.
+        position = self._order.get(name)
+        self.discard(name)
+        weights: dict[str, float] = {}
+        for token in tokenize(name):
+            weights[token] = weights.get(token, 0.0) + _NAME_WEIGHT
+        for text, weight in _texts(wrapper):
+            for token in tokenize(text):
+                weights[token] = weights.get(token, 0.0) + weight
+        for token, weight in weights.items():
+            self._postings.setdefault(token, {})[name] = weight
+        self._tokens[name] = tuple(weights)
+        self._tool_tags[name] = wrapper.tags
+        for tag in wrapper.tags:
+            self._tags.setdefault(tag, set()).add(name)
+        bisect.insort(self._names, name)
+        self._order[name] = next(self._counter) if position is None else position
+
+    def discard(self, name: str) -> None:
+        if name not in self._order:
+            return
+        for token in self._tokens.pop(name):
+            postings = self._postings[token]
+            del postings[name]
+            if not postings:
+                del self._postings[token]
+        for tag in self._tool_tags.pop(name):
+            names = self._tags[tag]
+            names.discard(name)
+            if not names:
+                del self._tags[tag]
+        del self._names[bisect.bisect_left(self._names, name)]
+        del self._order[name]
+
+    def search(
+        self,
+        query: str = "",
+        /,
+        *,
+        prefix: str | None = None,
+        tags: collections.abc.Iterable[str] = (),
+        limit: int | None = None,
+    ) -> list[str]:
+        """Returns the names of the matching tools, best matches first.
+
+        Tools match when their name starts with `prefix`, they have all of
+        `tags` and, if `query` is not empty, they share a word with it. They
+        are ranked by the words they share, rarer words weighing more, and
+        otherwise in the order they were added.
+        """
+        allowed: set[str] | None = None
+        if prefix is not None:
+            start = bisect.bisect_left(self._names, prefix)
+            stop = start
+            while stop < len(self._names) and self._names[stop].startswith(prefix):
+                stop += 1
+            allowed = set(self._names[start:stop])
+        for tag in tags:
+            tagged = self._tags.get(tag, set())
+            allowed = set(tagged) if allowed is None else allowed & tagged
+        tokens = set(tokenize(query))
+        order = self._order
+        if not tokens:
+            names = order if allowed is None else allowed
+            if limit is None:
+                return sorted(names, key=order.__getitem__)
+            return heapq.nsmallest(limit, names, key=order.__getitem__)
+        scores: dict[str, float] = {}
+        total = len(order)
+        for token in tokens:
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1.0 + total / len(postings))
+            if allowed is not None:
+                postings = {n: postings[n] for n in allowed if n in postings}
+            if not scores:
+                scores = {name: weight * idf for name, weight in postings.items()}
+                continue
+            get = scores.get
+            for name, weight in postings.items():
+                scores[name] = get(name, 0.0) + weight * idf
+        key = lambda name: (-scores[name], order[name])  # noqa: E731
+        if limit is None:
+            return sorted(scores, key=key)
+        return heapq.nsmallest(limit, scores, key=key)
+
+
+def _texts(wrapper: Wrapper[..., Any]) -> collections.abc.Iterator[tuple[str, float]]:
+    # Read from the signature rather than `parameters`, which lazy wrappers
+    # would have to generate.
+    yield wrapper.doc, _TEXT_WEIGHT
+    for name, param in inspect.signature(wrapper.func).parameters.items():
+        yield name, _PARAMETER_WEIGHT
+        if typeguards.is_annotated(param.annotation):
+            for mark in param.annotation.__metadata__:
+                if isinstance(mark, _Mark):
+                    yield mark.content["description"], _TEXT_WEIGHT
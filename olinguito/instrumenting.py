@@ -0,0 +1,116 @@
+import bisect
+import threading
+from collections.abc import Sequence
+from typing import Any, TypedDict
+
+
+class Instrument:
+    """Base class for hooks observing the tool calls dispatched by a `Mapping`.
+
+    Subclasses override any of the hooks. Hooks run on the calling thread,
+    and exceptions raised by them propagate to the caller.
+    """
+
+    def before(self, key: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> None:
+        """Called before the tool is invoked."""
+
+    def after(self, key: str, elapsed: float, result: Any) -> None:
+        """Called after the tool returns, with the elapsed seconds."""
+
+    def error(self, key: str, elapsed: float, exc: BaseException) -> None:
+        """Called after the tool raises, or a coroutine call is cancelled, with
+        the elapsed seconds."""
+
+
+DEFAULT_BOUNDS: tuple[float, ...] = tuple(0.0001 * 2**i for i in range(20))
+"""Upper bounds in seconds of the latency buckets, from 100us to about 52s."""
+
+
+class ToolStats(TypedDict):
+    calls: int
+    errors: int
+    total_seconds: float
+    min_seconds: float
+    max_seconds: float
+    buckets: list[int]
+    """Counts per `Metrics.bounds` entry, plus a final overflow bucket."""
+    p50_seconds: float
+    p90_seconds: float
+    p99_seconds: float
+
+
+class _Series:
+    __slots__ = ("calls", "errors", "total", "min", "max", "buckets")
+
+    def __init__(self, size: int) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * size
+
+
+class Metrics(Instrument):
+    """Counts calls and errors and records a latency histogram per tool."""
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BOUNDS) -> None:
+        self.bounds = tuple(bounds)
+        """The upper bounds in seconds of the latency buckets."""
+        self._series: dict[str, _Series] = {}
+        self._lock = threading.Lock()
+
+    def after(self, key: str, elapsed: float, result: Any) -> None:
+        self._record(key, elapsed, False)
+
+    def error(self, key: str, elapsed: float, exc: BaseException) -> None:
+        self._record(key, elapsed, True)
+
+    def _record(self, key: str, elapsed: float, failed: bool) -> None:
+        index = bisect.bisect_left(self.bounds, elapsed)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.bounds) + 1)
+            series.calls += 1
+            series.errors += failed
+            series.total += elapsed
+            series.min = min(series.min, elapsed)
+            series.max = max(series.max, elapsed)
+            series.buckets[index] += 1
+
+    def snapshot(self) -> dict[str, ToolStats]:
+        """Returns a JSON-serializable copy of the statistics per tool.
+
+        Percentiles are estimated as the upper bound of the bucket they fall
+        in, capped by the maximum observed latency.
+        """
+        with self._lock:
+            return {key: self._stats(s) for key, s in self._series.items()}
+
+    def reset(self) -> None:
+        """Discards all recorded statistics."""
+        with self._lock:
+            self._series.clear()
+
+    def _stats(self, series: _Series) -> ToolStats:
+        return {
+            "calls": series.calls,
+            "errors": series.errors,
+            "total_seconds": series.total,
+            "min_seconds": series.min,
+            "max_seconds": series.max,
+            "buckets": list(series.buckets),
+            "p50_seconds": self._percentile(series, 0.5),
+            "p90_seconds": self._percentile(series, 0.9),
+            "p99_seconds": self._percentile(series, 0.99),
+        }
+
+    def _percentile(self, series: _Series, q: float) -> float:
+        rank = q * series.calls
+        seen = 0
+        for bound, count in zip(self.bounds, series.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, series.max)
+        return series.max
@@ -0,0 +1,75 @@
+import threading
+import weakref
+from collections.abc import Hashable
+from typing import Any, NoReturn
+
+
+def _read_only(self: object, *args: Any, **kwargs: Any) -> NoReturn:
+    raise TypeError(f"{type(self).__name__} is read-only")
+
+
+class FrozenDict(dict[str, Any]):
+    """A read-only `dict`, e.g. a node of an interned schema.
+
+    It is still a `dict`, so that it can be encoded as JSON and read by code
+    expecting one. Copying or pickling it gives a plain `dict`.
+    """
+
+    __slots__ = ("__weakref__",)
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self) -> tuple[type[dict[str, Any]], tuple[dict[str, Any]]]:
+        return dict, (dict(self),)
+
+
+class FrozenList(list[Any]):
+    """A read-only `list`, e.g. a node of an interned schema.
+
+    Copying or pickling it gives a plain `list`.
+    """
+
+    __slots__ = ("__weakref__",)
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __reduce__(self) -> tuple[type[list[Any]], tuple[list[Any]]]:
+        return list, (list(self),)
+
+
+# Interned nodes by structure. An entry lives as long as its node, so the
+# structures only refer to live children by `id`.
+_nodes: weakref.WeakValueDictionary[Hashable, FrozenDict | FrozenList] = (
+    weakref.WeakValueDictionary()
+)
+_lock = threading.Lock()
+
+
+def intern(value: Any) -> Any:
+    """Returns a read-only copy of a JSON value in which equal objects and
+    arrays are the same `FrozenDict` and `FrozenList` instances, shared with
+    every other interned value.
+    """
+    if isinstance(value, dict):
+        items = {k: intern(v) for k, v in value.items()}
+        node: FrozenDict | FrozenList = FrozenDict(items)
+        key: list[Any] = [dict]
+        for k, v in items.items():
+            key += (k, type(v), _identity(v))
+    elif isinstance(value, list):
+        node = FrozenList([intern(v) for v in value])
+        key = [list]
+        for v in node:
+            key += (type(v), _identity(v))
+    else:
+        return value
+    # Types are part of the key to keep `1`, `1.0` and `True` apart.
+    with _lock:
+        return _nodes.setdefault(tuple(key), node)
+
+
+def _identity(value: Any) -> Any:
+    # Interned children are identified by `id`, scalars by value.
+    return id(value) if isinstance(value, (FrozenDict, FrozenList)) else value
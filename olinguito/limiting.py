@@ -0,0 +1,253 @@
+import asyncio
+import collections
+import contextlib
+import functools
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from typing import Any, NamedTuple
+
+
+class OverloadError(RuntimeError):
+    """Raised when a call is rejected by a `Limit`, because too many calls
+    are waiting or the call waited longer than the limit's `timeout`."""
+
+    def __init__(self, key: str, message: str) -> None:
+        super().__init__(f"{key}: {message}")
+        self.key = key
+        """The name of the rejected tool."""
+        self.message = message
+        """The reason why the call was rejected."""
+
+
+class LimitInfo(NamedTuple):
+    active: int
+    """Calls holding one of the `concurrency` slots."""
+    waiting: int
+    """Calls waiting for a slot or for the rate limit."""
+    rejected: int
+    """Calls rejected with `OverloadError` so far."""
+
+
+class _Waiter:
+    # A call waiting for a slot, woken from the thread releasing one.
+    __slots__ = ("granted", "wake")
+
+    def __init__(self, wake: Callable[[], Any]) -> None:
+        self.granted = False
+        self.wake = wake
+
+
+class Limit:
+    """Admission control for the calls to a tool, or to every tool of a
+    `Mapping`.
+
+    Calls over the limits wait in a first-in, first-out queue, for a slot to
+    be released and for the rate limit to allow them. Calls that would wait
+    in a full queue, or longer than `timeout`, are rejected immediately with
+    `OverloadError` instead. Asynchronous calls wait without blocking the
+    event loop.
+
+    Tools given the same `Limit` share it. The coroutines returned for
+    coroutine functions by `Mapping.__call__` and `Mapping.dispatch_json`
+    wait for admission when awaited, and hold their slot until they complete.
+    """
+
+    def __init__(
+        self,
+        concurrency: int | None = None,
+        *,
+        rate: float | None = None,
+        burst: int = 1,
+        queue: int | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        if concurrency is not None and concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.concurrency = concurrency
+        """The maximum number of calls in progress, or `None`."""
+        self.rate = rate
+        """The calls allowed per second on average, or `None`."""
+        self.burst = burst
+        """The calls allowed at once by the rate limit, e.g. after idling."""
+        self.queue = queue
+        """The maximum number of waiting calls, or `None`."""
+        self.timeout = timeout
+        """The maximum seconds a call waits, or `None`."""
+        self._lock = threading.Lock()
+        self._active = self._waiting = self._rejected = 0
+        self._waiters: collections.deque[_Waiter] = collections.deque()
+        # A token bucket, which goes negative by the calls waiting for it.
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def info(self) -> LimitInfo:
+        """Returns the current state of the limit."""
+        with self._lock:
+            return LimitInfo(self._active, self._waiting, self._rejected)
+
+    def _enter(self, key: str, deadline: float | None) -> None:
+        wait, by_deadline = self._budget(deadline)
+        delay = self._reserve(key, wait, by_deadline)
+        if delay:
+            try:
+                time.sleep(delay)
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+            if wait is not None:
+                wait -= delay
+        if self.concurrency is None:
+            return
+        event = threading.Event()
+        waiter = self._queue(key, self.concurrency, event.set)
+        if waiter is None:
+            return
+        event.wait(wait)
+        with self._lock:
+            if not waiter.granted:
+                self._waiters.remove(waiter)
+                self._waiting -= 1
+                raise self._expired(key, by_deadline)
+
+    async def _aenter(self, key: str, deadline: float | None) -> None:
+        wait, by_deadline = self._budget(deadline)
+        delay = self._reserve(key, wait, by_deadline)
+        if delay:
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+            if wait is not None:
+                wait -= delay
+        if self.concurrency is None:
+            return
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        wake = functools.partial(loop.call_soon_threadsafe, _resolve, future)
+        waiter = self._queue(key, self.concurrency, wake)
+        if waiter is None:
+            return
+        try:
+            await asyncio.wait_for(future, wait)
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+                    self._waiting -= 1
+            if granted:
+                self._exit()
+            raise
+        except TimeoutError:
+            with self._lock:
+                # Unless the slot was granted as the wait ended.
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    self._waiting -= 1
+                    raise self._expired(key, by_deadline) from None
+
+    def _exit(self) -> None:
+        if self.concurrency is None:
+            return
+        with self._lock:
+            if self._waiters:
+                # The slot is handed over, so that calls arriving meanwhile
+                # cannot take it.
+                waiter = self._waiters.popleft()
+                self._waiting -= 1
+                waiter.granted = True
+                waiter.wake()
+            else:
+                self._active -= 1
+
+    def _budget(self, deadline: float | None) -> tuple[float | None, bool]:
+        # The seconds a call may wait, and whether its deadline bounds them
+        # rather than `timeout`.
+        if deadline is None:
+            return self.timeout, False
+        left = max(deadline - time.monotonic(), 0.0)
+        if self.timeout is None or left < self.timeout:
+            return left, True
+        return self.timeout, False
+
+    def _reserve(self, key: str, wait: float | None, by_deadline: bool) -> float:
+        # Takes a token, returning the seconds until it is available.
+        if self.rate is None:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._tokens = min(self._tokens + elapsed * self.rate, self.burst)
+            self._updated = now
+            delay = max((1 - self._tokens) / self.rate, 0.0)
+            if delay:
+                self._check_queue(key)
+                if wait is not None and delay > wait:
+                    raise self._expired(key, by_deadline)
+                self._waiting += 1
+            self._tokens -= 1
+        return delay
+
+    def _queue(
+        self, key: str, concurrency: int, wake: Callable[[], Any]
+    ) -> _Waiter | None:
+        # Takes a free slot, or returns a waiter queued for the next one.
+        with self._lock:
+            if self._active < concurrency and not self._waiters:
+                self._active += 1
+                return None
+            self._check_queue(key)
+            waiter = _Waiter(wake)
+            self._waiters.append(waiter)
+            self._waiting += 1
+        return waiter
+
+    def _check_queue(self, key: str) -> None:
+        if self.queue is not None and self._waiting >= self.queue:
+            self._rejected += 1
+            raise OverloadError(key, f"{self._waiting} calls are already waiting")
+
+    def _expired(self, key: str, by_deadline: bool) -> Exception:
+        if by_deadline:
+            return TimeoutError("Deadline exceeded waiting for admission")
+        self._rejected += 1
+        return OverloadError(key, f"waited more than {self.timeout}s")
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+@contextlib.contextmanager
+def _admitted(
+    limits: Iterable[Limit], key: str, deadline: float | None = None
+) -> Iterator[None]:
+    entered: list[Limit] = []
+    try:
+        for limit in limits:
+            limit._enter(key, deadline)
+            entered.append(limit)
+        yield
+    finally:
+        for limit in reversed(entered):
+            limit._exit()
+
+
+@contextlib.asynccontextmanager
+async def _aadmitted(limits: Iterable[Limit], key: str) -> AsyncIterator[None]:
+    entered: list[Limit] = []
+    try:
+        for limit in limits:
+            await limit._aenter(key, None)
+            entered.append(limit)
+        yield
+    finally:
+        for limit in reversed(entered):
+            limit._exit()
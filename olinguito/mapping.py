@@ -1,19 +1,47 @@
+import asyncio
 import collections.abc
+import concurrent.futures
+import contextlib
+import functools
+import json
+import threading
+import time
 import types
+from collections.abc import Callable
 from dataclasses import dataclass
 from typing import Any
 
-from .wrapping import Wrapper
+from .fingerprinting import combine, encode
+from .indexing import Index
+from .instrumenting import Instrument
+from .limiting import Limit, _aadmitted, _admitted
+from .pooling import ProcessPool
+from .serializing import Serializer
+from .wrapping import Wrapper, _to_tool_definition
 
 
 @dataclass(init=False, frozen=True, repr=False)
 class Mapping:
     data: collections.abc.Mapping[str, Wrapper[..., Any]]
+    instruments: tuple[Instrument, ...]
+    pool: ProcessPool | None
+    limit: Limit | None
 
-    def __init__(self, *wrappers: Wrapper[..., Any]) -> None:
+    def __init__(
+        self,
+        *wrappers: Wrapper[..., Any],
+        instruments: collections.abc.Iterable[Instrument] = (),
+        pool: ProcessPool | None = None,
+        limit: Limit | None = None,
+    ) -> None:
         object.__setattr__(
             self, "data", types.MappingProxyType({w.name: w for w in wrappers})
         )
+        object.__setattr__(self, "instruments", tuple(instruments))
+        # Tools in `pool` are called in its worker processes.
+        object.__setattr__(self, "pool", pool)
+        # Admission control for the calls to all tools, after their own.
+        object.__setattr__(self, "limit", limit)
 
     def __getitem__(self, key: str) -> Wrapper[..., Any]:
         return self.data[key]
@@ -27,10 +55,343 @@ class Mapping:
     def __contains__(self, key: Any) -> bool:
         if isinstance(key, str):
             return key in self.data
-        return key in tuple(self.data.values())
+        if not isinstance(key, Wrapper):
+            return False
+        wrapper = self.data.get(key.name)
+        return wrapper is key or (wrapper is not None and wrapper == key)
 
     def __len__(self) -> int:
         return len(self.data)
 
+    # The manifest is built once per mapping; wrappers' schemas are assumed not
+    # to be mutated afterwards.
+    @functools.cached_property
+    def manifest(self) -> tuple[collections.abc.Mapping[str, Any], ...]:
+        return tuple(_freeze(_to_tool_definition(w)) for w in self.data.values())
+
+    @functools.cached_property
+    def _manifest_fragments(self) -> collections.abc.Mapping[str, bytes]:
+        return types.MappingProxyType(
+            {k: encode(_to_tool_definition(w)) for k, w in self.data.items()}
+        )
+
+    @functools.cached_property
+    def _encoded_manifest(self) -> bytes:
+        return b"[" + b",".join(self._manifest_fragments.values()) + b"]"
+
+    def encode_manifest(
+        self,
+        keys: collections.abc.Iterable[str] | None = None,
+        /,
+        *,
+        dialect: str | None = None,
+    ) -> bytes:
+        if dialect is not None:
+            # Each tool renders and encodes its definition once per dialect.
+            wrappers = self if keys is None else [self.data[k] for k in keys]
+            return b"[" + b",".join([w._render(dialect)[1] for w in wrappers]) + b"]"
+        if keys is None:
+            return self._encoded_manifest
+        fragments = self._manifest_fragments
+        return b"[" + b",".join([fragments[k] for k in keys]) + b"]"
+
+    @functools.cached_property
+    def _fingerprint(self) -> str:
+        return combine(w.fingerprint for w in self.data.values())
+
+    def fingerprint(self, keys: collections.abc.Iterable[str] | None = None, /) -> str:
+        # A digest of `encode_manifest(keys)`, combined from the tools' own
+        # fingerprints so that subsets are cheap to fingerprint too.
+        if keys is None:
+            return self._fingerprint
+        data = self.data
+        return combine(data[k].fingerprint for k in keys)
+
+    @functools.cached_property
+    def _index(self) -> Index:
+        return Index(self.data.values())
+
+    def search(
+        self,
+        query: str = "",
+        /,
+        *,
+        prefix: str | None = None,
+        tags: collections.abc.Iterable[str] = (),
+        limit: int | None = None,
+    ) -> list[Wrapper[..., Any]]:
+        # Selects tools without scanning them; see `Index.search` for ranking.
+        # The index is built on first use.
+        names = self._index.search(query, prefix=prefix, tags=tags, limit=limit)
+        return [self.data[name] for name in names]
+
     def __call__(self, key: str, *args: Any, **kwargs: Any) -> Any:
-        return self.data[key](*args, **kwargs)
+        if self._is_async(key):
+            # A coroutine admitted and instrumented until it completes.
+            return self._ainvoke(key, args, kwargs)
+        return self._invoke(key, self._route(key), args, kwargs)
+
+    def _is_async(self, key: str) -> bool:
+        # Pooled coroutine functions are run to completion by the workers.
+        pool = self.pool
+        return self.data[key].is_async and not (pool is not None and key in pool)
+
+    def _route(self, key: str) -> Callable[..., Any]:
+        wrapper = self.data[key]
+        pool = self.pool
+        if pool is not None and key in pool:
+            return functools.partial(pool.call, key)
+        return _target(wrapper)
+
+    def _limits(self, key: str) -> tuple[Limit, ...]:
+        # The tool's limit comes first, so that calls waiting for a busy tool
+        # do not hold a slot of the mapping's limit meanwhile.
+        return tuple(
+            limit for limit in (self.data[key].limit, self.limit) if limit is not None
+        )
+
+    def _invoke(
+        self,
+        key: str,
+        func: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        deadline: float | None = None,
+    ) -> Any:
+        if self.limit is not None or self.data[key].limit is not None:
+            with _admitted(self._limits(key), key, deadline):
+                return self._run(key, func, args, kwargs)
+        return self._run(key, func, args, kwargs)
+
+    def _run(
+        self,
+        key: str,
+        func: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        if not self.instruments:
+            return func(*args, **kwargs)
+        for instrument in self.instruments:
+            instrument.before(key, args, kwargs)
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as exc:
+            elapsed = time.perf_counter() - start
+            for instrument in self.instruments:
+                instrument.error(key, elapsed, exc)
+            raise
+        elapsed = time.perf_counter() - start
+        for instrument in self.instruments:
+            instrument.after(key, elapsed, result)
+        return result
+
+    async def _ainvoke(
+        self, key: str, args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> Any:
+        if self.limit is not None or self.data[key].limit is not None:
+            async with _aadmitted(self._limits(key), key):
+                return await self._arun(key, args, kwargs)
+        return await self._arun(key, args, kwargs)
+
+    async def _arun(
+        self, key: str, args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> Any:
+        wrapper = self.data[key]
+        acall: Callable[..., Any] = wrapper.acall
+        pool = self.pool
+        if pool is not None and key in pool:
+            acall = functools.partial(pool.acall, key)
+        if not self.instruments:
+            return await acall(*args, **kwargs)
+        for instrument in self.instruments:
+            instrument.before(key, args, kwargs)
+        start = time.perf_counter()
+        try:
+            result = await acall(*args, **kwargs)
+        except BaseException as exc:
+            elapsed = time.perf_counter() - start
+            for instrument in self.instruments:
+                instrument.error(key, elapsed, exc)
+            raise
+        elapsed = time.perf_counter() - start
+        for instrument in self.instruments:
+            instrument.after(key, elapsed, result)
+        return result
+
+    def warm(self, *, background: bool = False) -> threading.Thread | None:
+        # Generates the schemas and validators of lazily wrapped functions.
+        if background:
+            thread = threading.Thread(target=self.warm, daemon=True)
+            thread.start()
+            return thread
+        for wrapper in self.data.values():
+            wrapper.validator
+        return None
+
+    def call_many(
+        self,
+        calls: collections.abc.Iterable[tuple[str, dict[str, Any]]],
+        /,
+        *,
+        executor: concurrent.futures.Executor | None = None,
+        max_workers: int | None = None,
+        timeout: float | None = None,
+    ) -> list[Any]:
+        # Like `asyncio.gather(..., return_exceptions=True)`, results keep the
+        # order of `calls` and failed calls are returned as their exception.
+        # Each call is given `timeout` seconds from when it starts, including
+        # any wait for admission; calls that are still running then are
+        # returned as `TimeoutError` and left to finish in the background.
+        # Without `executor`, a thread pool per `max_workers` is reused.
+        pool = executor or self._executor(max_workers)
+        starts: list[concurrent.futures.Future[float | None]] = []
+        futures: list[concurrent.futures.Future[Any]] = []
+        for key, kwargs in calls:
+            start: concurrent.futures.Future[float | None] = concurrent.futures.Future()
+            starts.append(start)
+            futures.append(pool.submit(self._call, key, kwargs, timeout, start))
+        return _gather(futures, starts, timeout)
+
+    @functools.cached_property
+    def _executors(self) -> dict[int | None, concurrent.futures.ThreadPoolExecutor]:
+        return {}
+
+    def _executor(self, max_workers: int | None) -> concurrent.futures.Executor:
+        executors = self._executors
+        pool = executors.get(max_workers)
+        if pool is None:
+            # An executor that lost a race has started no threads.
+            new = concurrent.futures.ThreadPoolExecutor(max_workers)
+            pool = executors.setdefault(max_workers, new)
+        return pool
+
+    def _call(
+        self,
+        key: str,
+        kwargs: dict[str, Any],
+        timeout: float | None,
+        start: concurrent.futures.Future[float | None],
+    ) -> Any:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        start.set_result(deadline)
+        if self._is_async(key):
+            func = functools.partial(_run_coroutine, _target(self.data[key]))
+            return self._invoke(key, func, (), kwargs, deadline)
+        return self._invoke(key, self._route(key), (), kwargs, deadline)
+
+    async def acall(self, key: str, *args: Any, **kwargs: Any) -> Any:
+        return await self._ainvoke(key, args, kwargs)
+
+    async def acall_many(
+        self,
+        calls: collections.abc.Iterable[tuple[str, dict[str, Any]]],
+        /,
+        *,
+        limit: int | None = None,
+        timeout: float | None = None,
+    ) -> list[Any]:
+        # The asynchronous counterpart of `call_many`; `limit` bounds the
+        # number of calls running at the same time.
+        semaphore = (
+            asyncio.Semaphore(limit) if limit is not None else contextlib.nullcontext()
+        )
+
+        async def acall(key: str, kwargs: dict[str, Any]) -> Any:
+            async with semaphore:
+                return await self._ainvoke(key, (), kwargs)
+
+        return await asyncio.gather(
+            *(asyncio.wait_for(acall(key, kwargs), timeout) for key, kwargs in calls),
+            return_exceptions=True,
+        )
+
+    def dispatch_json(
+        self,
+        data: str | bytes,
+        /,
+        *,
+        loads: Callable[[str | bytes], Any] = json.loads,
+        validate: bool = False,
+        serialize: bool = False,
+    ) -> Any:
+        # `data` is a JSON object such as `{"name": ..., "arguments": ...}`,
+        # where `arguments` is either an object or a JSON-encoded string.
+        # With `serialize`, the result is encoded by the tool's serializer;
+        # results of coroutine functions are encoded once awaited.
+        call = loads(data)
+        key = call["name"]
+        wrapper = self.data[key]
+        arguments = call.get("arguments", {})
+        if isinstance(arguments, (str, bytes)):
+            arguments = loads(arguments)
+        if validate:
+            wrapper.validator(arguments)
+        if self._is_async(key):
+            coro = self._ainvoke(key, (), arguments)
+            return _serialize_awaited(wrapper.serializer, coro) if serialize else coro
+        result = self._invoke(key, self._route(key), (), arguments)
+        return wrapper.serializer(result) if serialize else result
+
+
+def _target(wrapper: Wrapper[..., Any]) -> Callable[..., Any]:
+    # Skips the `Wrapper.__call__` indirection unless it has work to do.
+    return wrapper.func if wrapper.cache is None else wrapper
+
+
+async def _serialize_awaited(
+    serializer: Serializer, coro: collections.abc.Awaitable[Any]
+) -> bytes:
+    return serializer(await coro)
+
+
+def _gather(
+    futures: list[concurrent.futures.Future[Any]],
+    starts: list[concurrent.futures.Future[float | None]],
+    timeout: float | None,
+) -> list[Any]:
+    # Waits for each call until the deadline set when it started.
+    results: list[Any] = [None] * len(futures)
+    pending = dict(enumerate(futures))
+    while pending:
+        now = time.monotonic()
+        waits: list[concurrent.futures.Future[Any]] = []
+        deadline: float | None = None
+        for i, future in list(pending.items()):
+            if future.done():
+                del pending[i]
+                exc = future.exception()
+                results[i] = future.result() if exc is None else exc
+                continue
+            start = starts[i]
+            if not start.done():
+                waits += (future, start)
+                continue
+            due = start.result()
+            if due is not None and due <= now:
+                del pending[i]
+                results[i] = TimeoutError(f"Timed out after {timeout}s")
+                continue
+            waits.append(future)
+            if due is not None:
+                deadline = due if deadline is None else min(deadline, due)
+        if pending:
+            concurrent.futures.wait(
+                waits,
+                None if deadline is None else deadline - now,
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+    return results
+
+
+def _run_coroutine(func: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+    return asyncio.run(func(*args, **kwargs))
+
+
+def _freeze(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return types.MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    elif isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+    return obj
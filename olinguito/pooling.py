@@ -0,0 +1,114 @@
+import asyncio
+import concurrent.futures
+import importlib
+import inspect
+import multiprocessing.context
+import threading
+from collections.abc import Callable
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from .wrapping import Wrapper
+
+
+class ProcessPool:
+    """Runs selected tools in worker processes, for CPU-bound tools that
+    would otherwise serialize behind the GIL.
+
+    Workers import each tool from its module and look it up by
+    `Wrapper.name`, so tools must be defined at the top level of an
+    importable module; arguments and results must be picklable. Worker
+    processes are started on first use.
+
+    If a worker dies, the calls in flight fail with `BrokenProcessPool` and
+    the pool is restarted for later calls.
+    """
+
+    def __init__(
+        self,
+        *wrappers: Wrapper[..., Any],
+        max_workers: int | None = None,
+        mp_context: multiprocessing.context.BaseContext | None = None,
+    ) -> None:
+        self.max_workers = max_workers
+        """The maximum number of worker processes."""
+        self._paths: dict[str, tuple[str, str]] = {}
+        for wrapper in wrappers:
+            self._paths[wrapper.name] = _locate(wrapper)
+        self._mp_context = mp_context
+        self._executor: concurrent.futures.ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._paths
+
+    def __enter__(self) -> "ProcessPool":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+
+    def submit(
+        self, key: str, args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> concurrent.futures.Future[Any]:
+        """Schedules a call of the tool named `key` in a worker process."""
+        module, name = self._paths[key]
+        executor = self._get_executor()
+        try:
+            return executor.submit(_run, module, name, args, kwargs)
+        except BrokenProcessPool:
+            # A worker died since the last call; start over with new workers.
+            return self._get_executor(broken=executor).submit(
+                _run, module, name, args, kwargs
+            )
+
+    def call(self, key: str, /, *args: Any, **kwargs: Any) -> Any:
+        """Calls the tool named `key` in a worker process and waits for it."""
+        return self.submit(key, args, kwargs).result()
+
+    async def acall(self, key: str, /, *args: Any, **kwargs: Any) -> Any:
+        """The counterpart of `call` for asynchronous code."""
+        return await asyncio.wrap_future(self.submit(key, args, kwargs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops the worker processes. They are restarted if the pool is used
+        again."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _get_executor(
+        self, broken: concurrent.futures.ProcessPoolExecutor | None = None
+    ) -> concurrent.futures.ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._executor is broken:
+                if broken is not None:
+                    broken.shutdown(wait=False)
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    self.max_workers, mp_context=self._mp_context
+                )
+            return self._executor
+
+
+def _locate(wrapper: Wrapper[..., Any]) -> tuple[str, str]:
+    module, name = wrapper.func.__module__, wrapper.name
+    found = getattr(importlib.import_module(module), name, None)
+    if found is not wrapper and found is not wrapper.func:
+        raise ValueError(f"{name!r} cannot be imported from {module!r}")
+    return module, name
+
+
+# The functions imported by this worker process.
+_functions: dict[tuple[str, str], Callable[..., Any]] = {}
+
+
+def _run(module: str, name: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+    func = _functions.get((module, name))
+    if func is None:
+        found = getattr(importlib.import_module(module), name)
+        func = found.func if isinstance(found, Wrapper) else found
+        _functions[module, name] = func
+    if inspect.iscoroutinefunction(func):
+        return asyncio.run(func(*args, **kwargs))
+    return func(*args, **kwargs)
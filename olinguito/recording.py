@@ -0,0 +1,243 @@
+"""Records the tool calls dispatched by a `Mapping` and replays them."""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import inspect
+import json
+import math
+import os
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from typing import IO, Any, NamedTuple, TypedDict
+
+from .instrumenting import Instrument
+from .mapping import Mapping
+
+
+class RecordedCall(NamedTuple):
+    start: float
+    """The seconds since the recorder was created when the call started."""
+    name: str
+    args: tuple[Any, ...]
+    kwargs: dict[str, Any]
+    elapsed: float
+    """The seconds the call took."""
+    error: str | None
+    """The name of the exception raised by the call, or `None`."""
+
+
+# The start time and encoded arguments of a call in progress.
+_Pending = tuple[float, str | None]
+
+
+class Recorder(Instrument):
+    """Writes the tool calls it observes to a file as JSON lines.
+
+    Each line holds a call's name, arguments, start time, duration and
+    outcome, as read back by `load`. Calls whose arguments cannot be encoded
+    as JSON are not recorded, and counted in `skipped`.
+    """
+
+    def __init__(self, file: str | os.PathLike[str] | IO[str]) -> None:
+        if isinstance(file, (str, os.PathLike)):
+            self._file: IO[str] = open(file, "w", encoding="utf-8")
+            self._owned = True
+        else:
+            self._file = file
+            self._owned = False
+        self.skipped = 0
+        """The number of calls not recorded."""
+        self._origin = time.perf_counter()
+        # The calls in progress in the current thread or task, innermost last.
+        self._calls: contextvars.ContextVar[tuple[_Pending, ...]] = (
+            contextvars.ContextVar(f"olinguito_recorder_{id(self)}", default=())
+        )
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "Recorder":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def before(self, key: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> None:
+        # Encode now, in case the tool mutates its arguments.
+        try:
+            arguments = json.dumps([args, kwargs], ensure_ascii=False)
+        except (TypeError, ValueError):
+            arguments = None
+        start = time.perf_counter() - self._origin
+        self._calls.set((*self._calls.get(), (start, arguments)))
+
+    def after(self, key: str, elapsed: float, result: Any) -> None:
+        self._write(key, elapsed, None)
+
+    def error(self, key: str, elapsed: float, exc: BaseException) -> None:
+        self._write(key, elapsed, type(exc).__name__)
+
+    def _write(self, key: str, elapsed: float, error: str | None) -> None:
+        *calls, (start, arguments) = self._calls.get()
+        self._calls.set(tuple(calls))
+        if arguments is None:
+            with self._lock:
+                self.skipped += 1
+            return
+        line = (
+            f'{{"start":{start!r},"name":{json.dumps(key)},'
+            f'"arguments":{arguments},"elapsed":{elapsed!r},'
+            f'"error":{json.dumps(error)}}}\n'
+        )
+        with self._lock:
+            self._file.write(line)
+
+    def flush(self) -> None:
+        """Flushes the recorded calls to the file."""
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        """Flushes the recorded calls, closing the file if it was opened by
+        the recorder."""
+        with self._lock:
+            if self._owned:
+                self._file.close()
+            else:
+                self._file.flush()
+
+
+def load(file: str | os.PathLike[str] | IO[str]) -> list[RecordedCall]:
+    """Reads the calls written by a `Recorder`, in the order they started."""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, encoding="utf-8") as f:
+            return load(f)
+    calls = []
+    for line in file:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        args, kwargs = record["arguments"]
+        calls.append(
+            RecordedCall(
+                record["start"],
+                record["name"],
+                tuple(args),
+                kwargs,
+                record["elapsed"],
+                record["error"],
+            )
+        )
+    calls.sort(key=lambda call: call.start)
+    return calls
+
+
+class ToolReport(TypedDict):
+    calls: int
+    errors: int
+    throughput: float
+    """Calls per second over the whole replay."""
+    p50_seconds: float
+    p90_seconds: float
+    p99_seconds: float
+    max_seconds: float
+
+
+class Report(TypedDict):
+    calls: int
+    errors: int
+    seconds: float
+    """The duration of the replay."""
+    throughput: float
+    """Calls per second."""
+    tools: dict[str, ToolReport]
+
+
+def replay(
+    mapping: Mapping,
+    calls: Iterable[RecordedCall] | str | os.PathLike[str],
+    /,
+    *,
+    concurrency: int = 1,
+    speed: float | None = None,
+) -> Report:
+    """Calls the tools of `mapping` with recorded traffic and reports the
+    throughput and latency percentiles per tool.
+
+    Args:
+        mapping (Mapping): The tools to call.
+        calls (Iterable[RecordedCall] | str | os.PathLike[str]): The calls, or
+            the path of a file written by a `Recorder`.
+        concurrency (int): The maximum number of calls in progress.
+        speed (float | None): If None, calls are made back to back. Otherwise
+            they start at their recorded times divided by `speed`, e.g. 2.0
+            for twice as fast as recorded, and latencies include the time
+            spent waiting for a free slot.
+
+    Returns:
+        Report: A JSON-serializable report. Failed calls count as errors,
+            regardless of whether they failed when recorded.
+    """
+    if isinstance(calls, (str, os.PathLike)):
+        recorded = load(calls)
+    else:
+        recorded = sorted(calls, key=lambda call: call.start)
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    lock = threading.Lock()
+
+    def run(call: RecordedCall, scheduled: float | None) -> None:
+        start = time.perf_counter() if scheduled is None else scheduled
+        failed = False
+        try:
+            result = mapping(call.name, *call.args, **call.kwargs)
+            if inspect.iscoroutine(result):
+                asyncio.run(result)
+        except Exception:
+            failed = True
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.setdefault(call.name, []).append(elapsed)
+            errors[call.name] = errors.get(call.name, 0) + failed
+
+    origin = recorded[0].start if recorded else 0.0
+    begin = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
+        for call in recorded:
+            scheduled = None
+            if speed is not None:
+                scheduled = begin + (call.start - origin) / speed
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            executor.submit(run, call, scheduled)
+    seconds = time.perf_counter() - begin
+    tools = {
+        name: _tool_report(values, errors[name], seconds)
+        for name, values in latencies.items()
+    }
+    return {
+        "calls": len(recorded),
+        "errors": sum(errors.values()),
+        "seconds": seconds,
+        "throughput": len(recorded) / seconds if seconds else 0.0,
+        "tools": tools,
+    }
+
+
+def _tool_report(latencies: list[float], errors: int, seconds: float) -> ToolReport:
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / seconds if seconds else 0.0,
+        "p50_seconds": _percentile(latencies, 0.5),
+        "p90_seconds": _percentile(latencies, 0.9),
+        "p99_seconds": _percentile(latencies, 0.99),
+        "max_seconds": latencies[-1],
+    }
+
+
+def _percentile(ordered: Sequence[float], q: float) -> float:
+    # The nearest-rank percentile of sorted values.
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
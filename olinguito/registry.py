@@ -0,0 +1,180 @@
+import collections.abc
+import threading
+import types
+from typing import Any
+
+from .fingerprinting import combine, encode
+from .indexing import Index
+from .instrumenting import Instrument
+from .limiting import Limit
+from .mapping import Mapping, _freeze
+from .pooling import ProcessPool
+from .wrapping import Wrapper, _to_tool_definition
+
+
+class Registry(Mapping):
+    """A `Mapping` whose tools can be registered and unregistered at runtime.
+
+    Registering, unregistering and membership tests take constant time.
+    Manifests are updated incrementally: only the definitions of tools
+    changed since the last request are encoded again.
+    """
+
+    _wrappers: dict[str, Wrapper[..., Any]]
+    _lock: threading.Lock
+    _version: int
+    _definitions: dict[str, collections.abc.Mapping[str, Any]]
+    _fragments: dict[str, bytes]
+    _stale: set[str]
+    _cached_manifest: tuple[int, tuple[collections.abc.Mapping[str, Any], ...]]
+    _cached_encoded: tuple[int, bytes]
+    _cached_fingerprint: tuple[int, str]
+    _search_index: Index
+    _unindexed: set[str]
+
+    def __init__(
+        self,
+        *wrappers: Wrapper[..., Any],
+        instruments: collections.abc.Iterable[Instrument] = (),
+        pool: ProcessPool | None = None,
+        limit: Limit | None = None,
+    ) -> None:
+        super().__init__(instruments=instruments, pool=pool, limit=limit)
+        wrappers_by_name: dict[str, Wrapper[..., Any]] = {}
+        object.__setattr__(self, "_wrappers", wrappers_by_name)
+        object.__setattr__(self, "data", types.MappingProxyType(wrappers_by_name))
+        object.__setattr__(self, "_lock", threading.Lock())
+        object.__setattr__(self, "_version", 0)
+        # Per-tool definitions and encoded fragments, filled in on demand.
+        object.__setattr__(self, "_definitions", {})
+        object.__setattr__(self, "_fragments", {})
+        object.__setattr__(self, "_stale", set())
+        object.__setattr__(self, "_cached_manifest", (-1, ()))
+        object.__setattr__(self, "_cached_encoded", (-1, b"[]"))
+        object.__setattr__(self, "_cached_fingerprint", (-1, ""))
+        object.__setattr__(self, "_search_index", Index())
+        object.__setattr__(self, "_unindexed", set())
+        for wrapper in wrappers:
+            self.register(wrapper)
+
+    def __iter__(self) -> collections.abc.Iterator[Wrapper[..., Any]]:
+        with self._lock:
+            wrappers = tuple(self._wrappers.values())
+        yield from wrappers
+
+    @property
+    def version(self) -> int:
+        """A counter incremented by every change to the registered tools."""
+        return self._version
+
+    def register(
+        self, wrapper: Wrapper[..., Any], /, *, replace: bool = False
+    ) -> Wrapper[..., Any]:
+        """Registers a wrapper under its name and returns it, so that it can
+        be used as a decorator.
+
+        Raises:
+            ValueError: If the name is taken and `replace` is False.
+        """
+        name = wrapper.name
+        with self._lock:
+            if not replace and name in self._wrappers:
+                raise ValueError(f"Tool already registered: {name!r}")
+            self._wrappers[name] = wrapper
+            self._definitions.pop(name, None)
+            self._fragments.pop(name, None)
+            self._stale.add(name)
+            self._unindexed.add(name)
+            self._bump()
+        return wrapper
+
+    def unregister(self, key: str | Wrapper[..., Any], /) -> Wrapper[..., Any]:
+        """Unregisters a tool by name or wrapper and returns its wrapper.
+
+        Raises:
+            KeyError: If the tool is not registered.
+        """
+        with self._lock:
+            if isinstance(key, str):
+                name = key
+            elif key in self:
+                name = key.name
+            else:
+                raise KeyError(key)
+            wrapper = self._wrappers.pop(name)
+            self._definitions.pop(name, None)
+            self._fragments.pop(name, None)
+            self._stale.discard(name)
+            self._unindexed.discard(name)
+            self._search_index.discard(name)
+            self._bump()
+        return wrapper
+
+    def _bump(self) -> None:
+        object.__setattr__(self, "_version", self._version + 1)
+
+    def _refresh(self) -> None:
+        # Must be called with the lock held.
+        for name in self._stale:
+            definition = _to_tool_definition(self._wrappers[name])
+            self._definitions[name] = _freeze(definition)
+            self._fragments[name] = encode(definition)
+        self._stale.clear()
+
+    @property  # type: ignore[override]
+    def manifest(self) -> tuple[collections.abc.Mapping[str, Any], ...]:
+        with self._lock:
+            version, manifest = self._cached_manifest
+            if version != self._version:
+                self._refresh()
+                manifest = tuple(self._definitions[k] for k in self._wrappers)
+                cached = (self._version, manifest)
+                object.__setattr__(self, "_cached_manifest", cached)
+            return manifest
+
+    def search(
+        self,
+        query: str = "",
+        /,
+        *,
+        prefix: str | None = None,
+        tags: collections.abc.Iterable[str] = (),
+        limit: int | None = None,
+    ) -> list[Wrapper[..., Any]]:
+        with self._lock:
+            # Tools registered since the last search are indexed now.
+            for name in self._unindexed:
+                self._search_index.add(self._wrappers[name])
+            self._unindexed.clear()
+            names = self._search_index.search(
+                query, prefix=prefix, tags=tags, limit=limit
+            )
+            return [self._wrappers[name] for name in names]
+
+    @property  # type: ignore[override]
+    def _manifest_fragments(self) -> collections.abc.Mapping[str, bytes]:
+        with self._lock:
+            self._refresh()
+            return types.MappingProxyType(self._fragments)
+
+    @property  # type: ignore[override]
+    def _encoded_manifest(self) -> bytes:
+        with self._lock:
+            version, encoded = self._cached_encoded
+            if version != self._version:
+                self._refresh()
+                fragments = [self._fragments[k] for k in self._wrappers]
+                encoded = b"[" + b",".join(fragments) + b"]"
+                cached = (self._version, encoded)
+                object.__setattr__(self, "_cached_encoded", cached)
+            return encoded
+
+    @property  # type: ignore[override]
+    def _fingerprint(self) -> str:
+        with self._lock:
+            version, fingerprint = self._cached_fingerprint
+            if version != self._version:
+                fingerprint = combine(w.fingerprint for w in self._wrappers.values())
+                cached = (self._version, fingerprint)
+                object.__setattr__(self, "_cached_fingerprint", cached)
+            return fingerprint
@@ -1,7 +1,12 @@
+import dataclasses
+import enum
+import functools
+import itertools
+import threading
 import types
 import typing
-from dataclasses import dataclass
-from typing import Any, List, Literal, NotRequired, TypeAlias, TypedDict
+from collections.abc import Callable
+from typing import Annotated, Any, Literal, NotRequired, TypeAlias, TypedDict, Union
 
 from . import typeguards
 
@@ -10,10 +15,14 @@ class _DescriptionDict(TypedDict):
     description: str
 
 
-@dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True)
 class _Mark:
     content: _DescriptionDict
 
+    def __hash__(self) -> int:
+        # Hashable marks keep `Annotated[..., description(...)]` cacheable.
+        return hash(tuple(self.content.items()))
+
 
 def description(text: str) -> _Mark:
     return _Mark({"description": text})
@@ -30,51 +39,200 @@ class _SchemaType(TypedDict):
     description: NotRequired[str]
     properties: NotRequired[dict[str, "_SchemaType"]]
     required: NotRequired[list[str]]
-    additionalProperties: NotRequired[Literal[False]]
+    additionalProperties: NotRequired[Literal[False] | "_SchemaType"]
+    prefixItems: NotRequired[list["_SchemaType"]]
+    minItems: NotRequired[int]
+    maxItems: NotRequired[int]
+    uniqueItems: NotRequired[bool]
     enum: NotRequired[list[int | str | bool]]
+    anyOf: NotRequired[list["_SchemaType"]]
 
 
 def to_schema_type(anno: Any, /) -> _SchemaType:
-    if anno is int:
-        return {"type": "integer"}
-    elif anno is float:
-        return {"type": "number"}
-    elif anno is str:
-        return {"type": "string"}
-    elif anno is bool:
-        return {"type": "boolean"}
-    elif typing.get_origin(anno) is Literal:
-        return _to_enum_schema_type(typing.get_args(anno))
-    elif typing.get_origin(anno) in (list, List):
-        return {"type": "array", "items": to_schema_type(typing.get_args(anno)[0])}
-    elif anno is types.NoneType:
-        return {"type": "null"}
-    elif typeguards.is_union(anno):
-        return _to_union_schema_type(anno)
-    elif typeguards.is_typeddict(anno):
-        return _to_typeddict_schema_type(anno)
-    elif typeguards.is_annotated(anno):
-        return _to_annotated_schema_type(anno)
-    raise TypeError
-
-
-def _to_enum_schema_type(values: tuple[int | str | bool, ...]) -> _SchemaType:
+    return _copy_json(_to_shared_schema_type(anno))
+
+
+def cache_info() -> functools._CacheInfo:
+    return _to_cached_schema_type.cache_info()
+
+
+def cache_clear() -> None:
+    _to_cached_schema_type.cache_clear()
+
+
+def _copy_json(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {k: _copy_json(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [_copy_json(v) for v in obj]
+    return obj
+
+
+def _to_shared_schema_type(anno: Any) -> _SchemaType:
+    # The returned schema may be shared with the cache and must not be mutated.
+    # `repr` is part of the key because typing considers `int | str` equal to
+    # `str | int` (and `Literal[1, 2]` to `Literal[2, 1]`), while the order is
+    # significant in the generated schema.
+    rep = repr(anno) if typing.get_args(anno) else None
+    try:
+        hash(anno)
+    except TypeError:
+        return _build_schema_type(anno)
+    return _to_cached_schema_type(anno, rep)
+
+
+@functools.lru_cache(maxsize=1024)
+def _to_cached_schema_type(anno: Any, rep: str | None) -> _SchemaType:
+    return _build_schema_type(anno)
+
+
+def _build_schema_type(anno: Any, defs: "_Definitions | None" = None) -> _SchemaType:
+    return _find_converter(anno)(anno, defs)
+
+
+_Converter: TypeAlias = Callable[[Any, "_Definitions | None"], _SchemaType]
+Converter: TypeAlias = Callable[[Any, Callable[[Any], _SchemaType]], _SchemaType]
+
+# Converters keyed by type, or by origin for generic aliases such as
+# `list[int]`. Classes not found are looked up by their bases.
+_converters: dict[Any, _Converter] = {}
+
+
+def register_converter(key: Any, converter: Converter | None = None, /) -> Any:
+    """Registers a function converting annotations to JSON schemas.
+
+    `key` is a type, which also covers its subclasses, or the origin of
+    generic aliases, e.g. `collections.deque` for `deque[int]`. The
+    converter is called with the annotation and a function converting
+    nested annotations, and returns a schema that it must not mutate
+    afterwards. It overrides any converter previously registered for
+    `key`.
+
+    It can be used as a decorator, as `@register_converter(key)`.
+    """
+    if converter is None:
+        return functools.partial(register_converter, key)
+
+    def convert(anno: Any, defs: "_Definitions | None") -> _SchemaType:
+        return converter(anno, functools.partial(_convert, defs=defs))
+
+    _converters[key] = convert
+    cache_clear()
+    return converter
+
+
+def _find_converter(anno: Any) -> _Converter:
+    # A single `get_origin` call and dictionary lookups for most annotations.
+    origin = typing.get_origin(anno)
+    try:
+        converter = _converters.get(anno if origin is None else origin)
+    except TypeError:
+        converter = None
+    if converter is not None:
+        return converter
+    if isinstance(anno, type):
+        if (
+            typeguards.is_typeddict(anno)
+            or typeguards.is_namedtuple(anno)
+            or dataclasses.is_dataclass(anno)
+        ):
+            return _to_named_schema_type
+        elif issubclass(anno, enum.Enum):
+            # Before the bases, which may include `int` or `str`.
+            return _converters[enum.Enum]
+        for base in anno.__mro__[1:]:
+            converter = _converters.get(base)
+            if converter is not None:
+                return converter
+    raise TypeError(f"Unsupported annotation: {anno!r}")
+
+
+def _args(anno: Any, count: int | None = None) -> tuple[Any, ...]:
+    args = typing.get_args(anno)
+    if not args or (count is not None and len(args) != count):
+        raise TypeError(f"Unsupported annotation: {anno!r}")
+    return args
+
+
+def _convert(anno: Any, defs: "_Definitions | None") -> _SchemaType:
+    # Schemas using `$defs` depend on the whole signature, so they bypass the
+    # cache.
+    if defs is None:
+        return _to_shared_schema_type(anno)
+    return _build_schema_type(anno, defs)
+
+
+def _to_primitive_schema_type(keyword: TypeKeyword) -> _Converter:
+    def convert(anno: Any, defs: "_Definitions | None") -> _SchemaType:
+        return {"type": keyword}
+
+    return convert
+
+
+def _to_literal_schema_type(anno: Any, defs: "_Definitions | None") -> _SchemaType:
+    return _to_enum_schema_type(typing.get_args(anno), defs)
+
+
+def _to_enum_class_schema_type(
+    anno: type[enum.Enum], defs: "_Definitions | None"
+) -> _SchemaType:
+    values = tuple(member.value for member in anno)
+    if not values:
+        raise TypeError(f"Empty Enum: {anno.__name__!r}")
+    return _to_enum_schema_type(values, defs)
+
+
+def _to_enum_schema_type(
+    values: tuple[int | str | bool, ...], defs: "_Definitions | None"
+) -> _SchemaType:
     vtypes = {type(v) for v in values}
     allowed_types = {int, str, bool}
     if not vtypes <= allowed_types:
         raise TypeError(f"Invalid Literal types: {vtypes}")
     if len(vtypes) > 1:
         raise TypeError(f"Mixed types in Literal: {vtypes}")
-    schema = to_schema_type(type(values[0]))
+    schema = _convert(type(values[0]), defs).copy()
     schema["enum"] = list(values)
     return schema
 
 
-def _to_union_schema_type(anno: typeguards.UnionOrAlias) -> _SchemaType:
+def _to_list_schema_type(anno: Any, defs: "_Definitions | None") -> _SchemaType:
+    return {"type": "array", "items": _convert(_args(anno, 1)[0], defs)}
+
+
+def _to_set_schema_type(anno: Any, defs: "_Definitions | None") -> _SchemaType:
+    items = _convert(_args(anno, 1)[0], defs)
+    return {"type": "array", "items": items, "uniqueItems": True}
+
+
+def _to_tuple_schema_type(anno: Any, defs: "_Definitions | None") -> _SchemaType:
+    args = _args(anno)
+    if len(args) == 2 and args[1] is Ellipsis:
+        return {"type": "array", "items": _convert(args[0], defs)}
+    return {
+        "type": "array",
+        "prefixItems": [_convert(arg, defs) for arg in args],
+        "minItems": len(args),
+        "maxItems": len(args),
+    }
+
+
+def _to_dict_schema_type(anno: Any, defs: "_Definitions | None") -> _SchemaType:
+    key, value = _args(anno, 2)
+    if key is not str:
+        raise TypeError(f"Unsupported dict key type: {key!r}")
+    return {"type": "object", "additionalProperties": _convert(value, defs)}
+
+
+def _to_union_schema_type(
+    anno: typeguards.UnionOrAlias, defs: "_Definitions | None"
+) -> _SchemaType:
+    members = [_convert(arg, defs) for arg in typing.get_args(anno)]
+    if not all(map(_is_mergeable, members)):
+        return typing.cast(_SchemaType, {"anyOf": members})
     arguments: list[TypeKeyword] = []
     schemas: list[_SchemaType] = []
-    for arg in typing.get_args(anno):
-        schema = to_schema_type(arg)
+    for schema in members:
         typ = schema["type"]
         if isinstance(typ, list):
             raise TypeError(f"Unexpected symbol: '{typ}'")
@@ -95,12 +253,49 @@ def _to_union_schema_type(anno: typeguards.UnionOrAlias) -> _SchemaType:
     return result
 
 
-def _to_typeddict_schema_type(anno: typeguards.SubTypedDict) -> _SchemaType:
+_MERGEABLE_KEYWORDS = frozenset(
+    ("type", "properties", "required", "additionalProperties", "items")
+)
+
+
+def _is_mergeable(schema: _SchemaType) -> bool:
+    # Only schemas of a single type, without keywords that a `type` list would
+    # drop, can be merged; unlike references, alternatives (`anyOf` or `type`
+    # lists), enumerations, tuples, sets and maps.
+    return (
+        isinstance(schema.get("type"), str)
+        and schema.keys() <= _MERGEABLE_KEYWORDS
+        and not isinstance(schema.get("additionalProperties"), dict)
+    )
+
+
+_building = threading.local()
+
+
+def _to_named_schema_type(anno: type[Any], defs: "_Definitions | None") -> _SchemaType:
+    # `TypedDict`s, dataclasses and `NamedTuple`s, which can be recursive.
+    if defs is not None:
+        return defs.ref(anno)
+    building: set[Any] = _building.__dict__.setdefault("types", set())
+    if anno in building:
+        raise TypeError(
+            f"Recursive type: {anno.__name__!r}; generate the schema with "
+            "`$defs` instead"
+        )
+    building.add(anno)
+    try:
+        return _to_object_schema_type(anno, None)
+    finally:
+        building.discard(anno)
+
+
+def _to_object_schema_type(anno: type[Any], defs: "_Definitions | None") -> _SchemaType:
     properties = {}
     required = []
-    for field, field_type in typing.get_type_hints(anno).items():
-        properties[field] = to_schema_type(field_type)
-        required.append(field)
+    for field, field_type, is_required in _get_fields(anno):
+        properties[field] = _convert(field_type, defs)
+        if is_required:
+            required.append(field)
     return {
         "type": "object",
         "properties": properties,
@@ -109,12 +304,136 @@ def _to_typeddict_schema_type(anno: typeguards.SubTypedDict) -> _SchemaType:
     }
 
 
-def _to_annotated_schema_type(anno: typeguards.AnnoAlias) -> _SchemaType:
+def _get_fields(anno: Any) -> list[tuple[str, Any, bool]]:
+    """Returns the name, type and whether it is required of each field of a
+    `TypedDict`, dataclass or `NamedTuple`."""
+    hints = _get_type_hints(anno)
+    if dataclasses.is_dataclass(anno):
+        return [
+            (f.name, hints[f.name], _is_required(f))
+            for f in dataclasses.fields(anno)
+            if f.init
+        ]
+    elif typeguards.is_namedtuple(anno):
+        defaults = anno._field_defaults
+        return [(f, hints[f], f not in defaults) for f in anno._fields]
+    return [(f, t, True) for f, t in hints.items()]
+
+
+def _is_required(field: "dataclasses.Field[Any]") -> bool:
+    return (
+        field.default is dataclasses.MISSING
+        and field.default_factory is dataclasses.MISSING
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_type_hints(anno: Any) -> dict[str, Any]:
+    return typing.get_type_hints(anno)
+
+
+def _to_annotated_schema_type(
+    anno: typeguards.AnnoAlias, defs: "_Definitions | None"
+) -> _SchemaType:
     origin = anno.__origin__
     marks = [m for m in anno.__metadata__ if isinstance(m, _Mark)]
     if len(marks) > 1:
         raise ValueError
     elif len(marks) == 1:
-        return {**marks[0].content, **to_schema_type(origin)}
+        return {**marks[0].content, **_convert(origin, defs)}
     else:
-        return to_schema_type(origin)
+        return _convert(origin, defs)
+
+
+_converters.update(
+    {
+        int: _to_primitive_schema_type("integer"),
+        float: _to_primitive_schema_type("number"),
+        str: _to_primitive_schema_type("string"),
+        bool: _to_primitive_schema_type("boolean"),
+        types.NoneType: _to_primitive_schema_type("null"),
+        Literal: _to_literal_schema_type,
+        list: _to_list_schema_type,
+        set: _to_set_schema_type,
+        frozenset: _to_set_schema_type,
+        tuple: _to_tuple_schema_type,
+        dict: _to_dict_schema_type,
+        Union: _to_union_schema_type,
+        types.UnionType: _to_union_schema_type,
+        Annotated: _to_annotated_schema_type,
+        enum.Enum: _to_enum_class_schema_type,
+    }
+)
+
+
+class _Definitions:
+    """Collects the schemas of `TypedDict`s referenced with `$ref`.
+
+    Each `TypedDict` is named after its class, with a numeric suffix for
+    distinct classes sharing a name, in order of first use.
+    """
+
+    def __init__(self) -> None:
+        self.schemas: dict[str, _SchemaType] = {}
+        self._names: dict[Any, str] = {}
+
+    def to_schema_type(self, anno: Any, /) -> _SchemaType:
+        return _build_schema_type(anno, self)
+
+    def ref(self, anno: type[Any]) -> _SchemaType:
+        name = self._names.get(anno)
+        if name is None:
+            name = anno.__name__
+            for i in itertools.count(2):
+                if name not in self.schemas:
+                    break
+                name = f"{anno.__name__}_{i}"
+            self._names[anno] = name
+            # The placeholder terminates self-references while building.
+            self.schemas[name] = {}  # type: ignore[typeddict-item]
+            self.schemas[name] = _to_object_schema_type(anno, self)
+        return typing.cast(_SchemaType, {"$ref": f"#/$defs/{name}"})
+
+    def inline_unshared(self, *roots: _SchemaType) -> None:
+        """Inlines the definitions referenced only once and not recursive."""
+        refs: dict[str, list[dict[str, Any]]] = {name: [] for name in self.schemas}
+        graph: dict[str, set[str]] = {}
+        for root in roots:
+            _collect_refs(root, refs)
+        for name, schema in self.schemas.items():
+            graph[name] = set()
+            for ref, nodes in _collect_refs(schema, {}).items():
+                graph[name].add(ref)
+                refs[ref] += nodes
+        for name, nodes in refs.items():
+            if len(nodes) == 1 and not _reaches(graph, name, name):
+                node = nodes[0]
+                del node["$ref"]
+                node.update(self.schemas.pop(name))
+
+
+def _collect_refs(
+    obj: Any, refs: dict[str, list[dict[str, Any]]]
+) -> dict[str, list[dict[str, Any]]]:
+    if isinstance(obj, dict):
+        if "$ref" in obj:
+            refs.setdefault(obj["$ref"].removeprefix("#/$defs/"), []).append(obj)
+        for v in obj.values():
+            _collect_refs(v, refs)
+    elif isinstance(obj, list):
+        for v in obj:
+            _collect_refs(v, refs)
+    return refs
+
+
+def _reaches(graph: dict[str, set[str]], start: str, goal: str) -> bool:
+    seen: set[str] = set()
+    stack = list(graph[start])
+    while stack:
+        name = stack.pop()
+        if name == goal:
+            return True
+        if name not in seen:
+            seen.add(name)
+            stack += graph[name]
+    return False
@@ -0,0 +1,277 @@
+import dataclasses
+import enum
+import functools
+import inspect
+import json
+import threading
+import types
+import typing
+from collections.abc import Callable
+from typing import Annotated, Any, Literal, TypeAlias, Union
+
+from . import typeguards
+from .schema import _args, _get_fields
+
+Serializer: TypeAlias = Callable[[Any], bytes]
+# Converts a value to JSON-compatible data; `None` where the value already is.
+_Converter: TypeAlias = Callable[[Any], Any]
+
+
+def compile_serializer(func: Callable[..., Any]) -> Serializer:
+    """Compiles a serializer for the results of a function.
+
+    Results are converted to JSON values as their return annotation
+    dictates, e.g. dataclasses and `NamedTuple`s to objects, enums to their
+    values and sets to arrays, and encoded like manifests: compactly and in
+    UTF-8. Parts of the annotation that are JSON types already, such as a
+    `list` of `TypedDict`s of strings and numbers, are passed to the encoder
+    as they are instead of being traversed.
+
+    Results of functions without a return annotation, and values whose
+    annotation is not supported, are converted by inspecting them.
+
+    Args:
+        func (Callable[..., Any]): The function whose results are serialized.
+
+    Returns:
+        Callable[[Any], bytes]: A function returning the encoded result, or
+            raising `TypeError` for values that cannot be encoded.
+    """
+    anno = inspect.signature(func).return_annotation
+    convert = _to_json if anno is inspect.Signature.empty else _to_converter(anno)
+    if convert is None:
+
+        def serialize(result: Any) -> bytes:
+            return _encode(result).encode()
+
+    else:
+
+        def serialize(result: Any) -> bytes:
+            return _encode(convert(result)).encode()
+
+    return serialize
+
+
+def _to_json(value: Any) -> Any:
+    # Converts a value by inspecting it, for unannotated results.
+    if type(value) in _SCALARS:
+        return value
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {k: _to_json(v) for k, v in value.items()}
+    if typeguards.is_namedtuple(type(value)):
+        return {k: _to_json(v) for k, v in zip(value._fields, value)}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_to_json(v) for v in value]
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {
+            f.name: _to_json(getattr(value, f.name))
+            for f in dataclasses.fields(value)
+            if f.init
+        }
+    # Other scalars, e.g. subclasses of `str`, are left to the encoder.
+    return value
+
+
+_SCALARS = frozenset((str, int, float, bool, types.NoneType))
+
+
+def _default(value: Any) -> Any:
+    # Called by the encoder for values not matching their annotation, e.g. a
+    # dataclass returned for a `dict`.
+    result = _to_json(value)
+    if result is value:
+        name = type(value).__name__
+        raise TypeError(f"Object of type {name} is not JSON serializable")
+    return result
+
+
+# Results are trees, so the encoder skips tracking the containers it is in to
+# detect cycles; a cyclic result raises `RecursionError` instead.
+_encode = json.JSONEncoder(
+    ensure_ascii=False, separators=(",", ":"), check_circular=False, default=_default
+).encode
+
+
+def _to_converter(anno: Any) -> _Converter | None:
+    try:
+        hash(anno)
+    except TypeError:
+        return _build_converter(anno)
+    rep = repr(anno) if typing.get_args(anno) else None
+    if getattr(_building, "types", None):
+        # While a named type is built, converters may refer to its incomplete
+        # converter, so they are kept in a cache of this thread until the
+        # outermost named type is built, rather than where other threads
+        # would find them.
+        built: dict[Any, _Converter | None] = _building.__dict__.setdefault("built", {})
+        if (anno, rep) not in built:
+            built[anno, rep] = _build_converter(anno)
+        return built[anno, rep]
+    return _to_cached_converter(anno, rep)
+
+
+@functools.lru_cache(maxsize=1024)
+def _to_cached_converter(anno: Any, rep: str | None) -> _Converter | None:
+    # See `schema._to_shared_schema_type` for why `repr` is part of the key.
+    return _build_converter(anno)
+
+
+def _build_converter(anno: Any) -> _Converter | None:
+    # Mirrors `schema._find_converter`.
+    origin = typing.get_origin(anno)
+    try:
+        build = _builders.get(anno if origin is None else origin)
+    except TypeError:
+        build = None
+    try:
+        if build is not None:
+            return build(anno)
+        if isinstance(anno, type):
+            if (
+                typeguards.is_typeddict(anno)
+                or typeguards.is_namedtuple(anno)
+                or dataclasses.is_dataclass(anno)
+            ):
+                return _named_converter(anno)
+            elif issubclass(anno, enum.Enum):
+                return _enum_value
+    except TypeError:
+        # E.g. `list` without arguments, or `dict[int, str]`.
+        pass
+    # Types converted by `register_converter` functions, `Any` and the like.
+    return _to_json
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def _list_converter(anno: Any) -> _Converter | None:
+    item = _to_converter(_args(anno, 1)[0])
+    if item is None:
+        return None
+    return lambda value: [item(v) for v in value]
+
+
+def _set_converter(anno: Any) -> _Converter | None:
+    item = _to_converter(_args(anno, 1)[0])
+    if item is None:
+        return list
+    return lambda value: [item(v) for v in value]
+
+
+def _tuple_converter(anno: Any) -> _Converter | None:
+    # Tuples are encoded as arrays already.
+    args = _args(anno)
+    if len(args) == 2 and args[1] is Ellipsis:
+        return _list_converter(list[args[0]])  # type: ignore[valid-type]
+    items = [_to_converter(arg) for arg in args]
+    if not any(items):
+        return None
+    return lambda value: [
+        v if item is None else item(v) for item, v in zip(items, value)
+    ]
+
+
+def _dict_converter(anno: Any) -> _Converter | None:
+    key, value_type = _args(anno, 2)
+    if key is not str:
+        raise TypeError(f"Unsupported dict key type: {key!r}")
+    item = _to_converter(value_type)
+    if item is None:
+        return None
+    return lambda value: {k: item(v) for k, v in value.items()}
+
+
+def _union_converter(anno: Any) -> _Converter | None:
+    args = typing.get_args(anno)
+    members = [_to_converter(a) for a in args]
+    if not any(members):
+        return None
+    if len(args) == 2 and types.NoneType in args:
+        # Optional values need no inspection to pick the member.
+        (member,) = filter(None, members)
+        return lambda value: None if value is None else member(value)
+    return _to_json
+
+
+_building = threading.local()
+
+
+def _named_converter(anno: Any) -> _Converter | None:
+    # `TypedDict`s, dataclasses and `NamedTuple`s.
+    building: dict[Any, _Converter] = _building.__dict__.setdefault("types", {})
+    if anno in building:
+        return building[anno]
+    names: list[str] = []
+    # Filled in after this returns to recursive references.
+    converted: list[tuple[str, _Converter]] = []
+    if typeguards.is_typeddict(anno):
+
+        def convert(value: Any) -> Any:
+            if not isinstance(value, dict):
+                return _to_json(value)
+            result = dict(value)
+            for name, field in converted:
+                if name in result:
+                    result[name] = field(result[name])
+            return result
+
+    elif typeguards.is_namedtuple(anno):
+
+        def convert(value: Any) -> Any:
+            if not isinstance(value, anno):  # type: ignore[arg-type]
+                return _to_json(value)
+            result = dict(zip(names, value))
+            for name, field in converted:
+                result[name] = field(result[name])
+            return result
+
+    else:
+
+        def convert(value: Any) -> Any:
+            if not isinstance(value, anno):
+                return _to_json(value)
+            result = {name: getattr(value, name) for name in names}
+            for name, field in converted:
+                result[name] = field(result[name])
+            return result
+
+    building[anno] = convert
+    try:
+        for name, field_type, _ in _get_fields(anno):
+            names.append(name)
+            field = _to_converter(field_type)
+            if field is not None:
+                converted.append((name, field))
+    finally:
+        del building[anno]
+        if not building:
+            _building.__dict__.pop("built", None)
+    if not converted and typeguards.is_typeddict(anno):
+        return None
+    return convert
+
+
+def _constant(converter: _Converter | None) -> Callable[[Any], _Converter | None]:
+    return lambda anno: converter
+
+
+_builders: dict[Any, Callable[[Any], _Converter | None]] = {
+    int: _constant(None),
+    float: _constant(None),
+    str: _constant(None),
+    bool: _constant(None),
+    types.NoneType: _constant(None),
+    Literal: _constant(None),
+    list: _list_converter,
+    set: _set_converter,
+    frozenset: _set_converter,
+    tuple: _tuple_converter,
+    dict: _dict_converter,
+    Union: _union_converter,
+    types.UnionType: _union_converter,
+    Annotated: lambda anno: _to_converter(anno.__origin__),
+}
@@ -0,0 +1,454 @@
+import json
+import re
+from collections.abc import Mapping
+from typing import Any, NoReturn
+
+from .schema import TypeKeyword
+from .validating import ValidationError, Validator, _expected, _unique
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING_RUN = re.compile(r'[^"\\\x00-\x1f]*')
+_INTEGER = re.compile(r"-?(?:0|[1-9][0-9]*)")
+_NUMBER_RUN = re.compile(r"[-+0-9.eE]*")
+_LITERAL_RUN = re.compile(r"[a-z]*")
+# A trailing escape that the next chunk may complete.
+_PARTIAL_ESCAPE = re.compile(
+    r"(?:\\u[dD][89abAB][0-9a-fA-F]{2})?(?:\\u[0-9a-fA-F]{0,3})?$"
+)
+_LITERALS: dict[str, Any] = {"true": True, "false": False, "null": None}
+_KINDS = {
+    "{": "object",
+    "[": "array",
+    '"': "string",
+    "t": "boolean",
+    "f": "boolean",
+    "n": "null",
+    "-": "number",
+    **dict.fromkeys("0123456789", "number"),
+}
+_ANY: Mapping[str, Any] = {}
+
+# Frame states
+_OBJECT_START = 0  # after `{`
+_OBJECT_KEY = 1  # after `,`
+_OBJECT_COLON = 2
+_OBJECT_VALUE = 3
+_OBJECT_NEXT = 4
+_ARRAY_START = 5  # after `[`
+_ARRAY_VALUE = 6  # after `,`
+_ARRAY_NEXT = 7
+
+
+class _Frame:
+    __slots__ = ("candidates", "value", "key", "state")
+
+    def __init__(self, candidates: list[Mapping[str, Any]], value: Any, state: int):
+        self.candidates = candidates
+        self.value = value
+        self.key: str | None = None
+        self.state = state
+
+
+class _Scalar:
+    __slots__ = ("kind", "candidates", "parts", "escape")
+
+    def __init__(self, kind: str, candidates: list[Mapping[str, Any]]) -> None:
+        self.kind = kind  # A JSON type, or "key" for property names.
+        self.candidates = candidates
+        self.parts: list[str] = []
+        self.escape = False
+
+
+class ArgumentStream:
+    """Parses and validates JSON arguments arriving in chunks.
+
+    Each chunk is checked as soon as it is fed, so that arguments are
+    rejected as early as they can no longer conform to the schema, e.g. on a
+    property, type or enum value it does not allow. The arguments are
+    returned once their object closes, without parsing them again.
+
+    When the schema leaves a value ambiguous between alternatives, the early
+    checks are conservative and the complete arguments are checked with
+    `validator`, if given.
+    """
+
+    def __init__(
+        self, schema: Mapping[str, Any], validator: Validator | None = None
+    ) -> None:
+        self._defs: Mapping[str, Any] = schema.get("$defs", {})
+        self._validator = validator
+        self._root = self._expand(schema)
+        self._stack: list[_Frame] = []
+        self._scalar: _Scalar | None = None
+        self._ambiguous = False
+        self._done = False
+        self._result: Any = None
+        self._error: ValidationError | None = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the arguments are complete."""
+        return self._done
+
+    def feed(self, chunk: str) -> dict[str, Any] | None:
+        """Consumes a chunk of JSON text.
+
+        Returns:
+            dict[str, Any] | None: The arguments once complete, else `None`.
+
+        Raises:
+            ValidationError: If the text so far is not valid JSON or cannot
+                conform to the schema anymore. The stream is then unusable.
+        """
+        if self._error is not None:
+            raise self._error
+        try:
+            self._consume(chunk)
+            self._check_prefix()
+        except ValidationError as e:
+            self._error = e
+            raise
+        return self._result if self._done else None
+
+    def close(self) -> dict[str, Any]:
+        """Returns the complete arguments.
+
+        Raises:
+            ValidationError: If the arguments are invalid or incomplete.
+        """
+        if self._error is not None:
+            raise self._error
+        if not self._done:
+            self._error = ValidationError("$", "unexpected end of input")
+            raise self._error
+        return self._result
+
+    def _consume(self, chunk: str) -> None:
+        i, n = 0, len(chunk)
+        while i < n:
+            if self._scalar is not None:
+                i = self._continue_scalar(chunk, i)
+                continue
+            i = _WHITESPACE.match(chunk, i).end()  # type: ignore[union-attr]
+            if i == n:
+                break
+            ch = chunk[i]
+            if self._done:
+                self._syntax_error(ch)
+            if not self._stack:
+                self._start_value(ch, self._root)
+                i += 1
+                continue
+            frame = self._stack[-1]
+            state = frame.state
+            if state == _OBJECT_VALUE or state == _ARRAY_VALUE:
+                self._start_value(ch, self._child_candidates(frame))
+            elif state == _ARRAY_START:
+                if ch == "]":
+                    self._close_array()
+                else:
+                    self._start_value(ch, self._child_candidates(frame))
+            elif state == _OBJECT_START or state == _OBJECT_KEY:
+                if ch == '"':
+                    self._scalar = _Scalar("key", frame.candidates)
+                elif ch == "}" and state == _OBJECT_START:
+                    self._close_object()
+                else:
+                    self._syntax_error(ch)
+            elif state == _OBJECT_COLON:
+                if ch != ":":
+                    self._syntax_error(ch)
+                frame.state = _OBJECT_VALUE
+            elif ch == ",":
+                frame.state = _OBJECT_KEY if state == _OBJECT_NEXT else _ARRAY_VALUE
+            elif ch == "}" and state == _OBJECT_NEXT:
+                self._close_object()
+            elif ch == "]" and state == _ARRAY_NEXT:
+                self._close_array()
+            else:
+                self._syntax_error(ch)
+            i += 1
+
+    def _continue_scalar(self, chunk: str, i: int) -> int:
+        scalar = self._scalar
+        assert scalar is not None
+        if scalar.kind == "number" or scalar.kind in ("boolean", "null"):
+            run = _NUMBER_RUN if scalar.kind == "number" else _LITERAL_RUN
+            end = run.match(chunk, i).end()  # type: ignore[union-attr]
+            scalar.parts.append(chunk[i:end])
+            if end < len(chunk):
+                self._scalar = None
+                self._finish_scalar(scalar)
+            return end
+        n = len(chunk)
+        while i < n:
+            if scalar.escape:
+                scalar.parts.append(chunk[i])
+                scalar.escape = False
+                i += 1
+                continue
+            end = _STRING_RUN.match(chunk, i).end()  # type: ignore[union-attr]
+            scalar.parts.append(chunk[i:end])
+            if end == n:
+                return end
+            if chunk[end] == '"':
+                self._scalar = None
+                self._finish_scalar(scalar)
+                return end + 1
+            if chunk[end] != "\\":
+                self._fail(self._path(), "invalid JSON string")
+            scalar.parts.append("\\")
+            scalar.escape = True
+            i = end + 1
+        return i
+
+    def _start_value(self, ch: str, candidates: list[Mapping[str, Any]]) -> None:
+        kind = _KINDS.get(ch)
+        if kind is None:
+            self._syntax_error(ch)
+        admitted = [c for c in candidates if _admits(c, kind)]
+        if not admitted:
+            self._fail(self._path(), _mismatch(candidates))
+        if len(admitted) > 1:
+            self._ambiguous = True
+        if kind == "object":
+            self._stack.append(_Frame(admitted, {}, _OBJECT_START))
+        elif kind == "array":
+            self._stack.append(_Frame(admitted, [], _ARRAY_START))
+        else:
+            self._scalar = _Scalar(kind, admitted)
+            if kind != "string":
+                self._scalar.parts.append(ch)
+
+    def _finish_scalar(self, scalar: _Scalar) -> None:
+        raw = "".join(scalar.parts)
+        if scalar.kind in ("boolean", "null"):
+            if raw not in _LITERALS:
+                self._fail(self._path(), f"invalid literal {raw!r}")
+            value = _LITERALS[raw]
+        elif scalar.kind == "number" and _INTEGER.fullmatch(raw):
+            value = int(raw)
+        elif scalar.kind != "number" and "\\" not in raw:
+            value = raw
+        else:
+            if scalar.kind != "number":
+                raw = f'"{raw}"'
+            try:
+                value = json.loads(raw)
+            except ValueError:
+                kind = "number" if scalar.kind == "number" else "string"
+                self._fail(self._path(), f"invalid JSON {kind}")
+        if scalar.kind == "key":
+            self._set_key(value)
+            return
+        candidates = [c for c in scalar.candidates if _accepts(c, value)]
+        if not candidates:
+            self._fail(self._path(), _mismatch(scalar.candidates, value))
+        self._attach(value)
+
+    def _set_key(self, key: str) -> None:
+        frame = self._stack[-1]
+        candidates = [c for c in frame.candidates if _allows(c, key)]
+        if not candidates:
+            if len(frame.candidates) == 1:
+                message = f"unexpected properties: {key}"
+            else:
+                message = "must match one of the alternatives"
+            self._fail(self._path(-1), message)
+        frame.candidates = candidates
+        frame.key = key
+        frame.state = _OBJECT_COLON
+
+    def _close_object(self) -> None:
+        frame = self._stack[-1]
+        keys = frame.value.keys()
+        candidates = [c for c in frame.candidates if keys >= set(c.get("required", ()))]
+        if not candidates:
+            if len(frame.candidates) == 1:
+                missing = set(frame.candidates[0]["required"]) - keys
+                message = "missing properties: " + ", ".join(sorted(missing))
+            else:
+                message = "must match one of the alternatives"
+            self._fail(self._path(-1), message)
+        self._stack.pop()
+        self._attach(frame.value)
+
+    def _close_array(self) -> None:
+        frame = self._stack[-1]
+        items = frame.value
+        candidates = [c for c in frame.candidates if len(items) >= c.get("minItems", 0)]
+        if not candidates:
+            if len(frame.candidates) == 1:
+                count = frame.candidates[0]["minItems"]
+                message = f"must have at least {count} items"
+            else:
+                message = "must match one of the alternatives"
+            self._fail(self._path(-1), message)
+        if any(c.get("uniqueItems") for c in candidates) and not _unique(items):
+            candidates = [c for c in candidates if not c.get("uniqueItems")]
+            if not candidates:
+                self._fail(self._path(-1), "must have unique items")
+        self._stack.pop()
+        self._attach(items)
+
+    def _attach(self, value: Any) -> None:
+        if not self._stack:
+            if self._ambiguous and self._validator is not None:
+                self._validator(value)
+            self._result = value
+            self._done = True
+            return
+        frame = self._stack[-1]
+        if frame.state == _OBJECT_VALUE:
+            frame.value[frame.key] = value
+            frame.state = _OBJECT_NEXT
+        else:
+            frame.value.append(value)
+            frame.state = _ARRAY_NEXT
+
+    def _child_candidates(self, frame: _Frame) -> list[Mapping[str, Any]]:
+        children: list[Mapping[str, Any]] = []
+        if frame.state == _OBJECT_VALUE:
+            for candidate in frame.candidates:
+                properties = candidate.get("properties", {})
+                if frame.key in properties:
+                    schema = properties[frame.key]
+                else:
+                    schema = candidate.get("additionalProperties", _ANY)
+                    if not isinstance(schema, Mapping):
+                        schema = _ANY
+                children += self._expand(schema)
+            return children
+        index = len(frame.value)
+        candidates = [
+            c for c in frame.candidates if index < c.get("maxItems", index + 1)
+        ]
+        if not candidates:
+            if len(frame.candidates) == 1:
+                count = frame.candidates[0]["maxItems"]
+                message = f"must have at most {count} items"
+            else:
+                message = "must match one of the alternatives"
+            self._fail(self._path(-1), message)
+        frame.candidates = candidates
+        for candidate in candidates:
+            prefix = candidate.get("prefixItems", ())
+            if index < len(prefix):
+                children += self._expand(prefix[index])
+            else:
+                children += self._expand(candidate.get("items", _ANY))
+        return children
+
+    def _expand(self, schema: Mapping[str, Any]) -> list[Mapping[str, Any]]:
+        # Flattens references and alternatives into plain schemas.
+        if "$ref" in schema:
+            ref = schema["$ref"]
+            if not ref.startswith("#/$defs/"):
+                raise TypeError(f"Unsupported reference: '{ref}'")
+            return self._expand(self._defs[ref.removeprefix("#/$defs/")])
+        if "anyOf" in schema:
+            return [s for alt in schema["anyOf"] for s in self._expand(alt)]
+        return [schema]
+
+    def _check_prefix(self) -> None:
+        # Rejects a scalar split across chunks as soon as no completion of it
+        # could be accepted.
+        scalar = self._scalar
+        if scalar is None:
+            return
+        raw = "".join(scalar.parts)
+        if scalar.kind in ("boolean", "null"):
+            if not any(word.startswith(raw) for word in _LITERALS):
+                self._fail(self._path(), f"invalid literal {raw!r}")
+        elif scalar.kind == "number":
+            if any(c in raw for c in ".eE") and not any(
+                _admits(c, "number", fraction=True) for c in scalar.candidates
+            ):
+                self._fail(self._path(), _mismatch(scalar.candidates, 0.5))
+        elif scalar.kind == "key":
+            closed = [c for c in scalar.candidates if not _allows(c, None)]
+            if len(closed) == len(scalar.candidates):
+                prefix = _decode_prefix(raw, scalar.escape)
+                if prefix is not None and not any(
+                    name.startswith(prefix)
+                    for c in closed
+                    for name in c.get("properties", {})
+                ):
+                    if len(closed) == 1:
+                        message = f"no property starts with {prefix!r}"
+                    else:
+                        message = "must match one of the alternatives"
+                    self._fail(self._path(-1), message)
+        elif all("enum" in c for c in scalar.candidates):
+            prefix = _decode_prefix(raw, scalar.escape)
+            if prefix is not None and not any(
+                isinstance(v, str) and v.startswith(prefix)
+                for c in scalar.candidates
+                for v in c["enum"]
+            ):
+                self._fail(self._path(), _mismatch(scalar.candidates, prefix))
+
+    def _path(self, stop: int | None = None) -> str:
+        parts = ["$"]
+        for frame in self._stack[:stop]:
+            if frame.state == _OBJECT_VALUE:
+                parts.append(f".{frame.key}")
+            elif frame.state in (_ARRAY_START, _ARRAY_VALUE):
+                parts.append(f"[{len(frame.value)}]")
+        return "".join(parts)
+
+    def _syntax_error(self, ch: str) -> NoReturn:
+        self._fail(self._path(), f"unexpected character {ch!r}")
+
+    def _fail(self, path: str, message: str) -> NoReturn:
+        raise ValidationError(path, message)
+
+
+def _types(schema: Mapping[str, Any]) -> list[TypeKeyword] | None:
+    typ = schema.get("type")
+    if typ is None:
+        return None
+    return typ if isinstance(typ, list) else [typ]
+
+
+def _admits(schema: Mapping[str, Any], kind: str, fraction: bool = False) -> bool:
+    types = _types(schema)
+    if types is None:
+        return True
+    if kind == "number" and not fraction and "integer" in types:
+        return True
+    return kind in types
+
+
+def _accepts(schema: Mapping[str, Any], value: Any) -> bool:
+    if isinstance(value, float) and not _admits(schema, "number", fraction=True):
+        return False
+    if "enum" in schema:
+        return any(type(v) is type(value) and v == value for v in schema["enum"])
+    return True
+
+
+def _allows(schema: Mapping[str, Any], key: str | None) -> bool:
+    # With `None`, whether any property name is allowed.
+    return key in schema.get("properties", {}) or (
+        schema.get("additionalProperties", True) is not False
+    )
+
+
+def _mismatch(candidates: list[Mapping[str, Any]], value: Any = ...) -> str:
+    if len(candidates) != 1:
+        return "must match one of the alternatives"
+    schema = candidates[0]
+    if value is not ... and "enum" in schema:
+        return f"must be one of {schema['enum']!r}"
+    return _expected(_types(schema) or [])
+
+
+def _decode_prefix(raw: str, escape: bool) -> str | None:
+    if escape:
+        raw = raw[:-1]
+    raw = _PARTIAL_ESCAPE.sub("", raw)
+    try:
+        return json.loads(f'"{raw}"')
+    except ValueError:
+        return None
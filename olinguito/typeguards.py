@@ -22,6 +22,7 @@ def is_union(obj: Any) -> TypeGuard[UnionOrAlias]:
 
 
 class SubTypedDict(Protocol):
+    __name__: str
     __annotations__: dict[str, Any]
 
 
@@ -31,3 +32,18 @@ def is_typeddict(obj: Any) -> TypeGuard[SubTypedDict]:
         and issubclass(obj, dict)
         and hasattr(obj, "__annotations__")
     )
+
+
+class SubNamedTuple(Protocol):
+    __name__: str
+    _fields: tuple[str, ...]
+    _field_defaults: dict[str, Any]
+
+
+def is_namedtuple(obj: Any) -> TypeGuard[SubNamedTuple]:
+    return (
+        inspect.isclass(obj)
+        and issubclass(obj, tuple)
+        and hasattr(obj, "_fields")
+        and hasattr(obj, "__annotations__")
+    )
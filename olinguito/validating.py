@@ -0,0 +1,270 @@
+import itertools
+import json
+from collections.abc import Callable, Iterator, Mapping
+from typing import Any
+
+from .schema import TypeKeyword
+
+Validator = Callable[[Any], None]
+
+
+class ValidationError(ValueError):
+    """Raised when a value does not conform to a JSON schema."""
+
+    def __init__(self, path: str, message: str) -> None:
+        super().__init__(f"{path}: {message}")
+        self.path = path
+        """The JSON path of the invalid value, e.g. `$.user.tags[0]`."""
+        self.message = message
+        """The reason why the value is invalid."""
+
+
+_TYPE_CHECKS: dict[TypeKeyword, str] = {
+    "integer": "(isinstance({v}, int) and not isinstance({v}, bool))",
+    "number": "(isinstance({v}, (int, float)) and not isinstance({v}, bool))",
+    "string": "isinstance({v}, str)",
+    "boolean": "isinstance({v}, bool)",
+    "null": "{v} is None",
+    "object": "isinstance({v}, dict)",
+    "array": "isinstance({v}, list)",
+}
+
+
+def compile_validator(schema: Mapping[str, Any]) -> Validator:
+    """Compiles a JSON schema into a specialized validator function.
+
+    The schema is translated once into straight-line Python source, so that
+    validating a value does not walk the schema dictionary. Object schemas
+    occurring more than once, and `$ref` targets, are compiled into a single
+    shared helper function.
+
+    Args:
+        schema (Mapping[str, Any]): The JSON schema to compile.
+
+    Returns:
+        Callable[[Any], None]: A function raising `ValidationError` for the
+            first value that does not conform to the schema.
+
+    Raises:
+        TypeError: If the schema contains unsupported keywords.
+    """
+    source, constants = _translate(schema)
+    namespace: dict[str, Any] = {
+        "_error": ValidationError,
+        "_unique": _unique,
+        **constants,
+    }
+    exec(compile(source, "<olinguito validator>", "exec"), namespace)
+    validate: Validator = namespace["validate"]
+    return validate
+
+
+def _translate(schema: Mapping[str, Any]) -> tuple[str, dict[str, Any]]:
+    # Returns the source defining `validate` and the constants it refers to.
+    compiler = _Compiler(schema.get("$defs", {}))
+    body = list(compiler.compile(schema, "v0", ("'$'",), 1, inline=True))
+    main = "\n".join(["def validate(v0):", *body, "    return None"])
+    return "\n\n".join([main, *compiler.helpers]), compiler.constants
+
+
+class _Compiler:
+    def __init__(self, defs: Mapping[str, Any]) -> None:
+        self.constants: dict[str, Any] = {}
+        self.helpers: list[str] = []
+        self._defs = defs
+        self._functions: dict[str, str] = {}
+        self._counter = itertools.count(1)
+
+    def constant(self, value: Any) -> str:
+        name = f"_c{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def function(self, schema: Mapping[str, Any]) -> str:
+        # Helper functions report paths relative to their argument; callers
+        # prefix them with their own path.
+        key = json.dumps(schema, sort_keys=True)
+        name = self._functions.get(key)
+        if name is None:
+            name = self._functions[key] = f"_f{len(self._functions)}"
+            body = list(self.compile(schema, "v0", ("''",), 1, inline=True))
+            self.helpers.append(
+                "\n".join([f"def {name}(v0):", *body, "    return None"])
+            )
+        return name
+
+    def compile(
+        self,
+        schema: Mapping[str, Any],
+        var: str,
+        path: tuple[str, ...],
+        depth: int,
+        inline: bool = False,
+    ) -> Iterator[str]:
+        ind = "    " * depth
+        if "$ref" in schema:
+            ref = schema["$ref"]
+            if not ref.startswith("#/$defs/"):
+                raise TypeError(f"Unsupported reference: '{ref}'")
+            target = self.function(self._defs[ref.removeprefix("#/$defs/")])
+            yield from self._call(target, var, path, ind)
+            return
+        if "anyOf" in schema:
+            targets = [self.function(s) for s in schema["anyOf"]]
+            yield f"{ind}for _alt in ({', '.join(targets)},):"
+            yield f"{ind}    try:"
+            yield f"{ind}        _alt({var})"
+            yield f"{ind}        break"
+            yield f"{ind}    except _error:"
+            yield f"{ind}        pass"
+            yield f"{ind}else:"
+            msg = "must match one of the alternatives"
+            yield f"{ind}    raise _error({_join(path)}, {msg!r})"
+            return
+        if not inline and _is_object(schema):
+            yield from self._call(self.function(schema), var, path, ind)
+            return
+        typ = schema["type"]
+        types: list[TypeKeyword] = typ if isinstance(typ, list) else [typ]
+        for t in types:
+            if t not in _TYPE_CHECKS:
+                raise TypeError(f"Unsupported type: '{t}'")
+        check = " or ".join(_TYPE_CHECKS[t].format(v=var) for t in types)
+        yield f"{ind}if not ({check}):"
+        yield f"{ind}    raise _error({_join(path)}, {_expected(types)!r})"
+        if "enum" in schema:
+            enum = self.constant(frozenset(schema["enum"]))
+            yield f"{ind}if {var} not in {enum}:"
+            msg = f"must be one of {schema['enum']!r}"
+            yield f"{ind}    raise _error({_join(path)}, {msg!r})"
+        if _is_object(schema):
+            obj = list(self._compile_object(schema, var, path, depth + 1))
+            yield from self._guard(types, "object", var, ind, obj)
+        if not schema.keys().isdisjoint(_ARRAY_KEYWORDS):
+            arr = list(self._compile_array(schema, var, path, depth + 1))
+            yield from self._guard(types, "array", var, ind, arr)
+
+    def _call(
+        self, function: str, var: str, path: tuple[str, ...], ind: str
+    ) -> Iterator[str]:
+        yield f"{ind}try:"
+        yield f"{ind}    {function}({var})"
+        yield f"{ind}except _error as _e:"
+        yield f"{ind}    raise _error({_join(path)} + _e.path, _e.message) from None"
+
+    def _guard(
+        self,
+        types: list[TypeKeyword],
+        typ: TypeKeyword,
+        var: str,
+        ind: str,
+        lines: list[str],
+    ) -> Iterator[str]:
+        if types == [typ]:
+            # The type check above already narrowed the value.
+            yield from (line[4:] for line in lines)
+        else:
+            yield f"{ind}if {_TYPE_CHECKS[typ].format(v=var)}:"
+            yield from lines
+
+    def _compile_object(
+        self, schema: Mapping[str, Any], var: str, path: tuple[str, ...], depth: int
+    ) -> Iterator[str]:
+        ind = "    " * depth
+        properties = schema.get("properties", {})
+        required = schema.get("required", [])
+        if required:
+            req = self.constant(frozenset(required))
+            yield f"{ind}if not {req} <= {var}.keys():"
+            yield (
+                f"{ind}    raise _error({_join(path)}, 'missing properties: '"
+                f" + ', '.join(sorted({req} - {var}.keys())))"
+            )
+        if schema.get("additionalProperties", True) is False:
+            props = self.constant(frozenset(properties))
+            yield f"{ind}if not {var}.keys() <= {props}:"
+            yield (
+                f"{ind}    raise _error({_join(path)}, 'unexpected properties: '"
+                f" + ', '.join(sorted(map(str, {var}.keys() - {props}))))"
+            )
+        additional = schema.get("additionalProperties", True)
+        if isinstance(additional, Mapping):
+            n = next(self._counter)
+            key, child = f"k{n}", f"v{n}"
+            yield f"{ind}for {key}, {child} in {var}.items():"
+            child_path = (*path, "'.'", key)
+            if properties:
+                props = self.constant(frozenset(properties))
+                yield f"{ind}    if {key} not in {props}:"
+                yield from self.compile(additional, child, child_path, depth + 2)
+            else:
+                yield from self.compile(additional, child, child_path, depth + 1)
+        for name, subschema in properties.items():
+            child = f"v{next(self._counter)}"
+            child_path = (*path, repr(f".{name}"))
+            key = repr(name)
+            if name in required:
+                yield f"{ind}{child} = {var}[{key}]"
+                yield from self.compile(subschema, child, child_path, depth)
+            else:
+                yield f"{ind}if {key} in {var}:"
+                yield f"{ind}    {child} = {var}[{key}]"
+                yield from self.compile(subschema, child, child_path, depth + 1)
+
+    def _compile_array(
+        self, schema: Mapping[str, Any], var: str, path: tuple[str, ...], depth: int
+    ) -> Iterator[str]:
+        ind = "    " * depth
+        if "minItems" in schema:
+            yield f"{ind}if len({var}) < {schema['minItems']}:"
+            msg = f"must have at least {schema['minItems']} items"
+            yield f"{ind}    raise _error({_join(path)}, {msg!r})"
+        if "maxItems" in schema:
+            yield f"{ind}if len({var}) > {schema['maxItems']}:"
+            msg = f"must have at most {schema['maxItems']} items"
+            yield f"{ind}    raise _error({_join(path)}, {msg!r})"
+        prefix = schema.get("prefixItems", [])
+        for i, subschema in enumerate(prefix):
+            child = f"v{next(self._counter)}"
+            yield f"{ind}if len({var}) > {i}:"
+            yield f"{ind}    {child} = {var}[{i}]"
+            child_path = (*path, repr(f"[{i}]"))
+            yield from self.compile(subschema, child, child_path, depth + 1)
+        if "items" in schema:
+            n = next(self._counter)
+            index, child = f"i{n}", f"v{n}"
+            items = f"{var}[{len(prefix)}:]" if prefix else var
+            yield f"{ind}for {index}, {child} in enumerate({items}, {len(prefix)}):"
+            child_path = (*path, "'['", f"str({index})", "']'")
+            yield from self.compile(schema["items"], child, child_path, depth + 1)
+        if schema.get("uniqueItems"):
+            yield f"{ind}if not _unique({var}):"
+            yield f"{ind}    raise _error({_join(path)}, 'must have unique items')"
+
+
+_ARRAY_KEYWORDS = ("items", "prefixItems", "minItems", "maxItems", "uniqueItems")
+
+
+def _is_object(schema: Mapping[str, Any]) -> bool:
+    return (
+        "properties" in schema
+        or "required" in schema
+        or isinstance(schema.get("additionalProperties"), Mapping)
+    )
+
+
+def _unique(items: list[Any]) -> bool:
+    # Compares JSON values by their canonical encoding, so that `1` and `True`
+    # are distinct.
+    keys = {json.dumps(item, sort_keys=True) for item in items}
+    return len(keys) == len(items)
+
+
+def _join(path: tuple[str, ...]) -> str:
+    return " + ".join(path)
+
+
+def _expected(types: list[TypeKeyword]) -> str:
+    if len(types) == 1:
+        return f"must be of type '{types[0]}'"
+    return "must be of type " + " or ".join(f"'{t}'" for t in types)
@@ -1,16 +1,44 @@
+import asyncio
 import functools
-from collections.abc import Callable
-from dataclasses import dataclass
-from typing import Generic, ParamSpec, TypeVar
+import inspect
+import threading
+import weakref
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any, Generic, ParamSpec, TypeVar, overload
 
-from .generating import JsonSchema, generate_json_schema
+from . import fingerprinting, interning
+from .caching import ResultCache
+from .decoding import ArgumentsDecoder, compile_decoder
+from .generating import (
+    Dialect,
+    JsonSchema,
+    _find_dialect,
+    generate_json_schema,
+    generate_output_schema,
+)
+from .limiting import Limit
+from .schema import _copy_json, _SchemaType
+from .serializing import Serializer, compile_serializer
+from .streaming import ArgumentStream
+from .validating import Validator, compile_validator
 
 _P = ParamSpec("_P")
 _R = TypeVar("_R")
 
 
+class _Attributes:
+    # The attributes of `Wrapper` computed on first access, which are left
+    # unset until then. Declared outside the dataclass, as they are not fields.
+    _fingerprint: str
+    _decoder: ArgumentsDecoder
+    _returns: _SchemaType | None
+    _serializer: Serializer
+    _rendered: dict[Dialect, tuple[JsonSchema, bytes]]
+
+
 @dataclass
-class Wrapper(Generic[_P, _R]):
+class Wrapper(_Attributes, Generic[_P, _R]):
     """A callable wrapper class with JSON schema metadata for its signature
     and documentation.
     """
@@ -21,6 +49,20 @@ class Wrapper(Generic[_P, _R]):
     """The JSON schema representation of the function's signature."""
     doc: str
     """The docstring of the wrapped function."""
+    cache: ResultCache | None = field(default=None, repr=False, compare=False)
+    """The cache of results for pure functions, or `None`."""
+    tags: frozenset[str] = field(default=frozenset(), repr=False)
+    """Labels for selecting the tool with `Mapping.search`."""
+    limit: Limit | None = field(default=None, repr=False, compare=False)
+    """The admission control of calls through a `Mapping`, or `None`."""
+    validator: Validator = field(init=False, repr=False, compare=False)
+    """The validator compiled from `parameters`."""
+    is_async: bool = field(init=False, repr=False, compare=False)
+    """Whether the wrapped function is a coroutine function."""
+
+    def __post_init__(self) -> None:
+        self.validator = compile_validator(self.parameters)
+        self.is_async = inspect.iscoroutinefunction(self.func)
 
     @property
     def name(self) -> str:
@@ -28,15 +70,351 @@ class Wrapper(Generic[_P, _R]):
         return self.func.__name__
 
     def __call__(self, *args: _P.args, **kwargs: _P.kwargs) -> _R:
+        if self.cache is not None:
+            if self.is_async:
+                return self.cache.acall(self.func, args, kwargs)  # type: ignore
+            return self.cache.call(self.func, args, kwargs)  # type: ignore
         return self.func(*args, **kwargs)
 
+    async def acall(self, *args: _P.args, **kwargs: _P.kwargs) -> Any:
+        """Calls the wrapped function from asynchronous code.
+
+        Coroutine functions are awaited, while synchronous functions are
+        offloaded to a thread so that they do not block the event loop.
+        """
+        if self.is_async:
+            return await self(*args, **kwargs)  # type: ignore[misc]
+        return await asyncio.to_thread(self, *args, **kwargs)
+
+    @property
+    def fingerprint(self) -> str:
+        """A SHA-256 digest of the tool's definition in manifests, which
+        changes if and only if its encoding does.
+
+        Computed on first access.
+        """
+        try:
+            return self._fingerprint
+        except AttributeError:
+            definition = fingerprinting.encode(_to_tool_definition(self))
+            fingerprint = fingerprinting.fingerprint(definition)
+            self._fingerprint = fingerprint
+            return fingerprint
+
+    @property
+    def decoder(self) -> ArgumentsDecoder:
+        """The decoder compiled from the wrapped function's annotations.
+
+        Compiled on first access.
+        """
+        try:
+            return self._decoder
+        except AttributeError:
+            self._decoder = compile_decoder(self.func)
+            return self._decoder
+
+    def decode(self, args: dict[str, Any]) -> dict[str, Any]:
+        """Validates keyword arguments and converts them to the annotated types.
+
+        Raises:
+            DecodeError: If the arguments are invalid, listing every error.
+        """
+        return self.decoder(args)
+
+    def call_decoded(self, args: dict[str, Any]) -> _R:
+        """Decodes keyword arguments and calls the wrapped function with them.
+
+        Raises:
+            DecodeError: If the arguments are invalid, listing every error.
+        """
+        return self(**self.decoder(args))  # type: ignore[arg-type, call-arg]
+
+    @property
+    def returns(self) -> _SchemaType | None:
+        """The JSON schema of the wrapped function's return annotation, or
+        `None` if it has none.
+
+        Generated on first access, and not part of the tool's definition.
+
+        Raises:
+            TypeError: If the annotation is not supported.
+        """
+        try:
+            return self._returns
+        except AttributeError:
+            self._returns = generate_output_schema(self.func)
+            return self._returns
+
+    @property
+    def serializer(self) -> Serializer:
+        """The serializer compiled from the wrapped function's return
+        annotation.
+
+        Compiled on first access.
+        """
+        try:
+            return self._serializer
+        except AttributeError:
+            self._serializer = compile_serializer(self.func)
+            return self._serializer
+
+    def serialize(self, result: _R) -> bytes:
+        """Encodes a result of the wrapped function as compact UTF-8 JSON.
+
+        Raises:
+            TypeError: If the result cannot be encoded.
+        """
+        return self.serializer(result)
+
+    def render(self, dialect: str) -> JsonSchema:
+        """Renders `parameters` in a dialect registered with
+        `register_dialect`.
+
+        Rendered on first call per dialect, along with the tool's definition
+        in manifests; each call returns a copy of the rendered schema.
+
+        Raises:
+            KeyError: If the dialect is not registered.
+            TypeError: If the schema cannot be expressed in the dialect.
+        """
+        return _copy_json(self._render(dialect)[0])
+
+    def _render(self, dialect: str) -> tuple[JsonSchema, bytes]:
+        # Keyed by renderer, so that a dialect registered again is rendered
+        # again.
+        renderer = _find_dialect(dialect)
+        try:
+            cache = self._rendered
+        except AttributeError:
+            cache = self._rendered = {}
+        rendered = cache.get(renderer)
+        if rendered is None:
+            parameters = renderer(self.parameters)
+            definition = fingerprinting.encode(_to_tool_definition(self, parameters))
+            rendered = cache.setdefault(renderer, (parameters, definition))
+        return rendered
+
+    def stream(self) -> ArgumentStream:
+        """Starts parsing and validating JSON arguments fed in chunks, e.g.
+        as a model streams them.
+
+        Returns:
+            ArgumentStream: A stream rejecting the arguments as soon as they
+                can no longer conform to `parameters`.
+        """
+        return ArgumentStream(self.parameters, self.validator)
+
+    def validate(self, args: dict[str, Any]) -> None:
+        """Validates keyword arguments against `parameters`.
+
+        Raises:
+            ValidationError: If the arguments do not conform to the schema.
+        """
+        self.validator(args)
+
+    def call_validated(self, args: dict[str, Any]) -> _R:
+        """Validates keyword arguments and calls the wrapped function with them.
+
+        Raises:
+            ValidationError: If the arguments do not conform to the schema.
+        """
+        self.validator(args)
+        return self(**args)  # type: ignore[arg-type, call-arg]
+
 
-def wrap(func: Callable[_P, _R]) -> Wrapper[_P, _R]:
+def _to_tool_definition(
+    wrapper: Wrapper[..., Any], parameters: JsonSchema | None = None
+) -> dict[str, Any]:
+    return {
+        "name": wrapper.name,
+        "description": wrapper.doc,
+        "parameters": wrapper.parameters if parameters is None else parameters,
+    }
+
+
+class _LazyWrapper(Wrapper[_P, _R]):
+    """A `Wrapper` generating `parameters` and `validator` on first access."""
+
+    def __init__(
+        self,
+        func: Callable[_P, _R],
+        doc: str,
+        cache: ResultCache | None,
+        tags: frozenset[str],
+        limit: Limit | None,
+        use_defs: bool,
+        compact: bool = False,
+    ) -> None:
+        self.func = func
+        self.doc = doc
+        self.cache = cache
+        self.tags = tags
+        self.limit = limit
+        self.is_async = inspect.iscoroutinefunction(func)
+        self._use_defs = use_defs
+        self._compact = compact
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called while the attributes are not yet set.
+        if name not in ("parameters", "validator"):
+            raise AttributeError(name)
+        with self._lock:
+            try:
+                return object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+            parameters = generate_json_schema(self.func, use_defs=self._use_defs)
+            if self._compact:
+                parameters = interning.intern(parameters)
+                self.validator = _shared_validator(parameters)
+            else:
+                self.validator = compile_validator(parameters)
+            self.parameters = parameters
+        return object.__getattribute__(self, name)
+
+
+class _CompactWrapper(Wrapper[_P, _R]):
+    """A `Wrapper` with an interned schema and a validator compiled on first
+    use, which keeps its attributes in slots and reads the metadata of the
+    wrapped function from `func` instead of copying it."""
+
+    # Its inherited instance dict is never created, unless other attributes
+    # are set.
+    __slots__ = (
+        "func",
+        "parameters",
+        "doc",
+        "cache",
+        "tags",
+        "limit",
+        "validator",
+        "is_async",
+        "_fingerprint",
+        "_decoder",
+        "_returns",
+        "_serializer",
+        "_rendered",
+    )
+
+    def __post_init__(self) -> None:
+        self.is_async = inspect.iscoroutinefunction(self.func)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called while the validator is not yet set.
+        if name != "validator":
+            raise AttributeError(name)
+        self.validator = _shared_validator(self.parameters)
+        return self.validator
+
+    @property
+    def __wrapped__(self) -> Callable[_P, _R]:
+        return self.func
+
+    @property
+    def __name__(self) -> str:  # type: ignore[override]
+        return self.func.__name__
+
+    @property
+    def __doc__(self) -> str:  # type: ignore[override]
+        return self.doc
+
+
+# Validators of interned schemas by `id`, discarded with their schema.
+_validators: dict[int, Validator] = {}
+_validators_lock = threading.Lock()
+
+
+def _shared_validator(parameters: Any) -> Validator:
+    # Tools with equal interned schemas share a validator.
+    with _validators_lock:
+        validator = _validators.get(id(parameters))
+        if validator is None:
+            validator = _validators[id(parameters)] = compile_validator(parameters)
+            weakref.finalize(parameters, _validators.pop, id(parameters), None)
+    return validator
+
+
+def _restore(
+    func: Callable[_P, _R],
+    doc: str,
+    parameters: JsonSchema,
+    validator: Validator,
+    cache: ResultCache | None,
+    tags: frozenset[str],
+    limit: Limit | None,
+) -> Wrapper[_P, _R]:
+    # Builds a wrapper from a schema and validator generated beforehand,
+    # without introspecting `func`.
+    w = _LazyWrapper(func, doc, cache, tags, limit, "$defs" in parameters)
+    w.parameters = parameters
+    w.validator = validator
+    functools.update_wrapper(w, func)
+    return w
+
+
+@overload
+def wrap(
+    func: Callable[_P, _R],
+    *,
+    lazy: bool = ...,
+    use_defs: bool = ...,
+    cache: ResultCache | bool = ...,
+    tags: Iterable[str] = ...,
+    compact: bool = ...,
+    limit: Limit | None = ...,
+) -> Wrapper[_P, _R]: ...
+
+
+@overload
+def wrap(
+    func: None = ...,
+    *,
+    lazy: bool = ...,
+    use_defs: bool = ...,
+    cache: ResultCache | bool = ...,
+    tags: Iterable[str] = ...,
+    compact: bool = ...,
+    limit: Limit | None = ...,
+) -> Callable[[Callable[_P, _R]], Wrapper[_P, _R]]: ...
+
+
+def wrap(
+    func: Callable[_P, _R] | None = None,
+    *,
+    lazy: bool = False,
+    use_defs: bool = False,
+    cache: ResultCache | bool = False,
+    tags: Iterable[str] = (),
+    compact: bool = False,
+    limit: Limit | None = None,
+) -> Wrapper[_P, _R] | Callable[[Callable[_P, _R]], Wrapper[_P, _R]]:
     """Wraps a function, attaching JSON schema metadata for its signature and
     retaining its documentation.
 
+    It can be used as `@wrap` or, to pass options, as `@wrap(lazy=True)`.
+
     Args:
         func (Callable[..., Any]): The function to be wrapped.
+        lazy (bool): If True, the JSON schema and validator are generated on
+            first access instead of at wrap time, so errors for unsupported
+            annotations are deferred until then.
+        use_defs (bool): If True, `TypedDict`s used more than once or
+            recursively are emitted once under `$defs` and referenced with
+            `$ref`.
+        cache (ResultCache | bool): Marks the function as pure, caching its
+            results and collapsing identical concurrent calls. True uses a
+            `ResultCache` with default settings.
+        tags (Iterable[str]): Labels for selecting the tool with
+            `Mapping.search`.
+        compact (bool): If True, the JSON schema is interned: it is read-only
+            and shares equal subschemas, and its validator, with every other
+            compact wrapper. The validator is compiled on first use, and
+            `__name__` and `__doc__` are read from the function rather than
+            copied.
+        limit (Limit | None): Bounds the concurrency and rate of calls
+            through a `Mapping`, which waits for admission or rejects the
+            calls over the limit.
 
     Returns:
         Wrapper[..., Any]: A Wrapper instance.
@@ -44,9 +422,43 @@ def wrap(func: Callable[_P, _R]) -> Wrapper[_P, _R]:
     Raises:
         TypeError: If the function does not have a docstring.
     """
+    options: dict[str, Any] = {
+        "lazy": lazy,
+        "use_defs": use_defs,
+        "cache": cache,
+        "tags": tags,
+        "compact": compact,
+        "limit": limit,
+    }
+    if func is None:
+        return functools.partial(_wrap, **options)  # type: ignore[return-value]
+    return _wrap(func, **options)
+
+
+def _wrap(
+    func: Callable[_P, _R],
+    *,
+    lazy: bool,
+    use_defs: bool,
+    cache: ResultCache | bool,
+    tags: Iterable[str],
+    compact: bool,
+    limit: Limit | None,
+) -> Wrapper[_P, _R]:
     doc = func.__doc__
     if doc is None:
         raise TypeError
-    w = Wrapper(func, generate_json_schema(func), doc)
+    result_cache = ResultCache() if cache is True else cache or None
+    labels = frozenset(tags)
+    if lazy:
+        w: Wrapper[_P, _R] = _LazyWrapper(
+            func, doc, result_cache, labels, limit, use_defs, compact
+        )
+    elif compact:
+        schema = interning.intern(generate_json_schema(func, use_defs=use_defs))
+        return _CompactWrapper(func, schema, doc, result_cache, labels, limit)
+    else:
+        schema = generate_json_schema(func, use_defs=use_defs)
+        w = Wrapper(func, schema, doc, result_cache, labels, limit)
     functools.update_wrapper(w, func)
     return w
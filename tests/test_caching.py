@@ -0,0 +1,189 @@
+import asyncio
+import threading
+
+import pytest
+
+import olinguito
+
+
+def _counting(func):
+    calls = []
+
+    def wrapper(*args, **kwargs):
+        calls.append((args, kwargs))
+        return func(*args, **kwargs)
+
+    return wrapper, calls
+
+
+class Test_ResultCache:
+    def test_hits(self):
+        cache = olinguito.ResultCache()
+        func, calls = _counting(lambda x, y: x + y)
+        assert cache.call(func, (), {"x": 1, "y": 2}) == 3
+        assert cache.call(func, (), {"y": 2, "x": 1}) == 3
+        assert cache.call(func, (), {"x": 2, "y": 2}) == 4
+        assert len(calls) == 2
+        info = cache.info()
+        assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
+
+    def test_canonical_keys(self):
+        cache = olinguito.ResultCache()
+        func, calls = _counting(lambda x: repr(x))
+        assert cache.call(func, (1,), {}) == "1"
+        assert cache.call(func, (True,), {}) == "True"
+        assert cache.call(func, (1.0,), {}) == "1.0"
+        assert cache.call(func, ({"a": [1], "b": None},), {}) == "{'a': [1], 'b': None}"
+        assert cache.call(func, ({"b": None, "a": [1]},), {}) == "{'a': [1], 'b': None}"
+        assert len(calls) == 4
+
+    def test_bound_arguments(self):
+        cache = olinguito.ResultCache()
+        calls = []
+
+        def power(x: int, y: int = 2) -> int:
+            calls.append((x, y))
+            return x**y
+
+        assert cache.call(power, (3,), {}) == 9
+        assert cache.call(power, (), {"x": 3}) == 9
+        assert cache.call(power, (3, 2), {}) == 9
+        assert cache.call(power, (), {"y": 2, "x": 3}) == 9
+        assert cache.call(power, (3,), {"y": 3}) == 27
+        assert calls == [(3, 2), (3, 3)]
+        with pytest.raises(TypeError):
+            cache.call(power, (), {"z": 1})
+
+    def test_wrapper_positional_and_keyword(self):
+        calls = []
+
+        @olinguito.wrap(cache=True)
+        def square(x: int) -> int:
+            """Squares an integer."""
+            calls.append(x)
+            return x * x
+
+        mapping = olinguito.Mapping(square)
+        assert square(3) == 9
+        assert square(x=3) == 9
+        assert mapping.dispatch_json('{"name": "square", "arguments": {"x": 3}}') == 9
+        assert calls == [3]
+
+    def test_shared(self):
+        cache = olinguito.ResultCache()
+
+        @olinguito.wrap(cache=cache)
+        def double(x: int) -> int:
+            """Doubles an integer."""
+            return 2 * x
+
+        @olinguito.wrap(cache=cache)
+        def triple(x: int) -> int:
+            """Triples an integer."""
+            return 3 * x
+
+        assert double(3) == 6
+        assert triple(3) == 9
+        assert double(3) == 6
+        info = cache.info()
+        assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
+
+    def test_uncacheable_arguments(self):
+        cache = olinguito.ResultCache()
+        func, calls = _counting(lambda x: len(x))
+        assert cache.call(func, ({1, 2},), {}) == 2
+        assert cache.call(func, ({1, 2},), {}) == 2
+        assert len(calls) == 2
+
+    def test_lru(self):
+        cache = olinguito.ResultCache(maxsize=2)
+        func, calls = _counting(lambda x: x)
+        for x in (1, 2, 1, 3, 1, 2):
+            cache.call(func, (x,), {})
+        assert [args for args, _ in calls] == [(1,), (2,), (3,), (2,)]
+
+    def test_ttl(self):
+        cache = olinguito.ResultCache(ttl=0)
+        func, calls = _counting(lambda x: x)
+        cache.call(func, (1,), {})
+        cache.call(func, (1,), {})
+        assert len(calls) == 2
+
+    def test_exceptions_are_not_cached(self):
+        cache = olinguito.ResultCache()
+        func, calls = _counting(lambda x: 1 / x)
+        for _ in range(2):
+            with pytest.raises(ZeroDivisionError):
+                cache.call(func, (0,), {})
+        assert len(calls) == 2
+
+    def test_single_flight(self):
+        cache = olinguito.ResultCache()
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow(x):
+            started.set()
+            release.wait(5)
+            return x
+
+        func, calls = _counting(slow)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.call(func, (1,), {})))
+            for _ in range(4)
+        ]
+        threads[0].start()
+        started.wait(5)
+        for t in threads[1:]:
+            t.start()
+        while cache.info().joined < 3:
+            pass
+        release.set()
+        for t in threads:
+            t.join()
+        assert results == [1, 1, 1, 1]
+        assert len(calls) == 1
+
+    def test_single_flight_async(self):
+        cache = olinguito.ResultCache()
+        calls = []
+
+        async def slow(x):
+            calls.append(x)
+            await asyncio.sleep(0.01)
+            return x
+
+        async def main():
+            return await asyncio.gather(
+                *(cache.acall(slow, (1,), {}) for _ in range(4))
+            )
+
+        assert asyncio.run(main()) == [1, 1, 1, 1]
+        assert calls == [1]
+        assert cache.info().joined == 3
+        assert asyncio.run(cache.acall(slow, (1,), {})) == 1
+        assert calls == [1]
+
+    def test_single_flight_async_exception(self):
+        cache = olinguito.ResultCache()
+
+        async def fail(x):
+            await asyncio.sleep(0.01)
+            raise ValueError(x)
+
+        async def main():
+            return await asyncio.gather(
+                *(cache.acall(fail, (1,), {}) for _ in range(2)),
+                return_exceptions=True,
+            )
+
+        first, second = asyncio.run(main())
+        assert isinstance(first, ValueError)
+        assert second is first
+
+    def test_clear(self):
+        cache = olinguito.ResultCache()
+        cache.call(lambda x: x, (1,), {})
+        cache.clear()
+        assert cache.info() == (0, 0, 0, 128, 0)
@@ -0,0 +1,133 @@
+import importlib
+import sys
+import warnings
+
+import pytest
+
+import olinguito
+from olinguito import __main__, compiling
+
+_TOOLS = '''\
+import enum
+from typing import Annotated, Literal, TypedDict
+
+import olinguito
+
+
+class Color(enum.Enum):
+    RED = "red"
+    GREEN = "green"
+
+
+class Tree(TypedDict):
+    value: int
+    children: list["Tree"]
+
+
+@olinguito.wrap(lazy=True, use_defs=True, tags=["garden"])
+def grow(tree: Tree, color: Color, mode: Literal["a", "b"] = "a") -> str:
+    """Grows a tree."""
+    return mode
+
+
+@olinguito.wrap(lazy=True, cache=True)
+def water(amount: Annotated[float, olinguito.description("Liters.")]) -> float:
+    """Waters the garden."""
+    return amount
+
+
+def prune(branches: list[int] | None) -> int:
+    """Prunes branches."""
+    return len(branches or [])
+
+
+mapping = olinguito.Mapping(grow, water, olinguito.wrap(prune))
+'''
+
+
+@pytest.fixture
+def tools(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "garden.py").write_text(_TOOLS)
+    importlib.invalidate_caches()
+    yield importlib.import_module("garden")
+    for name in ("garden", "garden_catalog"):
+        sys.modules.pop(name, None)
+
+
+def _write_catalog(tools, tmp_path):
+    source = olinguito.compile_catalog(tools.mapping)
+    (tmp_path / "garden_catalog.py").write_text(source)
+    importlib.invalidate_caches()
+    return source
+
+
+class Test_compile_catalog:
+    def test_deterministic(self, tools):
+        source = olinguito.compile_catalog(tools.mapping)
+        assert source == olinguito.compile_catalog(tools.mapping)
+        compile(source, "garden_catalog.py", "exec")
+
+    def test_not_importable(self):
+        @olinguito.wrap
+        def local(x: int) -> int:
+            """Not at the top level of a module."""
+            return x
+
+        with pytest.raises(ValueError):
+            olinguito.compile_catalog([local])
+
+
+class Test_load_catalog:
+    def test_load(self, tools, tmp_path):
+        _write_catalog(tools, tmp_path)
+        sys.modules.pop("garden", None)
+        wrappers = olinguito.load_catalog("garden_catalog")
+        garden = sys.modules["garden"]
+        # Nothing was introspected, not even the lazy wrappers of the module.
+        assert "parameters" not in vars(garden.grow)
+        assert [w.name for w in wrappers] == ["grow", "water", "prune"]
+        assert [w.parameters for w in wrappers] == [
+            w.parameters for w in garden.mapping
+        ]
+        grow, water, prune = wrappers
+        assert grow.tags == frozenset({"garden"})
+        assert grow.func is garden.grow.func
+        assert water.cache is garden.water.cache
+        assert prune.func is garden.prune
+        tree = {"value": 1, "children": [{"value": 2}]}
+        with pytest.raises(olinguito.ValidationError) as excinfo:
+            grow.validate({"tree": tree, "color": "red", "mode": "a"})
+        assert excinfo.value.path == "$.tree.children[0]"
+        assert prune.call_validated({"branches": [1, 2]}) == 2
+        mapping = olinguito.Mapping(*wrappers)
+        assert mapping.fingerprint() == garden.mapping.fingerprint()
+
+    def test_stale(self, tools, tmp_path):
+        _write_catalog(tools, tmp_path)
+        assert compiling.stale_sources("garden_catalog") == []
+        changed = _TOOLS.replace("Grows a tree.", "Grows a bigger tree.")
+        (tmp_path / "garden.py").write_text(changed)
+        assert compiling.stale_sources("garden_catalog") == ["garden"]
+        with pytest.warns(RuntimeWarning, match="garden changed"):
+            wrappers = olinguito.load_catalog("garden_catalog")
+        # The module imported before the change is used as is.
+        assert wrappers[0] is tools.grow
+        assert wrappers[2].parameters == tools.mapping["prune"].parameters
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            trusted = olinguito.load_catalog("garden_catalog", check=False)
+        assert trusted[0].doc == "Grows a tree."
+
+
+class Test_main:
+    def test_compile(self, tools, tmp_path):
+        output = tmp_path / "garden_catalog.py"
+        with pytest.raises(SystemExit):
+            __main__.main(["compile", "garden:mapping", str(output), "--check"])
+        __main__.main(["compile", "garden:mapping", str(output)])
+        assert output.read_text() == olinguito.compile_catalog(tools.mapping)
+        __main__.main(["compile", "garden:mapping", str(output), "--check"])
+        output.write_text(output.read_text() + "# edited\n")
+        with pytest.raises(SystemExit):
+            __main__.main(["compile", "garden:mapping", str(output), "--check"])
@@ -0,0 +1,246 @@
+import dataclasses
+import enum
+from typing import Annotated, Literal, NamedTuple, TypedDict
+
+import pytest
+
+import olinguito
+from olinguito import decoding, schema
+from olinguito.decoding import compile_decoder
+
+
+class _Item(TypedDict):
+    name: str
+    price: float
+    tags: list[Literal["a", "b"]]
+
+
+class Tree(TypedDict):
+    value: int
+    children: list["Tree"]
+
+
+class Point(NamedTuple):
+    x: float
+    y: float = 0.0
+
+
+def _errors(decode, value):
+    with pytest.raises(olinguito.DecodeError) as excinfo:
+        decode(value)
+    return [(e.path, e.message) for e in excinfo.value.errors]
+
+
+class Test_compile_decoder:
+    def test_primitives(self):
+        def func(a: int, b: float, c: str, d: bool, e: int | None): ...
+
+        decode = compile_decoder(func)
+        args = {"a": 1, "b": 2, "c": "x", "d": True, "e": None}
+        result = decode(args)
+        assert result == args
+        assert type(result["b"]) is float
+
+    def test_all_errors(self):
+        def func(a: int, b: float, c: str): ...
+
+        decode = compile_decoder(func)
+        assert _errors(decode, {"a": True, "b": "1", "z": 0}) == [
+            ("$", "missing properties: c"),
+            ("$", "unexpected properties: z"),
+            ("$.a", "must be of type 'integer'"),
+            ("$.b", "must be of type 'number'"),
+        ]
+
+    def test_not_an_object(self):
+        def func(a: int): ...
+
+        assert _errors(compile_decoder(func), [1]) == [
+            ("$", "must be of type 'object'")
+        ]
+
+    def test_literal(self):
+        def func(a: Literal[1, 2], b: Literal["x"]): ...
+
+        decode = compile_decoder(func)
+        assert decode({"a": 2, "b": "x"}) == {"a": 2, "b": "x"}
+        assert _errors(decode, {"a": True, "b": ["x"]}) == [
+            ("$.a", "must be one of [1, 2]"),
+            ("$.b", "must be one of ['x']"),
+        ]
+
+    def test_nested(self):
+        def func(items: list[_Item]): ...
+
+        decode = compile_decoder(func)
+        args = {"items": [{"name": "x", "price": 1, "tags": ["a"]}]}
+        result = decode(args)
+        assert result == args
+        assert type(result["items"][0]["price"]) is float
+        args = {
+            "items": [
+                {"name": "x", "price": "1", "tags": ["a"]},
+                {"name": 2, "price": 1.0, "tags": ["c"]},
+            ]
+        }
+        assert _errors(decode, args) == [
+            ("$.items[0].price", "must be of type 'number'"),
+            ("$.items[1].name", "must be of type 'string'"),
+            ("$.items[1].tags[0]", "must be one of ['a', 'b']"),
+        ]
+
+    def test_union(self):
+        def func(a: _Item | list[float] | None): ...
+
+        decode = compile_decoder(func)
+        assert decode({"a": None}) == {"a": None}
+        assert decode({"a": [1, 2.5]}) == {"a": [1.0, 2.5]}
+        assert _errors(decode, {"a": "x"}) == [
+            ("$.a", "must match one of the alternatives")
+        ]
+
+    def test_annotated(self):
+        def func(a: Annotated[float, olinguito.description("foo")]): ...
+
+        assert compile_decoder(func)({"a": 1}) == {"a": 1.0}
+
+    def test_recursive(self):
+        def func(tree: Tree): ...
+
+        decode = compile_decoder(func)
+        tree = {"value": 1, "children": [{"value": 2, "children": []}]}
+        assert decode({"tree": tree}) == {"tree": tree}
+        tree = {"value": 1, "children": [{"value": "2", "children": []}]}
+        assert _errors(decode, {"tree": tree}) == [
+            ("$.tree.children[0].value", "must be of type 'integer'")
+        ]
+
+    def test_named_types_built_once(self, monkeypatch):
+        class Leaf(TypedDict):
+            x: int
+
+        class Branch(TypedDict):
+            a: Leaf
+            b: Leaf
+            c: Leaf
+
+        class Trunk(TypedDict):
+            a: Branch
+            b: Branch
+            c: list[Branch]
+
+        built = []
+        named_decoder = decoding._named_decoder
+
+        def counting(anno):
+            built.append(anno)
+            return named_decoder(anno)
+
+        monkeypatch.setattr(decoding, "_named_decoder", counting)
+
+        def func(trunk: Trunk): ...
+
+        decode = compile_decoder(func)
+        branch = {"a": {"x": 1}, "b": {"x": 2}, "c": {"x": 3}}
+        trunk = {"a": branch, "b": branch, "c": [branch]}
+        assert decode({"trunk": trunk}) == {"trunk": trunk}
+        assert built == [Trunk, Branch, Leaf]
+
+    def test_enum(self):
+        class Color(enum.Enum):
+            RED = "red"
+            ONE = 1
+
+        def func(a: Color): ...
+
+        decode = compile_decoder(func)
+        assert decode({"a": "red"}) == {"a": Color.RED}
+        assert decode({"a": 1}) == {"a": Color.ONE}
+        assert _errors(decode, {"a": True}) == [("$.a", "must be one of ['red', 1]")]
+
+    def test_optional_enum(self):
+        class Color(enum.Enum):
+            RED = "red"
+            BLUE = "blue"
+
+        def func(c: Color | None): ...
+
+        decode = compile_decoder(func)
+        assert decode({"c": "red"}) == {"c": Color.RED}
+        assert decode({"c": None}) == {"c": None}
+        assert _errors(decode, {"c": "zzz"}) == [
+            ("$.c", "must match one of the alternatives")
+        ]
+
+    def test_dataclass_and_namedtuple(self):
+        @dataclasses.dataclass
+        class Line:
+            start: "Point"
+            end: "Point"
+            label: str = ""
+
+        def func(a: Line): ...
+
+        decode = compile_decoder(func)
+        result = decode({"a": {"start": {"x": 1}, "end": {"x": 2, "y": 3}}})
+        assert result == {"a": Line(Point(1.0), Point(2.0, 3.0))}
+        assert _errors(decode, {"a": {"start": {"y": 1}, "end": {}, "z": 0}}) == [
+            ("$.a", "unexpected properties: z"),
+            ("$.a.start", "missing properties: x"),
+            ("$.a.end", "missing properties: x"),
+        ]
+
+    def test_containers(self):
+        def func(a: tuple[int, str], b: tuple[float, ...], c: dict[str, int]): ...
+
+        decode = compile_decoder(func)
+        result = decode({"a": [1, "x"], "b": [1, 2.5], "c": {"k": 1}})
+        assert result == {"a": (1, "x"), "b": (1.0, 2.5), "c": {"k": 1}}
+        assert _errors(decode, {"a": [1], "b": ["x"], "c": {"k": "v"}}) == [
+            ("$.a", "must have exactly 2 items"),
+            ("$.b[0]", "must be of type 'number'"),
+            ("$.c.k", "must be of type 'integer'"),
+        ]
+
+    def test_set(self):
+        def func(a: set[str], b: frozenset[int]): ...
+
+        decode = compile_decoder(func)
+        assert decode({"a": ["x"], "b": [1, 2]}) == {"a": {"x"}, "b": frozenset({1, 2})}
+        assert _errors(decode, {"a": ["x", "x"], "b": []}) == [
+            ("$.a", "must have unique items")
+        ]
+
+    def test_set_unhashable(self):
+        def func(a: set[_Item], b: frozenset[list[int]]): ...
+
+        item = {"name": "x", "price": 1, "tags": []}
+        assert _errors(compile_decoder(func), {"a": [item], "b": [[1]]}) == [
+            ("$.a", "must have hashable items"),
+            ("$.b", "must have hashable items"),
+        ]
+
+    def test_registered_converter(self):
+        class Version(str):
+            pass
+
+        schema.register_converter(
+            Version, lambda anno, convert: {"type": "string", "enum": ["v1", "v2"]}
+        )
+        try:
+
+            def func(a: list[Version]): ...
+
+            decode = compile_decoder(func)
+            assert decode({"a": ["v1"]}) == {"a": ["v1"]}
+            assert _errors(decode, {"a": ["v3"]}) == [
+                ("$.a[0]", "must be one of ['v1', 'v2']")
+            ]
+        finally:
+            del schema._converters[Version]
+
+    def test_unsupported_type(self):
+        def func(a: object): ...
+
+        with pytest.raises(TypeError):
+            compile_decoder(func)
@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+from olinguito import fingerprinting
+
+_SCRIPT = """
+import enum
+from typing import Literal, NamedTuple, TypedDict
+
+import olinguito
+
+
+class Color(enum.Enum):
+    RED = "red"
+    GREEN = "green"
+
+
+class Point(NamedTuple):
+    x: float
+    y: float = 0.0
+
+
+class Shape(TypedDict):
+    color: Color
+    points: list[Point]
+    tags: set[str]
+
+
+@olinguito.wrap(use_defs=True)
+def draw(shape: Shape, mode: Literal["fill", "stroke"] | None = None) -> None:
+    '''Draws a shape.'''
+
+
+print(olinguito.Mapping(draw).fingerprint())
+"""
+
+
+class Test_encode:
+    def test_compact_and_ordered(self):
+        encoded = fingerprinting.encode({"b": [1, "é"], "a": None})
+        assert encoded == '{"b":[1,"é"],"a":null}'.encode()
+
+
+class Test_combine:
+    def test_order(self):
+        a, b = fingerprinting.fingerprint(b"a"), fingerprinting.fingerprint(b"b")
+        assert fingerprinting.combine([a, b]) == fingerprinting.combine([a, b])
+        assert fingerprinting.combine([a, b]) != fingerprinting.combine([b, a])
+        assert fingerprinting.combine([a]) != a
+
+
+def test_stable_across_processes():
+    def run(seed: str) -> str:
+        env = {**os.environ, "PYTHONHASHSEED": seed}
+        command = [sys.executable, "-c", _SCRIPT]
+        return subprocess.check_output(command, env=env, text=True).strip()
+
+    fingerprints = {run(seed) for seed in ("0", "1", "2")}
+    assert len(fingerprints) == 1
@@ -1,9 +1,30 @@
+import dataclasses
 from typing import Annotated, Literal, TypedDict
 
 import pytest
 
 import olinguito
-from olinguito.generating import generate_json_schema
+from olinguito import generating
+from olinguito.generating import (
+    generate_json_schema,
+    generate_output_schema,
+    render_json_schema,
+)
+
+
+class Tree(TypedDict):
+    value: int
+    children: list["Tree"]
+
+
+class Point(TypedDict):
+    x: int
+    y: int
+
+
+class Segment(TypedDict):
+    start: Point
+    end: Point
 
 
 class Test_generate_json_schema:
@@ -269,3 +290,254 @@ class Test_generate_json_schema:
             "required": [],
             "additionalProperties": False,
         }
+
+
+class Test_generate_json_schema_use_defs:
+    def test_shared_typed_dict(self):
+        def func(a: Segment, b: Point): ...
+
+        point_ref = {"$ref": "#/$defs/Point"}
+        assert generate_json_schema(func, use_defs=True) == {
+            "type": "object",
+            "properties": {
+                "a": {
+                    "type": "object",
+                    "properties": {"start": point_ref, "end": point_ref},
+                    "required": ["start", "end"],
+                    "additionalProperties": False,
+                },
+                "b": point_ref,
+            },
+            "required": ["a", "b"],
+            "additionalProperties": False,
+            "$defs": {
+                "Point": {
+                    "type": "object",
+                    "properties": {"x": {"type": "integer"}, "y": {"type": "integer"}},
+                    "required": ["x", "y"],
+                    "additionalProperties": False,
+                }
+            },
+        }
+
+    def test_unshared_typed_dict_is_inlined(self):
+        def func(a: Point, b: int): ...
+
+        assert generate_json_schema(func, use_defs=True) == generate_json_schema(func)
+
+    def test_recursive_typed_dict(self):
+        def func(tree: Tree): ...
+
+        assert generate_json_schema(func, use_defs=True) == {
+            "type": "object",
+            "properties": {"tree": {"$ref": "#/$defs/Tree"}},
+            "required": ["tree"],
+            "additionalProperties": False,
+            "$defs": {
+                "Tree": {
+                    "type": "object",
+                    "properties": {
+                        "value": {"type": "integer"},
+                        "children": {
+                            "type": "array",
+                            "items": {"$ref": "#/$defs/Tree"},
+                        },
+                    },
+                    "required": ["value", "children"],
+                    "additionalProperties": False,
+                }
+            },
+        }
+
+    def test_recursive_typed_dict_without_defs(self):
+        def func(tree: Tree): ...
+
+        with pytest.raises(TypeError):
+            generate_json_schema(func)
+
+    def test_union_with_reference(self):
+        def func(a: Point | None, b: Point): ...
+
+        schema = generate_json_schema(func, use_defs=True)
+        assert schema["properties"]["a"] == {
+            "anyOf": [{"$ref": "#/$defs/Point"}, {"type": "null"}]
+        }
+
+    def test_name_collision(self):
+        OtherPoint = TypedDict("Point", {"z": int})
+
+        def func(a: OtherPoint, b: OtherPoint, c: Point, d: Point): ...
+
+        schema = generate_json_schema(func, use_defs=True)
+        assert schema["properties"]["a"] == {"$ref": "#/$defs/Point"}
+        assert schema["properties"]["c"] == {"$ref": "#/$defs/Point_2"}
+        assert list(schema["$defs"]["Point"]["properties"]) == ["z"]
+        assert list(schema["$defs"]["Point_2"]["properties"]) == ["x", "y"]
+
+    def test_annotated_reference(self):
+        def func(
+            a: Annotated[Point, olinguito.description("from")],
+            b: Annotated[Point, olinguito.description("to")],
+        ): ...
+
+        schema = generate_json_schema(func, use_defs=True)
+        assert schema["properties"] == {
+            "a": {"description": "from", "$ref": "#/$defs/Point"},
+            "b": {"description": "to", "$ref": "#/$defs/Point"},
+        }
+
+
+class Test_generate_output_schema:
+    def test_return_annotation(self):
+        def func() -> list[Point]: ...
+
+        assert generate_output_schema(func) == {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"x": {"type": "integer"}, "y": {"type": "integer"}},
+                "required": ["x", "y"],
+                "additionalProperties": False,
+            },
+        }
+
+    def test_none(self):
+        def func() -> None: ...
+
+        assert generate_output_schema(func) == {"type": "null"}
+
+    def test_no_annotation(self):
+        def func(): ...
+
+        assert generate_output_schema(func) is None
+
+    def test_unsupported(self):
+        def func() -> object: ...
+
+        with pytest.raises(TypeError):
+            generate_output_schema(func)
+
+    def test_use_defs(self):
+        def func() -> Tree: ...
+
+        assert generate_output_schema(func, use_defs=True) == {
+            "$ref": "#/$defs/Tree",
+            "$defs": {
+                "Tree": {
+                    "type": "object",
+                    "properties": {
+                        "value": {"type": "integer"},
+                        "children": {
+                            "type": "array",
+                            "items": {"$ref": "#/$defs/Tree"},
+                        },
+                    },
+                    "required": ["value", "children"],
+                    "additionalProperties": False,
+                }
+            },
+        }
+
+
+class Test_render_json_schema:
+    def test_any_of(self):
+        def func(a: Point | None, b: list[int] | int | None, c: int | None = None): ...
+
+        schema = render_json_schema(generate_json_schema(func), "any_of")
+        assert schema["properties"] == {
+            "a": {
+                "anyOf": [
+                    {
+                        "type": "object",
+                        "properties": {
+                            "x": {"type": "integer"},
+                            "y": {"type": "integer"},
+                        },
+                        "required": ["x", "y"],
+                        "additionalProperties": False,
+                    },
+                    {"type": "null"},
+                ]
+            },
+            "b": {
+                "anyOf": [
+                    {"type": "array", "items": {"type": "integer"}},
+                    {"type": "integer"},
+                    {"type": "null"},
+                ]
+            },
+            "c": {"anyOf": [{"type": "integer"}, {"type": "null"}]},
+        }
+
+    def test_any_of_keeps_annotations(self):
+        def func(a: Annotated[int | str, olinguito.description("An id.")]): ...
+
+        schema = render_json_schema(generate_json_schema(func), "any_of")
+        assert schema["properties"]["a"] == {
+            "description": "An id.",
+            "anyOf": [{"type": "integer"}, {"type": "string"}],
+        }
+
+    def test_inline(self):
+        def func(
+            segment: Segment, a: Annotated[Point, olinguito.description("A.")]
+        ): ...
+
+        schema = generate_json_schema(func, use_defs=True)
+        assert "$defs" in schema
+        inlined = render_json_schema(schema, "inline")
+        assert inlined == generate_json_schema(func)
+        assert "$defs" in schema
+
+    def test_inline_recursive(self):
+        def func(tree: Tree): ...
+
+        schema = generate_json_schema(func, use_defs=True)
+        with pytest.raises(TypeError, match="'Tree'"):
+            render_json_schema(schema, "inline")
+
+    def test_inline_without_defs(self):
+        def func(point: Point): ...
+
+        schema = generate_json_schema(func)
+        assert render_json_schema(schema, "inline") is schema
+
+    def test_strict(self):
+        def func(segment: Segment, point: Point | None): ...
+
+        schema = generate_json_schema(func)
+        assert render_json_schema(schema, "strict") is schema
+
+    def test_strict_rejects(self):
+        @dataclasses.dataclass
+        class Size:
+            width: int
+            height: int = 0
+
+        def defaults(size: Size): ...
+
+        def maps(counts: dict[str, int]): ...
+
+        with pytest.raises(TypeError, match=r"\['height'\]"):
+            render_json_schema(generate_json_schema(defaults), "strict")
+        with pytest.raises(TypeError, match="additional properties"):
+            render_json_schema(generate_json_schema(maps), "strict")
+
+    def test_unknown(self):
+        with pytest.raises(KeyError, match="'unknown'"):
+            render_json_schema(generate_json_schema(lambda: None), "unknown")
+
+    def test_register_dialect(self):
+        @olinguito.register_dialect("described")
+        def described(schema):
+            return {**schema, "description": "Arguments."}
+
+        try:
+            schema = generate_json_schema(lambda: None)
+            assert render_json_schema(schema, "described")["description"] == (
+                "Arguments."
+            )
+            olinguito.register_dialect("described", lambda schema: schema)
+            assert render_json_schema(schema, "described") is schema
+        finally:
+            del generating._dialects["described"]
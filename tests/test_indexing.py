@@ -0,0 +1,87 @@
+from typing import Annotated
+
+import olinguito
+from olinguito.indexing import Index, tokenize
+
+
+@olinguito.wrap
+def get_weather(city: str) -> str:
+    """Returns the current weather."""
+    return "sunny"
+
+
+@olinguito.wrap(tags=["github"])
+def github_create_issue(
+    title: Annotated[str, olinguito.description("The headline of the ticket.")],
+) -> None:
+    """Opens an issue in a repository."""
+
+
+@olinguito.wrap(tags=["github"], lazy=True)
+def github_list_issues(repo: str) -> list[str]:
+    """Lists the issues of a repository."""
+    return []
+
+
+class Test_tokenize:
+    def test_tokenize(self):
+        assert tokenize("getWeather") == ["get", "weather"]
+        assert tokenize("github_create_issue") == ["github", "create", "issue"]
+        assert tokenize("Parse JSON, v2.") == ["parse", "json", "v", "2"]
+        assert tokenize("HTTPServer") == ["http", "server"]
+
+    def test_tokenize_plurals(self):
+        assert tokenize("issues lists queries class bus") == [
+            "issue",
+            "list",
+            "query",
+            "class",
+            "bus",
+        ]
+
+
+class Test_Index:
+    def test_search_ranks_rare_words_first(self):
+        index = Index([get_weather, github_create_issue, github_list_issues])
+        assert index.search("create an issue") == [
+            "github_create_issue",
+            "github_list_issues",
+        ]
+        assert index.search("weather") == ["get_weather"]
+
+    def test_search_parameters(self):
+        index = Index([get_weather, github_create_issue, github_list_issues])
+        assert index.search("city") == ["get_weather"]
+        assert index.search("ticket headline") == ["github_create_issue"]
+
+    def test_search_does_not_generate_lazy_schemas(self):
+        Index([github_list_issues])
+        assert "parameters" not in vars(github_list_issues)
+
+    def test_search_filters(self):
+        index = Index([get_weather, github_create_issue, github_list_issues])
+        assert index.search(prefix="github_") == [
+            "github_create_issue",
+            "github_list_issues",
+        ]
+        assert index.search(prefix="github_c") == ["github_create_issue"]
+        assert index.search(prefix="z") == []
+        assert index.search(tags=["github"], limit=1) == ["github_create_issue"]
+        assert index.search("weather", tags=["github"]) == []
+
+    def test_add_and_discard(self):
+        index = Index([get_weather, github_create_issue])
+        index.add(github_list_issues)
+        assert len(index) == 3
+        index.discard("github_create_issue")
+        index.discard("unknown")
+        assert len(index) == 2
+        assert index.search("issue") == ["github_list_issues"]
+        assert index.search("headline") == []
+        assert index.search(tags=["github"]) == ["github_list_issues"]
+        assert index.search() == ["get_weather", "github_list_issues"]
+
+    def test_add_replaces_in_place(self):
+        index = Index([get_weather, github_create_issue])
+        index.add(get_weather)
+        assert index.search() == ["get_weather", "github_create_issue"]
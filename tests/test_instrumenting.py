@@ -0,0 +1,40 @@
+import json
+
+import olinguito
+
+
+class Test_Metrics:
+    def test_snapshot(self):
+        metrics = olinguito.Metrics(bounds=[0.1, 1.0])
+        metrics.after("add", 0.05, 3)
+        metrics.after("add", 0.5, 3)
+        metrics.error("add", 2.0, ValueError())
+        metrics.after("greet", 0.01, "hi")
+        snapshot = metrics.snapshot()
+        assert snapshot["add"] == {
+            "calls": 3,
+            "errors": 1,
+            "total_seconds": 2.55,
+            "min_seconds": 0.05,
+            "max_seconds": 2.0,
+            "buckets": [1, 1, 1],
+            "p50_seconds": 1.0,
+            "p90_seconds": 2.0,
+            "p99_seconds": 2.0,
+        }
+        assert snapshot["greet"]["calls"] == 1
+        assert snapshot["greet"]["p99_seconds"] == 0.01
+        json.dumps(snapshot)
+
+    def test_snapshot_is_a_copy(self):
+        metrics = olinguito.Metrics()
+        metrics.after("add", 0.001, 3)
+        snapshot = metrics.snapshot()
+        metrics.after("add", 0.001, 3)
+        assert snapshot["add"]["calls"] == 1
+
+    def test_reset(self):
+        metrics = olinguito.Metrics()
+        metrics.after("add", 0.001, 3)
+        metrics.reset()
+        assert metrics.snapshot() == {}
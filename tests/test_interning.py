@@ -0,0 +1,55 @@
+import copy
+import gc
+import json
+import pickle
+
+import pytest
+
+from olinguito import interning
+
+
+class Test_intern:
+    def test_shared(self):
+        a = interning.intern({"type": "array", "items": {"type": "integer"}})
+        b = interning.intern({"type": "integer"})
+        assert a["items"] is b
+        assert interning.intern({"type": "array", "items": {"type": "integer"}}) is a
+        assert interning.intern([{"type": "integer"}])[0] is b
+
+    def test_order_and_types_are_significant(self):
+        assert interning.intern({"a": 1, "b": 2}) is not interning.intern(
+            {"b": 2, "a": 1}
+        )
+        assert interning.intern({"enum": [1]}) is not interning.intern({"enum": [True]})
+        assert interning.intern({"enum": [1]}) is not interning.intern({"enum": [1.0]})
+        assert interning.intern(["a"]) is not interning.intern([["a"]])
+
+    def test_read_only(self):
+        schema = interning.intern({"required": ["a"], "properties": {}})
+        assert isinstance(schema, dict)
+        with pytest.raises(TypeError):
+            schema["type"] = "object"
+        with pytest.raises(TypeError):
+            schema.update(type="object")
+        with pytest.raises(TypeError):
+            del schema["required"]
+        with pytest.raises(TypeError):
+            schema["required"].append("b")
+        with pytest.raises(TypeError):
+            schema["required"] += ["b"]
+
+    def test_copies_are_plain(self):
+        schema = interning.intern({"required": ["a"], "properties": {}})
+        for copied in (copy.deepcopy(schema), pickle.loads(pickle.dumps(schema))):
+            assert copied == schema
+            assert type(copied) is dict
+            assert type(copied["required"]) is list
+            copied["required"].append("b")
+        assert json.loads(json.dumps(schema)) == schema
+
+    def test_released(self):
+        schema = interning.intern({"title": "released"})
+        count = len(interning._nodes)
+        del schema
+        gc.collect()
+        assert len(interning._nodes) == count - 1
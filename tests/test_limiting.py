@@ -0,0 +1,207 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import olinguito
+
+
+def _blocking(release: threading.Event, limit: olinguito.Limit | None = None):
+    @olinguito.wrap(limit=limit)
+    def block() -> int:
+        """Blocks until released."""
+        release.wait(5)
+        return 1
+
+    return block
+
+
+def _start(func, *args):
+    thread = threading.Thread(target=func, args=args)
+    thread.start()
+    return thread
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+@olinguito.wrap
+def add(x: int, y: int) -> int:
+    """Adds two integers."""
+    return x + y
+
+
+class Test_Limit:
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            olinguito.Limit(0)
+        with pytest.raises(ValueError):
+            olinguito.Limit(rate=0)
+
+    def test_concurrency(self):
+        release = threading.Event()
+        limit = olinguito.Limit(1)
+        mapping = olinguito.Mapping(_blocking(release, limit))
+        threads = [_start(mapping, "block") for _ in range(3)]
+        _wait_for(lambda: limit.info() == (1, 2, 0))
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert limit.info() == (0, 0, 0)
+
+    def test_queue_full(self):
+        release = threading.Event()
+        limit = olinguito.Limit(1, queue=1)
+        mapping = olinguito.Mapping(_blocking(release, limit))
+        threads = [_start(mapping, "block") for _ in range(2)]
+        _wait_for(lambda: limit.info().waiting == 1)
+        with pytest.raises(olinguito.OverloadError) as excinfo:
+            mapping("block")
+        assert excinfo.value.key == "block"
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert limit.info() == (0, 0, 1)
+
+    def test_timeout(self):
+        release = threading.Event()
+        limit = olinguito.Limit(1, timeout=0.01)
+        mapping = olinguito.Mapping(_blocking(release, limit))
+        thread = _start(mapping, "block")
+        _wait_for(lambda: limit.info().active == 1)
+        with pytest.raises(olinguito.OverloadError, match="waited more than"):
+            mapping("block")
+        release.set()
+        thread.join()
+        assert limit.info() == (0, 0, 1)
+
+    def test_rate(self):
+        limit = olinguito.Limit(rate=100, burst=2)
+        mapping = olinguito.Mapping(olinguito.wrap(add.func, limit=limit))
+        start = time.perf_counter()
+        for _ in range(6):
+            assert mapping("add", 1, 2) == 3
+        # Two calls at once, then one every 10ms.
+        assert time.perf_counter() - start >= 0.035
+
+    def test_rate_rejects_early(self):
+        limit = olinguito.Limit(rate=1, timeout=0.5)
+        mapping = olinguito.Mapping(olinguito.wrap(add.func, limit=limit))
+        assert mapping("add", 1, 2) == 3
+        start = time.perf_counter()
+        with pytest.raises(olinguito.OverloadError):
+            mapping("add", 1, 2)
+        assert time.perf_counter() - start < 0.1
+
+    def test_mapping_limit_isolates_tools(self):
+        # Calls waiting for a busy tool do not take the mapping's slots.
+        release = threading.Event()
+        mapping = olinguito.Mapping(
+            _blocking(release, olinguito.Limit(1)), add, limit=olinguito.Limit(2)
+        )
+        threads = [_start(mapping, "block") for _ in range(3)]
+        _wait_for(lambda: mapping["block"].limit.info().waiting == 2)
+        assert mapping("add", 1, 2) == 3
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert mapping.limit.info() == (0, 0, 0)
+
+    def test_call_many_deadline(self):
+        release = threading.Event()
+        limit = olinguito.Limit(1)
+        mapping = olinguito.Mapping(_blocking(release, limit))
+        results = mapping.call_many([("block", {})] * 3, max_workers=3, timeout=0.05)
+        assert all(isinstance(r, TimeoutError) for r in results)
+        # The waiting calls gave up at the deadline.
+        _wait_for(lambda: limit.info().waiting == 0)
+        release.set()
+        _wait_for(lambda: limit.info().active == 0)
+        assert limit.info().rejected == 0
+
+    def test_errors_release(self):
+        limit = olinguito.Limit(1)
+        mapping = olinguito.Mapping(olinguito.wrap(add.func, limit=limit))
+        with pytest.raises(TypeError):
+            mapping("add", 1)
+        assert limit.info() == (0, 0, 0)
+
+    def test_async(self):
+        limit = olinguito.Limit(1)
+        running = []
+
+        @olinguito.wrap(limit=limit)
+        async def sleep(n: int) -> int:
+            """Sleeps."""
+            running.append(n)
+            assert len(running) == 1
+            await asyncio.sleep(0.01)
+            running.remove(n)
+            return n
+
+        mapping = olinguito.Mapping(sleep)
+        calls = [("sleep", {"n": n}) for n in range(3)]
+        assert asyncio.run(mapping.acall_many(calls)) == [0, 1, 2]
+        assert limit.info() == (0, 0, 0)
+
+    def test_async_sync_api(self):
+        # Coroutines from `__call__` and `dispatch_json` hold their slot until
+        # they complete.
+        limit = olinguito.Limit(1, queue=0)
+
+        @olinguito.wrap(limit=limit)
+        async def sleep(n: float) -> float:
+            """Sleeps."""
+            await asyncio.sleep(n)
+            return n
+
+        mapping = olinguito.Mapping(sleep)
+        data = '{"name": "sleep", "arguments": {"n": 0.05}}'
+
+        async def main():
+            return await asyncio.gather(
+                mapping("sleep", 0.05),
+                mapping.dispatch_json(data, serialize=True),
+                return_exceptions=True,
+            )
+
+        first, second = asyncio.run(main())
+        assert first == 0.05
+        assert isinstance(second, olinguito.OverloadError)
+        assert limit.info() == (0, 0, 1)
+
+    def test_async_cancelled(self):
+        limit = olinguito.Limit(1)
+
+        @olinguito.wrap(limit=limit)
+        async def sleep(n: float) -> float:
+            """Sleeps."""
+            await asyncio.sleep(n)
+            return n
+
+        mapping = olinguito.Mapping(sleep)
+        calls = [("sleep", {"n": 0.05})] * 3
+        results = asyncio.run(mapping.acall_many(calls, timeout=0.01))
+        assert all(isinstance(r, TimeoutError) for r in results)
+        assert limit.info() == (0, 0, 0)
+
+    def test_async_timeout(self):
+        limit = olinguito.Limit(1, timeout=0.01)
+
+        @olinguito.wrap(limit=limit)
+        async def sleep(n: float) -> float:
+            """Sleeps."""
+            await asyncio.sleep(n)
+            return n
+
+        mapping = olinguito.Mapping(sleep)
+        calls = [("sleep", {"n": 0.05})] * 2
+        first, second = asyncio.run(mapping.acall_many(calls))
+        assert first == 0.05
+        assert isinstance(second, olinguito.OverloadError)
+        assert limit.info() == (0, 0, 1)
@@ -1,3 +1,11 @@
+import asyncio
+import concurrent.futures
+import json
+import threading
+import time
+
+import pytest
+
 import olinguito
 
 
@@ -19,6 +27,13 @@ def greet(name: str) -> str:
     return f"Hello, {name}!"
 
 
+@olinguito.wrap
+async def subtract(x: int, y: int) -> int:
+    """Subtracts two integers."""
+    await asyncio.sleep(0)
+    return x - y
+
+
 class Test_Mapping:
     def test_dunder_getitem(self):
         mapping = olinguito.Mapping(add, multiply, greet)
@@ -55,3 +70,367 @@ class Test_Mapping:
         assert mapping("add", 3, 4) == 7
         assert mapping("multiply", 3, 4) == 12
         assert mapping("greet", name="Alice") == "Hello, Alice!"
+
+    def test_manifest(self):
+        mapping = olinguito.Mapping(add, greet)
+        assert mapping.manifest == (
+            {
+                "name": "add",
+                "description": "Adds two integers.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {"x": {"type": "integer"}, "y": {"type": "integer"}},
+                    "required": ("x", "y"),
+                    "additionalProperties": False,
+                },
+            },
+            {
+                "name": "greet",
+                "description": "Returns a greeting message.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {"name": {"type": "string"}},
+                    "required": ("name",),
+                    "additionalProperties": False,
+                },
+            },
+        )
+        assert mapping.manifest is mapping.manifest
+        with pytest.raises(TypeError):
+            mapping.manifest[0]["parameters"]["properties"]["x"]["type"] = "string"
+
+    def test_encode_manifest(self):
+        mapping = olinguito.Mapping(add, multiply, greet)
+        encoded = mapping.encode_manifest()
+        assert encoded is mapping.encode_manifest()
+        assert json.loads(encoded) == [
+            {
+                "name": w.name,
+                "description": w.doc,
+                "parameters": w.parameters,
+            }
+            for w in (add, multiply, greet)
+        ]
+        subset = json.loads(mapping.encode_manifest(["greet", "add"]))
+        assert [d["name"] for d in subset] == ["greet", "add"]
+        assert json.loads(mapping.encode_manifest([])) == []
+        with pytest.raises(KeyError):
+            mapping.encode_manifest(["subtract"])
+
+    def test_encode_manifest_dialect(self):
+        @olinguito.wrap
+        def find(name: str | None) -> str:
+            """Finds a name."""
+            return name or ""
+
+        mapping = olinguito.Mapping(add, find)
+        encoded = json.loads(mapping.encode_manifest(dialect="any_of"))
+        assert encoded[0] == json.loads(mapping.encode_manifest(["add"]))[0]
+        assert encoded[1]["parameters"] == find.render("any_of")
+        assert encoded[1]["parameters"]["properties"]["name"] == {
+            "anyOf": [{"type": "string"}, {"type": "null"}]
+        }
+        subset = mapping.encode_manifest(["find"], dialect="any_of")
+        assert json.loads(subset) == encoded[1:]
+        with pytest.raises(KeyError):
+            mapping.encode_manifest(dialect="unknown")
+
+    def test_fingerprint(self):
+        mapping = olinguito.Mapping(add, multiply, greet)
+        fingerprint = mapping.fingerprint()
+        assert fingerprint is mapping.fingerprint()
+        assert fingerprint == olinguito.Mapping(add, multiply, greet).fingerprint()
+        assert fingerprint == mapping.fingerprint(["add", "multiply", "greet"])
+        assert fingerprint != olinguito.Mapping(greet, add, multiply).fingerprint()
+        assert fingerprint != olinguito.Mapping(add, multiply).fingerprint()
+        assert mapping.fingerprint(["greet"]) == olinguito.Mapping(greet).fingerprint()
+        with pytest.raises(KeyError):
+            mapping.fingerprint(["subtract"])
+
+    def test_call_many(self):
+        mapping = olinguito.Mapping(add, multiply, greet)
+        calls = [
+            ("add", {"x": 3, "y": 4}),
+            ("greet", {"name": "Alice"}),
+            ("multiply", {"x": 3, "y": 4}),
+        ]
+        assert mapping.call_many(calls) == [7, "Hello, Alice!", 12]
+        assert mapping.call_many([]) == []
+
+    def test_call_many_runs_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        @olinguito.wrap
+        def wait(n: int) -> int:
+            """Waits for the other calls."""
+            barrier.wait()
+            return n
+
+        mapping = olinguito.Mapping(wait)
+        calls = [("wait", {"n": n}) for n in range(3)]
+        assert mapping.call_many(calls, max_workers=3) == [0, 1, 2]
+
+    def test_call_many_captures_exceptions(self):
+        mapping = olinguito.Mapping(add)
+        calls = [("add", {"x": 1, "y": 2}), ("add", {"x": 1}), ("sub", {})]
+        ok, missing_arg, unknown = mapping.call_many(calls)
+        assert ok == 3
+        assert isinstance(missing_arg, TypeError)
+        assert isinstance(unknown, KeyError)
+
+    def test_call_many_timeout(self):
+        event = threading.Event()
+
+        @olinguito.wrap
+        def block() -> bool:
+            """Blocks until the event is set."""
+            return event.wait(5)
+
+        mapping = olinguito.Mapping(add, block)
+        calls = [("add", {"x": 1, "y": 2}), ("block", {})]
+        try:
+            ok, timed_out = mapping.call_many(calls, timeout=0.05)
+        finally:
+            event.set()
+        assert ok == 3
+        assert isinstance(timed_out, TimeoutError)
+
+    def test_call_many_timeout_per_call(self):
+        @olinguito.wrap
+        def sleep(seconds: float) -> float:
+            """Sleeps."""
+            time.sleep(seconds)
+            return seconds
+
+        mapping = olinguito.Mapping(sleep)
+        calls = [("sleep", {"seconds": 0.05})] * 4
+        # The batch takes longer than `timeout`, but none of its calls does.
+        results = mapping.call_many(calls, max_workers=1, timeout=0.15)
+        assert results == [0.05] * 4
+        calls = [("sleep", {"seconds": 0.2}), ("sleep", {"seconds": 0.01})]
+        slow, fast = mapping.call_many(calls, max_workers=1, timeout=0.1)
+        assert isinstance(slow, TimeoutError)
+        assert fast == 0.01
+
+    def test_call_many_reuses_threads(self):
+        @olinguito.wrap
+        def ident() -> int:
+            """Returns the thread's identifier."""
+            return threading.get_ident()
+
+        mapping = olinguito.Mapping(ident)
+        (first,) = mapping.call_many([("ident", {})], max_workers=1)
+        (second,) = mapping.call_many([("ident", {})], max_workers=1)
+        assert first == second != threading.get_ident()
+
+    def test_call_many_executor(self):
+        mapping = olinguito.Mapping(add, multiply)
+        calls = [("add", {"x": 3, "y": 4}), ("multiply", {"x": 3, "y": 4})]
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            assert mapping.call_many(calls, executor=executor) == [7, 12]
+            assert mapping.call_many(calls, executor=executor) == [7, 12]
+
+    def test_call_many_async(self):
+        mapping = olinguito.Mapping(add, subtract)
+        calls = [("add", {"x": 3, "y": 4}), ("subtract", {"x": 3, "y": 4})]
+        assert mapping.call_many(calls) == [7, -1]
+
+    def test_acall(self):
+        mapping = olinguito.Mapping(add, subtract)
+        assert asyncio.run(mapping.acall("add", 3, 4)) == 7
+        assert asyncio.run(mapping.acall("subtract", x=3, y=4)) == -1
+
+    def test_acall_offloads_sync_tools(self):
+        @olinguito.wrap
+        def current_thread() -> int:
+            """Returns the identifier of the current thread."""
+            return threading.get_ident()
+
+        mapping = olinguito.Mapping(current_thread)
+        assert asyncio.run(mapping.acall("current_thread")) != threading.get_ident()
+
+    def test_acall_many(self):
+        mapping = olinguito.Mapping(add, subtract)
+        calls = [
+            ("subtract", {"x": 3, "y": 4}),
+            ("add", {"x": 3, "y": 4}),
+            ("add", {"x": 3}),
+            ("sub", {}),
+        ]
+        subtracted, added, missing_arg, unknown = asyncio.run(mapping.acall_many(calls))
+        assert subtracted == -1
+        assert added == 7
+        assert isinstance(missing_arg, TypeError)
+        assert isinstance(unknown, KeyError)
+
+    def test_acall_many_limit(self):
+        running = 0
+        peak = 0
+
+        @olinguito.wrap
+        async def track() -> None:
+            """Records the number of concurrently running calls."""
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        mapping = olinguito.Mapping(track)
+        calls = [("track", {})] * 6
+        assert asyncio.run(mapping.acall_many(calls, limit=2)) == [None] * 6
+        assert peak == 2
+
+    def test_acall_many_timeout(self):
+        @olinguito.wrap
+        async def sleep(seconds: float) -> float:
+            """Sleeps for the given seconds."""
+            await asyncio.sleep(seconds)
+            return seconds
+
+        mapping = olinguito.Mapping(sleep)
+        calls = [("sleep", {"seconds": 0}), ("sleep", {"seconds": 5})]
+        ok, timed_out = asyncio.run(mapping.acall_many(calls, timeout=0.05))
+        assert ok == 0
+        assert isinstance(timed_out, TimeoutError)
+
+    def test_instruments(self):
+        events = []
+
+        class Recorder(olinguito.Instrument):
+            def before(self, key, args, kwargs):
+                events.append(("before", key, args, kwargs))
+
+            def after(self, key, elapsed, result):
+                assert elapsed >= 0
+                events.append(("after", key, result))
+
+            def error(self, key, elapsed, exc):
+                events.append(("error", key, type(exc)))
+
+        metrics = olinguito.Metrics()
+        mapping = olinguito.Mapping(add, subtract, instruments=[Recorder(), metrics])
+        assert mapping("add", 1, y=2) == 3
+        with pytest.raises(TypeError):
+            mapping("add", 1)
+        assert mapping.call_many([("subtract", {"x": 3, "y": 1})]) == [2]
+        assert asyncio.run(mapping.acall("subtract", 5, 1)) == 4
+        assert asyncio.run(mapping.acall_many([("add", {"x": 1, "y": 1})])) == [2]
+        data = json.dumps({"name": "add", "arguments": {"x": 2, "y": 2}})
+        assert mapping.dispatch_json(data) == 4
+        assert events == [
+            ("before", "add", (1,), {"y": 2}),
+            ("after", "add", 3),
+            ("before", "add", (1,), {}),
+            ("error", "add", TypeError),
+            ("before", "subtract", (), {"x": 3, "y": 1}),
+            ("after", "subtract", 2),
+            ("before", "subtract", (5, 1), {}),
+            ("after", "subtract", 4),
+            ("before", "add", (), {"x": 1, "y": 1}),
+            ("after", "add", 2),
+            ("before", "add", (), {"x": 2, "y": 2}),
+            ("after", "add", 4),
+        ]
+        snapshot = metrics.snapshot()
+        assert snapshot["add"]["calls"] == 4
+        assert snapshot["add"]["errors"] == 1
+        assert snapshot["subtract"]["calls"] == 2
+
+    def test_instruments_coroutine(self):
+        # Coroutines returned by the synchronous API are timed until awaited.
+        @olinguito.wrap
+        async def fail(seconds: float) -> None:
+            """Fails after sleeping."""
+            await asyncio.sleep(seconds)
+            raise ValueError(seconds)
+
+        metrics = olinguito.Metrics()
+        mapping = olinguito.Mapping(fail, instruments=[metrics])
+        data = json.dumps({"name": "fail", "arguments": {"seconds": 0.01}})
+        for coro in (
+            mapping("fail", 0.01),
+            mapping.dispatch_json(data),
+            mapping.dispatch_json(data, serialize=True),
+        ):
+            with pytest.raises(ValueError):
+                asyncio.run(coro)
+        snapshot = metrics.snapshot()["fail"]
+        assert snapshot["calls"] == snapshot["errors"] == 3
+        assert snapshot["min_seconds"] >= 0.01
+
+    def test_instruments_cancelled_coroutine(self):
+        @olinguito.wrap
+        async def sleep(seconds: float) -> None:
+            """Sleeps."""
+            await asyncio.sleep(seconds)
+
+        metrics = olinguito.Metrics()
+        mapping = olinguito.Mapping(sleep, instruments=[metrics])
+        (result,) = asyncio.run(
+            mapping.acall_many([("sleep", {"seconds": 10})], timeout=0.01)
+        )
+        assert isinstance(result, TimeoutError)
+        snapshot = metrics.snapshot()["sleep"]
+        assert snapshot["calls"] == snapshot["errors"] == 1
+
+    def test_search(self):
+        mapping = olinguito.Mapping(add, multiply, greet)
+        assert mapping.search("multiply integers") == [multiply, add]
+        assert mapping.search("greeting") == [greet]
+        assert mapping.search("unknown") == []
+        assert mapping.search() == [add, multiply, greet]
+        assert mapping.search(prefix="mu") == [multiply]
+        assert mapping.search("integers", limit=1) == [add]
+
+    def test_search_tags(self):
+        @olinguito.wrap(tags=["math", "slow"])
+        def power(x: int, y: int) -> int:
+            """Raises an integer to a power."""
+            return x**y
+
+        mapping = olinguito.Mapping(add, power, greet)
+        assert mapping.search(tags=["math"]) == [power]
+        assert mapping.search("integers", tags=["math", "slow"]) == [power]
+        assert mapping.search(tags=["math", "fast"]) == []
+
+    def test_dispatch_json(self):
+        mapping = olinguito.Mapping(add, multiply, greet)
+        data = json.dumps({"name": "add", "arguments": {"x": 3, "y": 4}})
+        assert mapping.dispatch_json(data) == 7
+        arguments = json.dumps({"x": 3, "y": 4})
+        data = json.dumps({"name": "multiply", "arguments": arguments})
+        assert mapping.dispatch_json(data.encode()) == 12
+        data = json.dumps({"name": "greet", "arguments": {"name": "Alice"}})
+        assert mapping.dispatch_json(data) == "Hello, Alice!"
+
+    def test_dispatch_json_unknown_name(self):
+        mapping = olinguito.Mapping(add)
+        with pytest.raises(KeyError):
+            mapping.dispatch_json('{"name": "multiply", "arguments": {}}')
+
+    def test_dispatch_json_loads(self):
+        decoded = []
+
+        def loads(data):
+            decoded.append(data)
+            return json.loads(data)
+
+        mapping = olinguito.Mapping(add)
+        data = json.dumps({"name": "add", "arguments": '{"x": 1, "y": 2}'})
+        assert mapping.dispatch_json(data, loads=loads) == 3
+        assert decoded == [data, '{"x": 1, "y": 2}']
+
+    def test_dispatch_json_serialize(self):
+        mapping = olinguito.Mapping(add, greet, subtract)
+        data = json.dumps({"name": "greet", "arguments": {"name": "Zoë"}})
+        assert mapping.dispatch_json(data, serialize=True) == '"Hello, Zoë!"'.encode()
+        data = json.dumps({"name": "subtract", "arguments": {"x": 3, "y": 4}})
+        result = mapping.dispatch_json(data, serialize=True)
+        assert asyncio.run(result) == b"-1"
+
+    def test_dispatch_json_validate(self):
+        mapping = olinguito.Mapping(add)
+        data = json.dumps({"name": "add", "arguments": {"x": 1, "y": "2"}})
+        with pytest.raises(olinguito.ValidationError):
+            mapping.dispatch_json(data, validate=True)
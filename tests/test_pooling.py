@@ -0,0 +1,104 @@
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import olinguito
+
+
+@olinguito.wrap
+def pid() -> int:
+    """Returns the ID of the current process."""
+    return os.getpid()
+
+
+@olinguito.wrap
+def power(x: int, y: int) -> int:
+    """Raises an integer to a power."""
+    return x**y
+
+
+@olinguito.wrap
+async def negate(x: int) -> int:
+    """Negates an integer."""
+    await asyncio.sleep(0)
+    return -x
+
+
+@olinguito.wrap
+def crash() -> None:
+    """Terminates the current process."""
+    os._exit(1)
+
+
+@olinguito.wrap
+def fail() -> None:
+    """Raises an error."""
+    raise ValueError("failed")
+
+
+@pytest.fixture
+def pool():
+    tools = (pid, power, negate, crash, fail)
+    with olinguito.ProcessPool(*tools, max_workers=2) as pool:
+        yield pool
+
+
+class Test_ProcessPool:
+    def test_call(self, pool):
+        assert "power" in pool
+        assert "greet" not in pool
+        assert pool.call("power", 2, y=10) == 1024
+        assert pool.call("pid") != os.getpid()
+        assert pool.call("negate", 3) == -3
+
+    def test_acall(self, pool):
+        assert asyncio.run(pool.acall("power", 3, 2)) == 9
+
+    def test_exception(self, pool):
+        with pytest.raises(ValueError, match="failed"):
+            pool.call("fail")
+
+    def test_crash_restarts_workers(self, pool):
+        with pytest.raises(BrokenProcessPool):
+            pool.call("crash")
+        assert pool.call("power", 2, 3) == 8
+
+    def test_unimportable(self):
+        @olinguito.wrap
+        def local() -> None:
+            """A local function."""
+
+        with pytest.raises(ValueError):
+            olinguito.ProcessPool(local)
+
+    def test_mapping(self, pool):
+        @olinguito.wrap
+        def local_pid() -> int:
+            """Returns the ID of the current process."""
+            return os.getpid()
+
+        mapping = olinguito.Mapping(pid, power, negate, local_pid, pool=pool)
+        assert mapping("pid") != os.getpid()
+        assert mapping("local_pid") == os.getpid()
+        data = '{"name": "power", "arguments": {"x": 2, "y": 2}}'
+        assert mapping.dispatch_json(data) == 4
+        assert asyncio.run(mapping.acall("negate", 1)) == -1
+
+    def test_mapping_call_many(self, pool):
+        mapping = olinguito.Mapping(power, negate, crash, fail, pool=pool)
+        calls = [("power", {"x": 2, "y": i}) for i in range(10)]
+        calls += [("negate", {"x": 1}), ("fail", {})]
+        results = mapping.call_many(calls)
+        assert results[:11] == [2**i for i in range(10)] + [-1]
+        assert isinstance(results[11], ValueError)
+        results = mapping.call_many([("crash", {})])
+        assert isinstance(results[0], BrokenProcessPool)
+        assert mapping.call_many([("power", {"x": 3, "y": 3})]) == [27]
+
+    def test_mapping_instruments(self, pool):
+        metrics = olinguito.Metrics()
+        mapping = olinguito.Mapping(power, instruments=[metrics], pool=pool)
+        mapping("power", 2, 2)
+        assert metrics.snapshot()["power"]["calls"] == 1
@@ -0,0 +1,138 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+import olinguito
+from olinguito import __main__, recording
+
+
+@olinguito.wrap
+def add(x: int, y: int) -> int:
+    """Adds two integers."""
+    return x + y
+
+
+@olinguito.wrap
+def divide(x: int, y: int) -> float:
+    """Divides two integers."""
+    return x / y
+
+
+@olinguito.wrap
+async def greet(name: str) -> str:
+    """Returns a greeting message."""
+    await asyncio.sleep(0)
+    return f"Hello, {name}!"
+
+
+@olinguito.wrap
+def total(items: list[int]) -> int:
+    """Sums integers."""
+    return sum(items)
+
+
+class Test_Recorder:
+    def test_record(self):
+        file = io.StringIO()
+        recorder = olinguito.Recorder(file)
+        mapping = olinguito.Mapping(add, divide, instruments=[recorder])
+        assert mapping("add", 1, y=2) == 3
+        with pytest.raises(ZeroDivisionError):
+            mapping("divide", 1, 0)
+        recorder.close()
+        lines = [json.loads(line) for line in file.getvalue().splitlines()]
+        assert [line["name"] for line in lines] == ["add", "divide"]
+        assert lines[0]["arguments"] == [[1], {"y": 2}]
+        assert lines[0]["error"] is None
+        assert lines[1]["error"] == "ZeroDivisionError"
+        assert 0 <= lines[0]["start"] <= lines[1]["start"]
+        assert lines[0]["elapsed"] >= 0
+
+    def test_load(self, tmp_path):
+        path = tmp_path / "traffic.jsonl"
+        with olinguito.Recorder(path) as recorder:
+            mapping = olinguito.Mapping(add, instruments=[recorder])
+            mapping("add", 1, 2)
+            mapping.call_many([("add", {"x": 3, "y": 4})])
+        calls = recording.load(path)
+        assert [(c.name, c.args, c.kwargs, c.error) for c in calls] == [
+            ("add", (1, 2), {}, None),
+            ("add", (), {"x": 3, "y": 4}, None),
+        ]
+
+    def test_concurrent_async_calls(self):
+        file = io.StringIO()
+        recorder = olinguito.Recorder(file)
+        mapping = olinguito.Mapping(greet, instruments=[recorder])
+        calls = [("greet", {"name": name}) for name in ("Alice", "Bob", "Carol")]
+        asyncio.run(mapping.acall_many(calls))
+        recorder.close()
+        calls_by_name = {
+            c.kwargs["name"]: c for c in recording.load(io.StringIO(file.getvalue()))
+        }
+        assert sorted(calls_by_name) == ["Alice", "Bob", "Carol"]
+
+    def test_skip_unencodable_arguments(self):
+        file = io.StringIO()
+        recorder = olinguito.Recorder(file)
+        mapping = olinguito.Mapping(total, instruments=[recorder])
+        mapping("total", {1, 2})
+        mapping("total", [1, 2])
+        assert recorder.skipped == 1
+        assert len(file.getvalue().splitlines()) == 1
+
+
+class Test_replay:
+    def test_replay(self):
+        mapping = olinguito.Mapping(add, divide, greet)
+        calls = [
+            recording.RecordedCall(0.0, "add", (1, 2), {}, 0.0, None),
+            recording.RecordedCall(0.1, "divide", (1, 0), {}, 0.0, None),
+            recording.RecordedCall(0.2, "greet", (), {"name": "Alice"}, 0.0, None),
+            recording.RecordedCall(0.3, "missing", (), {}, 0.0, None),
+            recording.RecordedCall(0.05, "add", (), {"x": 1, "y": 2}, 0.0, None),
+        ]
+        report = olinguito.replay(mapping, calls, concurrency=2)
+        assert report["calls"] == 5
+        assert report["errors"] == 2
+        assert report["throughput"] > 0
+        assert report["tools"]["add"]["calls"] == 2
+        assert report["tools"]["add"]["errors"] == 0
+        assert report["tools"]["divide"]["errors"] == 1
+        assert report["tools"]["missing"]["errors"] == 1
+        stats = report["tools"]["greet"]
+        assert 0 <= stats["p50_seconds"] <= stats["p99_seconds"] <= stats["max_seconds"]
+        json.dumps(report)
+
+    def test_replay_speed(self):
+        mapping = olinguito.Mapping(add)
+        calls = [
+            recording.RecordedCall(10.0, "add", (1, 2), {}, 0.0, None),
+            recording.RecordedCall(10.2, "add", (1, 2), {}, 0.0, None),
+        ]
+        assert olinguito.replay(mapping, calls, speed=2.0)["seconds"] >= 0.1
+
+    def test_replay_recording(self, tmp_path):
+        path = tmp_path / "traffic.jsonl"
+        with olinguito.Recorder(path) as recorder:
+            mapping = olinguito.Mapping(add, instruments=[recorder])
+            for i in range(10):
+                mapping("add", i, i)
+        report = olinguito.replay(olinguito.Mapping(add), path, concurrency=4)
+        assert report["tools"]["add"]["calls"] == 10
+
+    def test_main(self, tmp_path, capsys):
+        path = tmp_path / "traffic.jsonl"
+        path.write_text(
+            '{"start":0.0,"name":"add","arguments":[[1,2],{}],'
+            '"elapsed":0.0,"error":null}\n'
+        )
+        __main__.main(["replay", "tests.test_recording:_mapping", str(path)])
+        report = json.loads(capsys.readouterr().out)
+        assert report["calls"] == 1
+        assert report["errors"] == 0
+
+
+_mapping = olinguito.Mapping(add)
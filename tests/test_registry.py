@@ -0,0 +1,141 @@
+import json
+
+import pytest
+
+import olinguito
+
+
+@olinguito.wrap
+def add(x: int, y: int) -> int:
+    """Adds two integers."""
+    return x + y
+
+
+@olinguito.wrap
+def multiply(x: int, y: int) -> int:
+    """Multiplies two integers."""
+    return x * y
+
+
+@olinguito.wrap
+def greet(name: str) -> str:
+    """Returns a greeting message."""
+    return f"Hello, {name}!"
+
+
+def _another_add() -> olinguito.Wrapper:
+    @olinguito.wrap
+    def add(x: int, y: int) -> int:
+        """Adds two integers, again."""
+        return x + y
+
+    return add
+
+
+class Test_Registry:
+    def test_register(self):
+        registry = olinguito.Registry(add)
+        assert registry.version == 1
+        assert registry.register(multiply) is multiply
+        assert registry.version == 2
+        assert list(registry) == [add, multiply]
+        assert registry("multiply", 3, 4) == 12
+        assert "multiply" in registry
+        assert multiply in registry
+        assert greet not in registry
+
+    def test_register_as_decorator(self):
+        registry = olinguito.Registry()
+
+        @registry.register
+        @olinguito.wrap
+        def negate(x: int) -> int:
+            """Negates an integer."""
+            return -x
+
+        assert registry["negate"] is negate
+
+    def test_register_duplicate(self):
+        registry = olinguito.Registry(add)
+        other = _another_add()
+
+        with pytest.raises(ValueError):
+            registry.register(other)
+        registry.register(other, replace=True)
+        assert registry["add"] is other
+        assert registry.version == 2
+
+    def test_unregister(self):
+        registry = olinguito.Registry(add, multiply, greet)
+        assert registry.unregister("add") is add
+        assert registry.unregister(multiply) is multiply
+        assert list(registry) == [greet]
+        assert registry.version == 5
+        with pytest.raises(KeyError):
+            registry.unregister("add")
+        with pytest.raises(KeyError):
+            registry.unregister(multiply)
+
+    def test_unregister_other_wrapper_with_same_name(self):
+        registry = olinguito.Registry(add)
+        other = _another_add()
+
+        assert other not in registry
+        with pytest.raises(KeyError):
+            registry.unregister(other)
+
+    def test_manifest(self):
+        registry = olinguito.Registry(add, greet)
+        manifest = registry.manifest
+        assert [d["name"] for d in manifest] == ["add", "greet"]
+        assert registry.manifest is manifest
+        registry.register(multiply)
+        assert [d["name"] for d in registry.manifest] == ["add", "greet", "multiply"]
+        assert registry.manifest[0] is manifest[0]
+        registry.unregister("add")
+        assert [d["name"] for d in registry.manifest] == ["greet", "multiply"]
+
+    def test_encode_manifest(self):
+        registry = olinguito.Registry(add)
+        assert [d["name"] for d in json.loads(registry.encode_manifest())] == ["add"]
+        registry.register(greet)
+        encoded = registry.encode_manifest()
+        assert encoded is registry.encode_manifest()
+        assert json.loads(encoded) == json.loads(
+            olinguito.Mapping(add, greet).encode_manifest()
+        )
+        assert json.loads(registry.encode_manifest(["greet"]))[0]["name"] == "greet"
+        registry.unregister("greet")
+        with pytest.raises(KeyError):
+            registry.encode_manifest(["greet"])
+
+    def test_encode_manifest_dialect(self):
+        registry = olinguito.Registry(add)
+        registry.register(greet)
+        assert registry.encode_manifest(dialect="strict") == (
+            olinguito.Mapping(add, greet).encode_manifest(dialect="strict")
+        )
+        registry.unregister("add")
+        encoded = json.loads(registry.encode_manifest(dialect="strict"))
+        assert [d["name"] for d in encoded] == ["greet"]
+
+    def test_fingerprint(self):
+        registry = olinguito.Registry(add, multiply)
+        fingerprint = registry.fingerprint()
+        assert fingerprint == olinguito.Mapping(add, multiply).fingerprint()
+        registry.register(greet)
+        assert registry.fingerprint() != fingerprint
+        assert registry.fingerprint(["add", "multiply"]) == fingerprint
+        registry.unregister("greet")
+        assert registry.fingerprint() == fingerprint
+        registry.register(_another_add(), replace=True)
+        assert registry.fingerprint() != fingerprint
+
+    def test_search(self):
+        registry = olinguito.Registry(add, greet)
+        assert registry.search("integers") == [add]
+        registry.register(multiply)
+        assert registry.search("multiply integers") == [multiply, add]
+        registry.unregister("multiply")
+        assert registry.search("multiply") == []
+        assert registry.search(prefix="gr") == [greet]
@@ -1,9 +1,15 @@
+import collections
+import dataclasses
+import enum
 import types
-from typing import Annotated, Literal, Optional, TypedDict, Union
+import typing
+from typing import Annotated, Literal, NamedTuple, Optional, Tuple, TypedDict, Union
 
 import pytest
 
 import olinguito
+from olinguito import schema
+from olinguito.generating import generate_json_schema
 from olinguito.schema import to_schema_type
 
 
@@ -97,3 +103,249 @@ class Test_to_schema_type:
             "type": ["array", "null"],
             "items": {"type": "string"},
         }
+
+    def test_enum(self):
+        class Color(enum.Enum):
+            RED = "red"
+            BLUE = "blue"
+
+        class Level(enum.IntEnum):
+            LOW = 1
+            HIGH = 2
+
+        assert to_schema_type(Color) == {"type": "string", "enum": ["red", "blue"]}
+        assert to_schema_type(Level) == {"type": "integer", "enum": [1, 2]}
+
+    def test_dataclass(self):
+        @dataclasses.dataclass
+        class _D:
+            foo: str
+            bar: int = 0
+            baz: list[int] = dataclasses.field(default_factory=list)
+            qux: int = dataclasses.field(default=0, init=False)
+
+        assert to_schema_type(_D) == {
+            "type": "object",
+            "properties": {
+                "foo": {"type": "string"},
+                "bar": {"type": "integer"},
+                "baz": {"type": "array", "items": {"type": "integer"}},
+            },
+            "required": ["foo"],
+            "additionalProperties": False,
+        }
+
+    def test_namedtuple(self):
+        class _P(NamedTuple):
+            x: float
+            y: float = 0.0
+
+        assert to_schema_type(_P) == {
+            "type": "object",
+            "properties": {"x": {"type": "number"}, "y": {"type": "number"}},
+            "required": ["x"],
+            "additionalProperties": False,
+        }
+
+    def test_tuple(self):
+        assert to_schema_type(tuple[int, str]) == {
+            "type": "array",
+            "prefixItems": [{"type": "integer"}, {"type": "string"}],
+            "minItems": 2,
+            "maxItems": 2,
+        }
+        assert to_schema_type(Tuple[int, ...]) == {
+            "type": "array",
+            "items": {"type": "integer"},
+        }
+
+    def test_dict(self):
+        assert to_schema_type(dict[str, float]) == {
+            "type": "object",
+            "additionalProperties": {"type": "number"},
+        }
+        with pytest.raises(TypeError):
+            to_schema_type(dict[int, float])
+
+    def test_set(self):
+        for anno in (set[str], frozenset[str]):
+            assert to_schema_type(anno) == {
+                "type": "array",
+                "items": {"type": "string"},
+                "uniqueItems": True,
+            }
+
+    def test_union_with_unmergeable_members(self):
+        assert to_schema_type(dict[str, int] | None) == {
+            "anyOf": [
+                {"type": "object", "additionalProperties": {"type": "integer"}},
+                {"type": "null"},
+            ]
+        }
+
+    def test_union_with_nested_alternatives(self):
+        described = Annotated[dict[str, int] | None, olinguito.description("d")]
+        assert to_schema_type(described | int) == {
+            "anyOf": [
+                {
+                    "description": "d",
+                    "anyOf": [
+                        {"type": "object", "additionalProperties": {"type": "integer"}},
+                        {"type": "null"},
+                    ],
+                },
+                {"type": "integer"},
+            ]
+        }
+        described = Annotated[int | None, olinguito.description("i")]
+        assert to_schema_type(described | str) == {
+            "anyOf": [
+                {"description": "i", "type": ["integer", "null"]},
+                {"type": "string"},
+            ]
+        }
+
+    def test_union_with_nested_reference(self):
+        class Point(TypedDict):
+            x: int
+
+        def func(
+            a: Annotated[Point | None, olinguito.description("p")] | int, b: Point
+        ): ...
+
+        schema = generate_json_schema(func, use_defs=True)
+        assert schema["properties"]["a"] == {
+            "anyOf": [
+                {
+                    "description": "p",
+                    "anyOf": [{"$ref": "#/$defs/Point"}, {"type": "null"}],
+                },
+                {"type": "integer"},
+            ]
+        }
+
+    def test_union_with_enum(self):
+        class Color(enum.Enum):
+            RED = "red"
+            BLUE = "blue"
+
+        assert to_schema_type(Color | None) == {
+            "anyOf": [{"type": "string", "enum": ["red", "blue"]}, {"type": "null"}]
+        }
+        assert to_schema_type(Optional[Literal["a", "b"]]) == {
+            "anyOf": [{"type": "string", "enum": ["a", "b"]}, {"type": "null"}]
+        }
+
+    def test_unsupported(self):
+        for anno in (object, complex, list, tuple, "int"):
+            with pytest.raises(TypeError, match="Unsupported annotation"):
+                to_schema_type(anno)
+
+
+class Test_register_converter:
+    def test_register(self):
+        class Money:
+            pass
+
+        class Euro(Money):
+            pass
+
+        @olinguito.register_converter(Money)
+        def convert_money(anno, convert):
+            return {"type": "string", "description": anno.__name__}
+
+        try:
+            assert to_schema_type(Money) == {"type": "string", "description": "Money"}
+            assert to_schema_type(list[Euro]) == {
+                "type": "array",
+                "items": {"type": "string", "description": "Euro"},
+            }
+        finally:
+            del schema._converters[Money]
+
+    def test_register_generic(self):
+        def convert_deque(anno, convert):
+            (item,) = typing.get_args(anno)
+            return {"type": "array", "items": convert(item)}
+
+        olinguito.register_converter(collections.deque, convert_deque)
+        try:
+            assert to_schema_type(collections.deque[int | None]) == {
+                "type": "array",
+                "items": {"type": ["integer", "null"]},
+            }
+        finally:
+            del schema._converters[collections.deque]
+
+    def test_register_clears_cache(self):
+        class Opaque:
+            pass
+
+        with pytest.raises(TypeError):
+            to_schema_type(list[Opaque])
+        olinguito.register_converter(Opaque, lambda anno, convert: {"type": "null"})
+        try:
+            assert to_schema_type(list[Opaque])["items"] == {"type": "null"}
+        finally:
+            del schema._converters[Opaque]
+
+
+class Test_cache:
+    def setup_method(self):
+        schema.cache_clear()
+
+    def test_hits(self):
+        class _D(TypedDict):
+            foo: str
+
+        to_schema_type(_D)
+        misses = schema.cache_info().misses
+        to_schema_type(_D)
+        to_schema_type(list[_D])
+        info = schema.cache_info()
+        assert info.misses == misses + 1  # only `list[_D]` itself
+        assert info.hits >= 2
+
+    def test_result_is_not_shared(self):
+        class _D(TypedDict):
+            foo: list[str]
+
+        first = to_schema_type(_D)
+        first["properties"]["foo"]["items"]["type"] = "integer"
+        first["required"].append("bar")
+        assert to_schema_type(_D) == {
+            "type": "object",
+            "properties": {"foo": {"type": "array", "items": {"type": "string"}}},
+            "required": ["foo"],
+            "additionalProperties": False,
+        }
+
+    def test_order_sensitive(self):
+        assert to_schema_type(int | str) == {"type": ["integer", "string"]}
+        assert to_schema_type(str | int) == {"type": ["string", "integer"]}
+        assert to_schema_type(list[Literal[1, 2]]) == {
+            "type": "array",
+            "items": {"type": "integer", "enum": [1, 2]},
+        }
+        assert to_schema_type(list[Literal[2, 1]]) == {
+            "type": "array",
+            "items": {"type": "integer", "enum": [2, 1]},
+        }
+
+    def test_annotated_description(self):
+        anno = Annotated[int, olinguito.description("foo")]
+        to_schema_type(anno)
+        hits = schema.cache_info().hits
+        assert to_schema_type(anno) == {"type": "integer", "description": "foo"}
+        assert schema.cache_info().hits == hits + 1
+
+    def test_unhashable(self):
+        anno = Annotated[int, ["unhashable"]]
+        assert to_schema_type(anno) == {"type": "integer"}
+        assert to_schema_type(anno) == {"type": "integer"}
+
+    def test_clear(self):
+        to_schema_type(int)
+        assert schema.cache_info().currsize > 0
+        schema.cache_clear()
+        assert schema.cache_info().currsize == 0
@@ -0,0 +1,143 @@
+import dataclasses
+import enum
+import json
+from typing import Annotated, Any, Literal, NamedTuple, TypedDict
+
+import pytest
+
+import olinguito
+from olinguito import serializing
+from olinguito.serializing import _to_converter, compile_serializer
+
+
+class _Item(TypedDict):
+    name: str
+    price: float
+    tags: list[Literal["a", "b"]]
+
+
+class Color(enum.Enum):
+    RED = "red"
+    GREEN = "green"
+
+
+class Point(NamedTuple):
+    x: float
+    y: float = 0.0
+
+
+@dataclasses.dataclass
+class Shape:
+    color: Color
+    points: list[Point]
+    label: str | None = None
+    cache: dict[str, Any] = dataclasses.field(default_factory=dict, init=False)
+
+
+class Tree(TypedDict):
+    color: Color
+    children: list["Tree"]
+
+
+def _serialize(anno, value):
+    def func() -> anno: ...
+
+    return compile_serializer(func)(value)
+
+
+class Test_compile_serializer:
+    def test_json_types(self):
+        items: list[_Item] = [{"name": "é", "price": 1.5, "tags": ["a"]}]
+        expected = '[{"name":"é","price":1.5,"tags":["a"]}]'.encode()
+        assert _serialize(list[_Item], items) == expected
+        assert _serialize(int, 1) == b"1"
+        assert _serialize(None, None) == b"null"
+        assert _serialize(tuple[int, str], (1, "a")) == b'[1,"a"]'
+
+    def test_json_types_not_traversed(self):
+        assert _to_converter(list[_Item]) is None
+        assert _to_converter(dict[str, tuple[int, ...]]) is None
+        described = Annotated[int | None, olinguito.description("A count.")]
+        assert _to_converter(described) is None
+
+    def test_named_types(self):
+        shape = Shape(Color.RED, [Point(1.0), Point(2.0, 3.0)])
+        assert json.loads(_serialize(Shape, shape)) == {
+            "color": "red",
+            "points": [{"x": 1.0, "y": 0.0}, {"x": 2.0, "y": 3.0}],
+            "label": None,
+        }
+
+    def test_containers(self):
+        assert _serialize(set[Color], {Color.RED}) == b'["red"]'
+        assert _serialize(frozenset[int], frozenset([1])) == b"[1]"
+        points = {"a": Point(1, 2)}
+        assert _serialize(dict[str, Point], points) == b'{"a":{"x":1,"y":2}}'
+        assert _serialize(tuple[Color, ...], (Color.RED,)) == b'["red"]'
+        assert _serialize(tuple[Color, int], (Color.RED, 1)) == b'["red",1]'
+
+    def test_unions(self):
+        assert _serialize(Color | None, None) == b"null"
+        assert _serialize(Color | None, Color.GREEN) == b'"green"'
+        assert _serialize(Point | Color, Point(1, 2)) == b'{"x":1,"y":2}'
+        assert _serialize(Point | Color, Color.RED) == b'"red"'
+
+    def test_recursive(self):
+        leaf: Tree = {"color": Color.GREEN, "children": []}
+        tree: Tree = {"color": Color.RED, "children": [leaf]}
+        assert _serialize(Tree, tree) == (
+            b'{"color":"red","children":[{"color":"green","children":[]}]}'
+        )
+
+    def test_named_types_built_once(self, monkeypatch):
+        class Leaf(TypedDict):
+            color: Color
+
+        class Branch(TypedDict):
+            a: Leaf
+            b: Leaf
+            c: Leaf
+
+        class Trunk(TypedDict):
+            a: Branch
+            b: Branch
+            c: list[Branch]
+
+        built = []
+        named_converter = serializing._named_converter
+
+        def counting(anno):
+            built.append(anno)
+            return named_converter(anno)
+
+        monkeypatch.setattr(serializing, "_named_converter", counting)
+        branch = {"a": {"color": Color.RED}, "b": {"color": Color.RED}}
+        value = {"a": branch, "b": branch, "c": [branch]}
+        assert json.loads(_serialize(Trunk, value)) == {
+            "a": {"a": {"color": "red"}, "b": {"color": "red"}},
+            "b": {"a": {"color": "red"}, "b": {"color": "red"}},
+            "c": [{"a": {"color": "red"}, "b": {"color": "red"}}],
+        }
+        assert built == [Trunk, Branch, Leaf]
+
+    def test_no_annotation(self):
+        def func(): ...
+
+        value = {"shape": Shape(Color.RED, []), "points": (Point(1, 2),)}
+        assert json.loads(compile_serializer(func)(value)) == {
+            "shape": {"color": "red", "points": [], "label": None},
+            "points": [{"x": 1, "y": 2}],
+        }
+
+    def test_unsupported_annotation(self):
+        assert _serialize(Any, {"a": Color.RED}) == b'{"a":"red"}'
+        assert _serialize(dict[int, str], {1: "a"}) == b'{"1":"a"}'
+
+    def test_mismatched_value(self):
+        # Values are converted even if they do not match their annotation.
+        assert _serialize(dict[str, int], {"a": Color.RED}) == b'{"a":"red"}'
+        assert _serialize(list[Shape], [{"a": {1}}]) == b'[{"a":[1]}]'
+
+    def test_not_serializable(self):
+        with pytest.raises(TypeError, match="Object of type object"):
+            _serialize(list[int], [object()])
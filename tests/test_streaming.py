@@ -0,0 +1,162 @@
+import json
+from typing import Literal, TypedDict
+
+import pytest
+
+import olinguito
+from olinguito.streaming import ArgumentStream
+
+
+class Item(TypedDict):
+    sku: str
+    quantity: int
+
+
+class Shipping(TypedDict):
+    speed: Literal["standard", "express"]
+
+
+class Pickup(TypedDict):
+    store: str
+
+
+class Tree(TypedDict):
+    value: int
+    children: list["Tree"]
+
+
+# Unions of `TypedDict`s are only expressed with `anyOf` in `$defs` mode.
+@olinguito.wrap(use_defs=True)
+def order(
+    items: list[Item],
+    note: str | None,
+    discount: float,
+    delivery: Shipping | Pickup,
+) -> None:
+    """Places an order."""
+
+
+ARGS = {
+    "items": [{"sku": "A-1", "quantity": 2}, {"sku": 'Bé"\\', "quantity": 1}],
+    "note": None,
+    "discount": 0.5,
+    "delivery": {"speed": "express"},
+}
+
+
+def feed_all(stream: ArgumentStream, text: str, size: int):
+    results = [stream.feed(text[i : i + size]) for i in range(0, len(text), size)]
+    assert all(r is None for r in results[:-1])
+    return results[-1]
+
+
+class Test_ArgumentStream:
+    @pytest.mark.parametrize("size", [1, 2, 7, 1000])
+    def test_feed(self, size):
+        text = json.dumps(ARGS, indent=1)
+        stream = order.stream()
+        assert feed_all(stream, text, size) == ARGS
+        assert stream.done
+        assert stream.close() == ARGS
+
+    def test_feed_escapes_split_across_chunks(self):
+        text = json.dumps({**ARGS, "note": '\U0001f600 é \\ "'})
+        stream = order.stream()
+        assert feed_all(stream, text, 1) == json.loads(text)
+
+    def test_trailing_whitespace(self):
+        stream = order.stream()
+        assert stream.feed(json.dumps(ARGS)) == ARGS
+        assert stream.feed(" \n") == ARGS
+
+    @pytest.mark.parametrize(
+        ("prefix", "path", "message"),
+        [
+            ('{"items": [{"quantity": 1.', "$.items[0].quantity", "integer"),
+            ('{"items": [{"quantity": "', "$.items[0].quantity", "integer"),
+            ('{"items": {', "$.items", "array"),
+            ('{"note": 1', "$.note", "'string' or 'null'"),
+            ('{"disc": 1', "$", "unexpected properties: disc"),
+            ('{"x', "$", "no property starts with 'x'"),
+            ('{"delivery": {"speed": "f', "$.delivery.speed", "must be one of"),
+            ('{"delivery": {"store": 1', "$.delivery.store", "'string'"),
+            ('{"delivery": {"other', "$.delivery", "alternatives"),
+            ('{"items": [{"sku": "A"}]', "$.items[0]", "missing properties"),
+            ('{"note": nil', "$.note", "invalid literal"),
+            ('{"note" 1', "$", "unexpected character"),
+            ("[", "$", "'object'"),
+        ],
+    )
+    def test_early_rejection(self, prefix, path, message):
+        stream = order.stream()
+        with pytest.raises(olinguito.ValidationError) as exc_info:
+            for ch in prefix:
+                stream.feed(ch)
+        assert exc_info.value.path == path
+        assert message in exc_info.value.message
+        with pytest.raises(olinguito.ValidationError):
+            stream.feed("}")
+
+    def test_valid_prefixes_are_not_rejected(self):
+        stream = order.stream()
+        for ch in '{"delivery": {"speed": "exp':
+            assert stream.feed(ch) is None
+
+    def test_after_end(self):
+        stream = order.stream()
+        stream.feed(json.dumps(ARGS))
+        with pytest.raises(olinguito.ValidationError):
+            stream.feed("{")
+
+    def test_close_incomplete(self):
+        stream = order.stream()
+        stream.feed('{"note": null')
+        assert not stream.done
+        with pytest.raises(olinguito.ValidationError, match="end of input"):
+            stream.close()
+
+    def test_ambiguous_values_are_validated(self):
+        class A(TypedDict):
+            x: int
+
+        class B(TypedDict):
+            x: str
+
+        @olinguito.wrap(use_defs=True)
+        def func(value: A | B) -> None:
+            """A function."""
+
+        assert func.stream().feed('{"value": {"x": "a"}}') == {"value": {"x": "a"}}
+        assert func.stream().feed('{"value": {"x": 1}}') == {"value": {"x": 1}}
+
+    def test_containers(self):
+        @olinguito.wrap
+        def func(a: tuple[int, str], b: dict[str, int], c: set[str]) -> None:
+            """A function."""
+
+        text = '{"a": [1, "x"], "b": {"k": 1}, "c": ["x", "y"]}'
+        assert func.stream().feed(text) == json.loads(text)
+        for prefix, path, message in [
+            ('{"a": ["', "$.a[0]", "'integer'"),
+            ('{"a": [1, "x", 2', "$.a", "at most 2 items"),
+            ('{"a": [1]', "$.a", "at least 2 items"),
+            ('{"b": {"k": "', "$.b.k", "'integer'"),
+            ('{"c": ["x", "x"]', "$.c", "unique items"),
+        ]:
+            with pytest.raises(olinguito.ValidationError) as exc_info:
+                func.stream().feed(prefix)
+            assert exc_info.value.path == path
+            assert message in exc_info.value.message
+
+    def test_defs(self):
+        @olinguito.wrap(use_defs=True)
+        def func(tree: Tree) -> None:
+            """A function."""
+
+        stream = func.stream()
+        text = '{"tree": {"value": 1, "children": [{"value": 2, "children": []}]}}'
+        assert stream.feed(text) == json.loads(text)
+        stream = func.stream()
+        with pytest.raises(olinguito.ValidationError) as exc_info:
+            stream.feed('{"tree": {"value": 1, "children": [{"value": "')
+        assert exc_info.value.path == "$.tree.children[0].value"
@@ -0,0 +1,236 @@
+"""Stress tests calling the thread-safe APIs from many threads at once.
+
+They find races on any build, and are meant to be run on free-threaded
+builds of CPython too, e.g. `python3.13t -m pytest tests/test_threading.py`.
+"""
+
+import json
+import sys
+import threading
+from collections.abc import Callable
+from typing import Any, Literal, NamedTuple, TypedDict
+
+import pytest
+
+import olinguito
+from olinguito import decoding, schema, serializing
+from olinguito.generating import generate_json_schema
+
+_THREADS = 8
+
+
+class Point(NamedTuple):
+    x: float
+    y: float
+
+
+class Tree(TypedDict):
+    # The recursive field first, so that the decoders of the others are
+    # built while the one of `Tree` is incomplete.
+    children: list["Tree"]
+    value: int
+    label: str
+    weights: dict[str, list[tuple[int, float]]]
+    kind: Literal["leaf", "node"]
+    scores: dict[str, tuple[float, float] | None]
+    path: list[tuple[str, int]]
+    origin: Point
+
+
+def _leaf(value: int) -> Tree:
+    return {
+        "value": value,
+        "label": str(value),
+        "weights": {"a": [[1, 0.5]]},
+        "kind": "leaf",
+        "children": [],
+        "scores": {"a": None, "b": [0.5, 1]},
+        "path": [["root", 0]],
+        "origin": {"x": 0, "y": 0},
+    }
+
+
+def plot(tree: Tree, points: list[Point], scale: float | None) -> list[Point]:
+    """Plots a tree."""
+    return [Point(p.x * (scale or 1), p.y) for p in points]
+
+
+def _plotter(name: str) -> Callable[..., Any]:
+    def tool(tree: Tree, points: list[Point], scale: float | None) -> list[Point]:
+        """Plots a tree."""
+        return plot(tree, points, scale)
+
+    tool.__name__ = name
+    return tool
+
+
+def _hammer(target: Callable[[int], Any], threads: int = _THREADS) -> list[Any]:
+    """Calls `target(i)` in `threads` threads started at once, and returns the
+    results, re-raising the first exception."""
+    barrier = threading.Barrier(threads)
+    results: list[Any] = [None] * threads
+    errors: list[BaseException] = []
+
+    def run(i: int) -> None:
+        barrier.wait()
+        try:
+            results[i] = target(i)
+        except BaseException as exc:
+            errors.append(exc)
+
+    workers = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise errors[0]
+    return results
+
+
+@pytest.fixture(autouse=True)
+def switch_often():
+    # Makes threads interleave more often on builds with a GIL.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+class Test_generate_json_schema:
+    def test_cold_cache(self):
+        expected = generate_json_schema(plot, use_defs=True)
+        for _ in range(20):
+            schema.cache_clear()
+            results = _hammer(lambda i: generate_json_schema(plot, use_defs=True))
+            assert all(result == expected for result in results)
+
+    def test_results_not_shared(self):
+        def point(p: Point): ...
+
+        def mutate(i: int) -> dict[str, Any]:
+            result = generate_json_schema(point)
+            result["properties"]["p"]["properties"]["x"]["thread"] = i
+            return result
+
+        for _ in range(20):
+            results = _hammer(mutate)
+            assert [r["properties"]["p"]["properties"]["x"] for r in results] == [
+                {"type": "number", "thread": i} for i in range(_THREADS)
+            ]
+
+
+class Test_wrap:
+    def test_same_function(self):
+        wrappers = _hammer(lambda i: olinguito.wrap(plot, use_defs=True))
+        assert all(w == wrappers[0] for w in wrappers)
+        assert all(w.__name__ == "plot" for w in wrappers)
+
+    def test_lazy_first_access(self):
+        for _ in range(20):
+            wrapper = olinguito.wrap(plot, lazy=True, use_defs=True)
+            results = _hammer(lambda i: (wrapper.parameters, wrapper.validator))
+            assert all(r[0] is results[0][0] for r in results)
+            assert all(r[1] is results[0][1] for r in results)
+
+    def test_compact_first_use(self):
+        for _ in range(20):
+            wrapper = olinguito.wrap(plot, compact=True, use_defs=True)
+            args = {"tree": _leaf(1), "points": [{"x": 1, "y": 2}], "scale": None}
+            _hammer(lambda i: wrapper.validate(args))
+
+    def test_compiled_on_first_access(self):
+        arguments = {"tree": _leaf(1), "points": [{"x": 1, "y": 2}], "scale": 2}
+        for _ in range(20):
+            decoding._to_cached_decoder.cache_clear()
+            serializing._to_cached_converter.cache_clear()
+            wrapper = olinguito.wrap(plot, use_defs=True)
+            results = _hammer(
+                lambda i: wrapper.serialize(wrapper.call_decoded(arguments))
+            )
+            assert results == [b'[{"x":2.0,"y":2.0}]'] * _THREADS
+
+
+class Test_compile_decoder:
+    def test_recursive_cold_cache(self):
+        # Other threads must not find decoders referring to an incomplete one.
+        def func(trees: list[Tree]): ...
+
+        args = {"trees": [{**_leaf(0), "kind": "node", "children": [_leaf(1)]}]}
+        for _ in range(200):
+            decoding._to_cached_decoder.cache_clear()
+            _hammer(lambda i: decoding.compile_decoder(func)(args))
+
+
+class Test_compile_serializer:
+    def test_recursive_cold_cache(self):
+        def func() -> list[Tree]: ...
+
+        leaf = {**_leaf(1), "origin": Point(0, 0)}
+        tree = {**leaf, "kind": "node", "children": [leaf]}
+        expected = serializing.compile_serializer(func)([tree])
+        for _ in range(200):
+            serializing._to_cached_converter.cache_clear()
+            results = _hammer(lambda i: serializing.compile_serializer(func)([tree]))
+            assert results == [expected] * _THREADS
+
+
+class Test_Mapping:
+    def test_dispatch(self):
+        metrics = olinguito.Metrics()
+        cache = olinguito.ResultCache(maxsize=4)
+
+        @olinguito.wrap(cache=cache)
+        def square(x: int) -> int:
+            """Squares an integer."""
+            return x * x
+
+        mapping = olinguito.Mapping(
+            olinguito.wrap(plot, lazy=True, use_defs=True),
+            square,
+            instruments=[metrics],
+            limit=olinguito.Limit(_THREADS // 2),
+        )
+        calls = 200
+        plot_call = json.dumps(
+            {
+                "name": "plot",
+                "arguments": {"tree": _leaf(1), "points": [], "scale": None},
+            }
+        )
+
+        def dispatch(i: int) -> None:
+            for n in range(calls):
+                data = json.dumps({"name": "square", "arguments": {"x": n % 8}})
+                result = mapping.dispatch_json(data, validate=True, serialize=True)
+                assert result == str((n % 8) ** 2).encode()
+                result = mapping.dispatch_json(plot_call, validate=True)
+                assert result == []
+
+        _hammer(dispatch)
+        snapshot = metrics.snapshot()
+        assert snapshot["square"]["calls"] == snapshot["plot"]["calls"]
+        assert snapshot["plot"]["calls"] == calls * _THREADS
+        assert mapping.limit.info() == (0, 0, 0)
+        info = cache.info()
+        assert info.hits + info.misses + info.joined == calls * _THREADS
+
+    def test_registry(self):
+        registry = olinguito.Registry()
+        wrappers = [
+            olinguito.wrap(_plotter(f"plot_{i}"), lazy=True, use_defs=True)
+            for i in range(_THREADS)
+        ]
+
+        def churn(i: int) -> None:
+            wrapper = wrappers[i]
+            for _ in range(50):
+                registry.register(wrapper)
+                assert registry(wrapper.name, _leaf(i), [], None) == []
+                assert wrapper in registry.search(wrapper.name)
+                json.loads(registry.encode_manifest())
+                registry.unregister(wrapper)
+
+        _hammer(churn)
+        assert len(registry) == 0
+        assert registry.manifest == ()
@@ -0,0 +1,175 @@
+import enum
+from typing import Annotated, Literal, TypedDict
+
+import pytest
+
+import olinguito
+from olinguito.generating import generate_json_schema
+from olinguito.validating import compile_validator
+
+
+class _Item(TypedDict):
+    name: str
+    tags: list[Literal["a", "b"]]
+
+
+class Tree(TypedDict):
+    value: int
+    children: list["Tree"]
+
+
+def _validator(func):
+    return compile_validator(generate_json_schema(func))
+
+
+def _error_path(validate, value):
+    with pytest.raises(olinguito.ValidationError) as excinfo:
+        validate(value)
+    return excinfo.value.path
+
+
+class Test_compile_validator:
+    def test_primitives(self):
+        def func(a: int, b: float, c: str, d: bool, e: int | None): ...
+
+        validate = _validator(func)
+        validate({"a": 1, "b": 1.5, "c": "x", "d": True, "e": None})
+        validate({"a": 1, "b": 1, "c": "x", "d": False, "e": None})
+        args = {"a": 1, "b": 1, "c": "", "d": 1, "e": None}
+        assert _error_path(validate, args) == "$.d"
+        args = {"a": 1, "b": "1", "c": "", "d": True, "e": None}
+        assert _error_path(validate, args) == "$.b"
+
+    def test_bool_is_not_integer(self):
+        def func(a: int): ...
+
+        assert _error_path(_validator(func), {"a": True}) == "$.a"
+
+    def test_enum(self):
+        def func(a: Literal["foo", "bar"], b: Literal[1, 2]): ...
+
+        validate = _validator(func)
+        validate({"a": "foo", "b": 2})
+        assert _error_path(validate, {"a": "baz", "b": 2}) == "$.a"
+        assert _error_path(validate, {"a": "foo", "b": True}) == "$.b"
+
+    def test_optional_enum(self):
+        class Color(enum.Enum):
+            RED = "red"
+            BLUE = "blue"
+
+        def func(c: Color | None): ...
+
+        validate = _validator(func)
+        validate({"c": "red"})
+        validate({"c": None})
+        assert _error_path(validate, {"c": "zzz"}) == "$.c"
+
+    def test_missing_property(self):
+        def func(a: int, b: str): ...
+
+        with pytest.raises(olinguito.ValidationError) as excinfo:
+            _validator(func)({"a": 1})
+        assert excinfo.value.path == "$"
+        assert excinfo.value.message == "missing properties: b"
+
+    def test_additional_property(self):
+        def func(a: int): ...
+
+        with pytest.raises(olinguito.ValidationError) as excinfo:
+            _validator(func)({"a": 1, "z": 2})
+        assert excinfo.value.path == "$"
+        assert excinfo.value.message == "unexpected properties: z"
+
+    def test_not_an_object(self):
+        def func(a: int): ...
+
+        assert _error_path(_validator(func), [1]) == "$"
+
+    def test_nested(self):
+        def func(items: list[_Item]): ...
+
+        validate = _validator(func)
+        validate({"items": [{"name": "x", "tags": ["a", "b"]}]})
+        value = {"items": [{"name": "x", "tags": []}, {"name": "y", "tags": ["c"]}]}
+        assert _error_path(validate, value) == "$.items[1].tags[0]"
+        value = {"items": [{"name": "x", "tags": [], "extra": 1}]}
+        assert _error_path(validate, value) == "$.items[0]"
+
+    def test_union(self):
+        def func(a: _Item | list[int] | None): ...
+
+        validate = _validator(func)
+        validate({"a": None})
+        validate({"a": [1, 2]})
+        validate({"a": {"name": "x", "tags": []}})
+        assert _error_path(validate, {"a": "x"}) == "$.a"
+        assert _error_path(validate, {"a": [1, "2"]}) == "$.a[1]"
+        assert _error_path(validate, {"a": {"name": 1, "tags": []}}) == "$.a.name"
+
+    def test_annotated(self):
+        def func(a: Annotated[int, olinguito.description("foo")]): ...
+
+        validate = _validator(func)
+        validate({"a": 1})
+        assert _error_path(validate, {"a": "1"}) == "$.a"
+
+    def test_recursive_reference(self):
+        def func(tree: Tree | None): ...
+
+        validate = compile_validator(generate_json_schema(func, use_defs=True))
+        validate({"tree": None})
+        leaf = {"value": 2, "children": []}
+        validate({"tree": {"value": 1, "children": [leaf, leaf]}})
+        value = {"tree": {"value": 1, "children": [leaf, {"value": "3"}]}}
+        assert _error_path(validate, value) == "$.tree"
+
+    def test_reference(self):
+        def func(a: _Item, b: list[_Item]): ...
+
+        validate = compile_validator(generate_json_schema(func, use_defs=True))
+        item = {"name": "x", "tags": ["a"]}
+        validate({"a": item, "b": [item, item]})
+        value = {"a": item, "b": [item, {"name": "x", "tags": ["c"]}]}
+        assert _error_path(validate, value) == "$.b[1].tags[0]"
+
+    def test_tuple(self):
+        def func(a: tuple[int, str]): ...
+
+        validate = _validator(func)
+        validate({"a": [1, "x"]})
+        assert _error_path(validate, {"a": [1, 2]}) == "$.a[1]"
+        with pytest.raises(olinguito.ValidationError, match="at least 2 items"):
+            validate({"a": [1]})
+        with pytest.raises(olinguito.ValidationError, match="at most 2 items"):
+            validate({"a": [1, "x", 3]})
+
+    def test_dict(self):
+        def func(a: dict[str, list[int]]): ...
+
+        validate = _validator(func)
+        validate({"a": {"x": [1], "y": []}})
+        assert _error_path(validate, {"a": {"x": [1], "y": ["2"]}}) == "$.a.y[0]"
+
+    def test_additional_properties_schema(self):
+        validate = compile_validator(
+            {
+                "type": "object",
+                "properties": {"a": {"type": "string"}},
+                "additionalProperties": {"type": "integer"},
+            }
+        )
+        validate({"a": "x", "b": 1})
+        assert _error_path(validate, {"a": "x", "b": "y"}) == "$.b"
+
+    def test_unique_items(self):
+        def func(a: set[int]): ...
+
+        validate = _validator(func)
+        validate({"a": [1, 2]})
+        with pytest.raises(olinguito.ValidationError, match="unique items"):
+            validate({"a": [1, 1]})
+
+    def test_unsupported_type(self):
+        with pytest.raises(TypeError):
+            compile_validator({"type": "tuple"})
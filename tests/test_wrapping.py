@@ -1,11 +1,22 @@
+import asyncio
+import threading
 from dataclasses import dataclass, field
-from typing import Annotated
+from typing import Annotated, TypedDict
 
 import pytest
 
 import olinguito
 
 
+class Tree(TypedDict):
+    value: int
+    children: list["Tree"]
+
+
+class Leaf(TypedDict):
+    color: str
+
+
 class Test_wrap:
     def test_wrap_single_argument(self):
         @olinguito.wrap
@@ -39,6 +50,49 @@ class Test_wrap:
         assert add.doc == "Add two numbers."
         assert add.name == "add"
 
+    def test_wrap_tags(self):
+        @olinguito.wrap(tags=["math", "math", "pure"])
+        def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        @olinguito.wrap(tags=["math"], lazy=True)
+        def negate(a: int) -> int:
+            """Negate a number."""
+            return -a
+
+        assert add.tags == frozenset({"math", "pure"})
+        assert negate.tags == frozenset({"math"})
+
+    def test_wrap_fingerprint(self):
+        def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        def add_documented(a: int, b: int) -> int:
+            """Add two integers."""
+            return a + b
+
+        add_documented.__name__ = "add"
+        fingerprint = olinguito.wrap(add).fingerprint
+        assert len(fingerprint) == 64
+        assert olinguito.wrap(add).fingerprint == fingerprint
+        assert olinguito.wrap(add, lazy=True).fingerprint == fingerprint
+        assert olinguito.wrap(add_documented).fingerprint != fingerprint
+
+    def test_wrap_metadata(self):
+        def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        add.extra = "attribute"  # type: ignore[attr-defined]
+        for wrapper in (olinguito.wrap(add), olinguito.wrap(add, lazy=True)):
+            assert wrapper.__module__ == __name__
+            assert wrapper.__qualname__ == add.__qualname__
+            assert wrapper.__doc__ == "Add two numbers."
+            assert wrapper.__wrapped__ is add
+            assert wrapper.extra == "attribute"  # type: ignore[attr-defined]
+
     def test_wrap_no_docstring(self):
         def no_doc_func(a: int) -> str:
             return str(a)
@@ -90,3 +144,350 @@ class Test_wrap:
         }
         assert func.doc == "Check if a is greater than the length of b."
         assert func.name == "func"
+
+    def test_validate(self):
+        @olinguito.wrap
+        def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        add.validate({"a": 1, "b": 2})
+        with pytest.raises(olinguito.ValidationError):
+            add.validate({"a": 1, "b": "2"})
+
+    def test_call_validated(self):
+        @olinguito.wrap
+        def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        assert add.call_validated({"a": 1, "b": 2}) == 3
+        with pytest.raises(olinguito.ValidationError):
+            add.call_validated({"a": 1})
+
+    def test_wrap_coroutine_function(self):
+        @olinguito.wrap
+        async def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        assert add.is_async
+        assert add.parameters == {
+            "type": "object",
+            "properties": {"a": {"type": "integer"}, "b": {"type": "integer"}},
+            "required": ["a", "b"],
+            "additionalProperties": False,
+        }
+        assert asyncio.run(add(3, 4)) == 7
+        assert asyncio.run(add.acall(3, 4)) == 7
+
+    def test_acall_sync_function(self):
+        @olinguito.wrap
+        def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        assert not add.is_async
+        assert asyncio.run(add.acall(3, b=4)) == 7
+
+    def test_wrap_use_defs(self):
+        @olinguito.wrap(use_defs=True)
+        def count(tree: Tree) -> int:
+            """Count the nodes of a tree."""
+            return 1 + sum(count(c) for c in tree["children"])
+
+        assert count.parameters["properties"] == {"tree": {"$ref": "#/$defs/Tree"}}
+        assert list(count.parameters["$defs"]) == ["Tree"]
+        assert count.call_validated({"tree": {"children": [], "value": 1}}) == 1
+        with pytest.raises(olinguito.ValidationError):
+            count.validate({"tree": {"children": [{}], "value": 1}})
+
+    def test_decode(self):
+        @olinguito.wrap
+        def scale(a: float, b: list[float]) -> list[float]:
+            """Scale numbers."""
+            return [a * x for x in b]
+
+        assert scale.decoder is scale.decoder
+        decoded = scale.decode({"a": 2, "b": [1, 2]})
+        assert decoded == {"a": 2.0, "b": [1.0, 2.0]}
+        assert type(decoded["a"]) is float
+        assert scale.call_decoded({"a": 2, "b": [1, 2]}) == [2.0, 4.0]
+        with pytest.raises(olinguito.DecodeError) as excinfo:
+            scale.call_decoded({"a": "2", "b": [1, None]})
+        assert [e.path for e in excinfo.value.errors] == ["$.a", "$.b[1]"]
+
+    def test_returns(self):
+        @olinguito.wrap
+        def leaves(n: int) -> list[Leaf]:
+            """Returns leaves."""
+            return [{"color": "green"}] * n
+
+        @olinguito.wrap
+        def untyped(n: int):
+            """Returns anything."""
+            return n
+
+        assert leaves.returns == {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"color": {"type": "string"}},
+                "required": ["color"],
+                "additionalProperties": False,
+            },
+        }
+        assert untyped.returns is None
+        assert "returns" not in olinguito.Mapping(leaves).manifest[0]
+
+    def test_serialize(self):
+        @dataclass
+        class Result:
+            total: float
+            items: set[int]
+
+        @olinguito.wrap
+        def summarize(items: list[int]) -> Result:
+            """Summarizes integers."""
+            return Result(sum(items), set(items))
+
+        assert summarize.serializer is summarize.serializer
+        assert summarize.serialize(summarize([2, 2])) == b'{"total":4,"items":[2]}'
+
+    def test_render(self):
+        calls = []
+
+        def described(schema):
+            calls.append(schema)
+            return {**schema, "description": "Arguments."}
+
+        @olinguito.wrap(lazy=True)
+        def choose(leaf: Leaf | None) -> None:
+            """Chooses a leaf."""
+
+        olinguito.register_dialect("described", described)
+        try:
+            rendered = choose.render("described")
+            assert choose.render("described") == rendered
+            assert calls == [choose.parameters]
+            assert rendered["description"] == "Arguments."
+            assert choose.parameters.get("description") is None
+            # Registering a dialect again renders it again.
+            olinguito.register_dialect("described", lambda schema: schema)
+            assert choose.render("described") == choose.parameters
+        finally:
+            del olinguito.generating._dialects["described"]
+        with pytest.raises(KeyError):
+            choose.render("described")
+
+    def test_render_compact(self):
+        @olinguito.wrap(compact=True)
+        def choose(leaf: Leaf | None) -> None:
+            """Chooses a leaf."""
+
+        rendered = choose.render("any_of")
+        assert rendered["properties"]["leaf"]["anyOf"][1] == {"type": "null"}
+        assert choose.render("any_of") == rendered
+
+    def test_render_returns_copy(self):
+        @olinguito.wrap
+        def choose(leaf: Leaf) -> None:
+            """Chooses a leaf."""
+
+        mapping = olinguito.Mapping(choose)
+        manifest = mapping.encode_manifest(dialect="strict")
+        rendered = choose.render("strict")
+        rendered["properties"]["leaf"]["required"].clear()
+        assert choose.render("strict") == choose.parameters
+        assert choose.parameters["properties"]["leaf"]["required"] == ["color"]
+        assert mapping.encode_manifest(dialect="strict") == manifest
+
+    def test_wrap_cache(self):
+        calls = []
+
+        @olinguito.wrap(cache=True)
+        def square(x: int) -> int:
+            """Square a number."""
+            calls.append(x)
+            return x * x
+
+        assert square(3) == 9
+        assert square(x=3) == 9
+        assert square.call_validated({"x": 3}) == 9
+        assert asyncio.run(square.acall(x=3)) == 9
+        assert calls == [3]  # positional and keyword calls are the same
+        mapping = olinguito.Mapping(square)
+        assert mapping("square", x=3) == 9
+        assert mapping.call_many([("square", {"x": 3})]) == [9]
+        assert calls == [3]
+
+    def test_wrap_cache_async(self):
+        calls = []
+        cache = olinguito.ResultCache(maxsize=10)
+
+        @olinguito.wrap(cache=cache)
+        async def square(x: int) -> int:
+            """Square a number."""
+            calls.append(x)
+            return x * x
+
+        assert square.cache is cache
+        assert asyncio.run(square(x=3)) == 9
+        assert asyncio.run(square.acall(x=3)) == 9
+        assert olinguito.Mapping(square).call_many([("square", {"x": 3})]) == [9]
+        assert calls == [3]
+
+
+class Test_wrap_lazy:
+    def test_parameters_on_first_access(self):
+        @olinguito.wrap(lazy=True)
+        def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        assert "parameters" not in vars(add)
+        assert add(3, 4) == 7
+        assert add.name == "add"
+        assert add.doc == "Add two numbers."
+        assert add.parameters == {
+            "type": "object",
+            "properties": {"a": {"type": "integer"}, "b": {"type": "integer"}},
+            "required": ["a", "b"],
+            "additionalProperties": False,
+        }
+        assert add.parameters is add.parameters
+        assert add.call_validated({"a": 1, "b": 2}) == 3
+
+    def test_deferred_error(self):
+        @olinguito.wrap(lazy=True)
+        def func(a: object) -> None:
+            """Unsupported annotation."""
+
+        with pytest.raises(TypeError):
+            func.parameters
+
+    def test_no_docstring(self):
+        def no_doc_func(a: int) -> str:
+            return str(a)
+
+        with pytest.raises(TypeError):
+            olinguito.wrap(lazy=True)(no_doc_func)
+
+    def test_generated_once(self):
+        @olinguito.wrap(lazy=True)
+        def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        barrier = threading.Barrier(8)
+        results = []
+
+        def access():
+            barrier.wait()
+            results.append(add.parameters)
+
+        threads = [threading.Thread(target=access) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert all(r is results[0] for r in results)
+
+    def test_mapping_warm(self):
+        @olinguito.wrap(lazy=True)
+        def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        @olinguito.wrap(lazy=True)
+        def neg(a: int) -> int:
+            """Negate a number."""
+            return -a
+
+        mapping = olinguito.Mapping(add, neg)
+        assert mapping.warm() is None
+        assert "parameters" in vars(add)
+        assert "parameters" in vars(neg)
+
+    def test_mapping_warm_background(self):
+        @olinguito.wrap(lazy=True)
+        def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        thread = olinguito.Mapping(add).warm(background=True)
+        assert thread is not None
+        thread.join()
+        assert "parameters" in vars(add)
+
+
+class Test_wrap_compact:
+    def test_shared_schema(self):
+        @olinguito.wrap(compact=True)
+        def grow(tree: Leaf, height: int) -> None:
+            """Grows a tree."""
+
+        @olinguito.wrap(compact=True, use_defs=True)
+        def plant(tree: Tree, height: int) -> None:
+            """Plants a tree."""
+
+        @olinguito.wrap(compact=True, use_defs=True)
+        def prune(tree: Tree, height: int) -> None:
+            """Prunes a tree."""
+
+        assert plant.parameters == olinguito.wrap(plant.func, use_defs=True).parameters
+        assert plant.parameters is prune.parameters
+        assert plant.validator is prune.validator
+        properties = grow.parameters["properties"]
+        assert properties["height"] is plant.parameters["properties"]["height"]
+        with pytest.raises(TypeError):
+            properties["height"]["type"] = "string"  # type: ignore[index]
+        with pytest.raises(TypeError):
+            grow.parameters["required"].append("width")  # type: ignore[attr-defined]
+
+    def test_metadata(self):
+        def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        wrapper = olinguito.wrap(add, compact=True)
+        assert isinstance(wrapper, olinguito.Wrapper)
+        assert wrapper.__name__ == "add"
+        assert wrapper.__doc__ == "Add two numbers."
+        assert wrapper.__wrapped__ is add
+        assert wrapper(1, 2) == 3
+        assert wrapper.fingerprint == olinguito.wrap(add).fingerprint
+
+    def test_slots(self):
+        def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        wrapper = olinguito.wrap(add, compact=True)
+        assert wrapper.decoder is wrapper.decoder
+        assert wrapper.fingerprint is wrapper.fingerprint
+        assert wrapper.returns == {"type": "integer"}
+        wrapper.render("strict")
+        wrapper.validate({"a": 1, "b": 2})
+        assert vars(wrapper) == {}
+
+    def test_validator_on_first_use(self):
+        def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        wrapper = olinguito.wrap(add, compact=True)
+        with pytest.raises(AttributeError):
+            object.__getattribute__(wrapper, "validator")
+        with pytest.raises(olinguito.ValidationError):
+            wrapper.call_validated({"a": 1, "b": "2"})
+        assert wrapper.call_validated({"a": 1, "b": 2}) == 3
+
+    def test_lazy(self):
+        @olinguito.wrap(compact=True, lazy=True)
+        def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        assert "parameters" not in vars(add)
+        assert add.parameters is olinguito.wrap(add.func, compact=True).parameters